@@ -0,0 +1,74 @@
+/* === Clientside callbacks ===
+ * Interactions that only rearrange data the browser already has. Registered
+ * from Python with ClientsideFunction("tradeviewer", <name>).
+ */
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+  tradeviewer: {
+    /* Trade table cell click -> Trade ID input (TradeId column only). */
+    selectTradeId: function (activeCell, visibleData) {
+      if (activeCell && visibleData) {
+        const row = activeCell.row;
+        if (activeCell.column_id === "TradeId" && row >= 0 && row < visibleData.length) {
+          return visibleData[row].TradeId;
+        }
+      }
+      return window.dash_clientside.no_update;
+    },
+
+    /* Fetch click -> trade request, unless that trade is already loaded and unchanged. */
+    requestTrade: function (nClicks, tradeId, bundle) {
+      if (!nClicks || !tradeId) {
+        return window.dash_clientside.no_update;
+      }
+      if (bundle && !bundle.stale && bundle.trade_id === tradeId) {
+        return window.dash_clientside.no_update;
+      }
+      return { trade_id: tradeId, n_clicks: nClicks };
+    },
+
+    /* A save may have changed the loaded trade: the next Fetch must hit the server. */
+    markBundleStale: function (saveStatus, bundle) {
+      if (!bundle) {
+        return window.dash_clientside.no_update;
+      }
+      return Object.assign({}, bundle, { stale: true });
+    },
+
+    /* Indicator / execution marker visibility, applied by trace name to all three charts.
+     * Also runs when a chart receives a new figure, so the choice sticks across trades. */
+    applyTraceVisibility: function (shown, daily, min30, intraday, options) {
+      const toggleable = (options || []).map(function (option) {
+        return option.value !== undefined ? option.value : option;
+      });
+      const apply = function (fig) {
+        if (!fig || !fig.data) {
+          return window.dash_clientside.no_update;
+        }
+        let changed = false;
+        const data = fig.data.map(function (trace) {
+          if (toggleable.indexOf(trace.name) === -1) {
+            return trace;
+          }
+          const visible = (shown || []).indexOf(trace.name) !== -1;
+          if ((trace.visible !== false) === visible) {
+            return trace;
+          }
+          changed = true;
+          return Object.assign({}, trace, { visible: visible });
+        });
+        return changed ? Object.assign({}, fig, { data: data }) : window.dash_clientside.no_update;
+      };
+      return [apply(daily), apply(min30), apply(intraday)];
+    },
+
+    /* Timeframe switch: show the chart of one timeframe, or all of them. */
+    showTimeframe: function (timeframe, dailyStyle, min30Style, intradayStyle) {
+      const show = function (style, name) {
+        const visible = timeframe === "all" || timeframe === name;
+        return Object.assign({}, style, { display: visible ? "block" : "none" });
+      };
+      return [show(dailyStyle, "daily"), show(min30Style, "min30"), show(intradayStyle, "intraday")];
+    },
+  },
+});
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark of the execution-to-bar alignment.
+
+Compares the vectorized align_execution_times_to_intraday against the previous
+per-execution argmin implementation over a grid of fill and bar counts.
+
+    python -m benchmarks.bench_alignment
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from src.utils.helper_functions import align_execution_times_to_intraday
+
+FILL_COUNTS = [10, 100, 1000]
+BAR_COUNTS = [390, 390 * 5, 390 * 20]   # 1-minute bars: 1, 5 and 20 sessions
+
+
+def legacy_align_execution_times_to_intraday(df_executions, df_intraday):
+    """The pre-vectorization implementation, kept here as the baseline."""
+    if df_executions.empty or df_intraday.empty:
+        return df_executions.copy()
+
+    def to_seconds(t):
+        if pd.isnull(t): return np.nan
+        if isinstance(t, pd.Timestamp): t = t.time()
+        return t.hour * 3600 + t.minute * 60 + t.second
+
+    intraday_secs = np.array([to_seconds(t) for t in df_intraday["Time"]])
+    exec_secs = np.array([to_seconds(t) for t in df_executions["Time"]])
+
+    def find_nearest(exec_sec):
+        idx = np.abs(intraday_secs - exec_sec).argmin()
+        return df_intraday["Time"].iloc[idx]
+
+    df = df_executions.copy()
+    df["Time"] = [find_nearest(t) for t in exec_secs]
+    return df
+
+
+def make_bars(n_bars: int) -> pd.DataFrame:
+    sessions = -(-n_bars // 390)
+    days = pd.bdate_range("2025-01-06", periods=sessions)
+    times = np.concatenate([
+        day + pd.Timedelta(hours=9, minutes=30) + pd.to_timedelta(np.arange(390), unit="min")
+        for day in days
+    ])[:n_bars]
+    times = pd.to_datetime(times)
+    return pd.DataFrame({"Date": times.normalize(), "Time": times})
+
+
+def make_executions(df_bars: pd.DataFrame, n_fills: int, rng) -> pd.DataFrame:
+    start, end = df_bars["Time"].iloc[0], df_bars["Time"].iloc[-1]
+    offsets = rng.integers(0, int((end - start).total_seconds()), n_fills)
+    stamps = pd.to_datetime(np.sort(start + pd.to_timedelta(offsets, unit="s")))
+    return pd.DataFrame({
+        "Date": stamps.date,
+        "Time": stamps.time,
+        "Side": rng.choice(["BUYTOOPEN", "SELLTOCLOSE"], n_fills),
+        "Price": rng.uniform(10, 20, n_fills),
+    })
+
+
+def best_of(func, repeat: int = 5) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'fills':>6} {'bars':>6} {'legacy ms':>10} {'vectorized ms':>14} {'speedup':>8}")
+    for n_bars in BAR_COUNTS:
+        df_bars = make_bars(n_bars)
+        for n_fills in FILL_COUNTS:
+            df_exec = make_executions(df_bars, n_fills, rng)
+            legacy = best_of(lambda: legacy_align_execution_times_to_intraday(df_exec, df_bars), repeat=3)
+            vectorized = best_of(lambda: align_execution_times_to_intraday(df_exec, df_bars))
+            print(f"{n_fills:>6} {n_bars:>6} {legacy * 1e3:>10.2f} {vectorized * 1e3:>14.3f} {legacy / vectorized:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare the "rows" and "columnar" fetch paths of db_functions.read_frame.
+
+Loads the intraday, 30-min and daily bars of a few trades with both modes and
+reports wall time and Python allocations (tracemalloc) per path.
+
+    python -m benchmarks.bench_fetch --trades 6175 6176 --config database.ini
+"""
+import argparse
+import time
+import tracemalloc
+
+import psycopg2
+
+from src.common.read_configs_in import read_database_config
+from src.data.db_functions import read_frame
+
+TABLE_QUERIES = {
+    "marketdataintrad": 'SELECT * FROM "marketdataintrad" WHERE "TradeId" = %s ORDER BY "Date", "Time";',
+    "marketdata30mins": 'SELECT * FROM "marketdata30mins" WHERE "TradeId" = %s ORDER BY "Date";',
+    "marketdatad": 'SELECT * FROM "marketdatad" WHERE "TradeId" = %s ORDER BY "Date";',
+}
+
+
+def measure(cursor, query: str, trade_ids, mode: str, repeat: int) -> dict:
+    # Warm-up run so the column type probe of the columnar path is cached
+    read_frame(cursor, query, (trade_ids[0],), mode=mode)
+
+    started = time.perf_counter()
+    rows = 0
+    for _ in range(repeat):
+        for trade_id in trade_ids:
+            rows += len(read_frame(cursor, query, (trade_id,), mode=mode))
+    elapsed = time.perf_counter() - started
+
+    # Separate pass: tracemalloc slows everything down and would skew the timing
+    tracemalloc.start()
+    for trade_id in trade_ids:
+        read_frame(cursor, query, (trade_id,), mode=mode)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"rows": rows // repeat, "ms": elapsed * 1e3 / repeat, "peak_kb": peak / 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trades", type=int, nargs="+", required=True)
+    parser.add_argument("--config", default="database.ini")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**read_database_config(filename=args.config, section="postgresql"))
+    cur = conn.cursor()
+    try:
+        print(f"{'table':<18} {'mode':<9} {'rows':>7} {'ms':>9} {'peak KiB':>10}")
+        for table, query in TABLE_QUERIES.items():
+            for mode in ("rows", "columnar"):
+                r = measure(cur, query, args.trades, mode, args.repeat)
+                print(f"{table:<18} {mode:<9} {r['rows']:>7} {r['ms']:>9.2f} {r['peak_kb']:>10.0f}")
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
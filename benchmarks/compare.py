@@ -0,0 +1,67 @@
+"""
+Compare two benchmark result files written by benchmarks.suite.
+
+A benchmark regresses when its median got slower by more than --threshold
+(relative) and by more than --min-ms (absolute, filters timer noise on
+sub-millisecond benchmarks). Exit status 1 when anything regressed.
+
+    python -m benchmarks.compare benchmarks/baseline.json results.json
+"""
+import argparse
+import json
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2, min_ms: float = 0.5) -> list:
+    """[(name, baseline ms, current ms, ratio, status)] for every benchmark in either file."""
+    base, cur = baseline["results"], current["results"]
+    rows = []
+    for name in sorted(set(base) | set(cur)):
+        if name not in base or name not in cur:
+            rows.append((name, base.get(name, {}).get("median_ms"), cur.get(name, {}).get("median_ms"),
+                         None, "new" if name in cur else "missing"))
+            continue
+        before, after = base[name]["median_ms"], cur[name]["median_ms"]
+        ratio = after / before if before else float("inf")
+        if ratio > 1 + threshold and after - before > min_ms:
+            status = "REGRESSED"
+        elif ratio < 1 / (1 + threshold) and before - after > min_ms:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((name, before, after, ratio, status))
+    return rows
+
+
+def print_comparison(rows: list) -> None:
+    print(f"{'benchmark':<34} {'baseline ms':>12} {'current ms':>11} {'ratio':>7}  status")
+    for name, before, after, ratio, status in rows:
+        before_s = f"{before:.3f}" if before is not None else "-"
+        after_s = f"{after:.3f}" if after is not None else "-"
+        ratio_s = f"{ratio:.2f}x" if ratio is not None else "-"
+        print(f"{name:<34} {before_s:>12} {after_s:>11} {ratio_s:>7}  {status}")
+
+
+def regressions(rows: list) -> list:
+    return [row for row in rows if row[4] == "REGRESSED"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown that counts (0.2 = 20%%)")
+    parser.add_argument("--min-ms", type=float, default=0.5, help="absolute slowdown that counts")
+    args = parser.parse_args()
+
+    rows = compare(load_results(args.baseline), load_results(args.current), args.threshold, args.min_ms)
+    print_comparison(rows)
+    raise SystemExit(1 if regressions(rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
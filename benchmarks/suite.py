@@ -0,0 +1,274 @@
+"""
+Benchmark suite of the Tradeviewer hot paths.
+
+Times the trade bundle and trades page fetches, both execution alignment helpers, every
+create_*_plot_component and the latency of the main Dash callbacks (through
+the Flask test client, so JSON serialization is included) against a database
+made with benchmarks.synthetic. Writes the results as JSON and optionally
+compares them with a stored baseline (see benchmarks.compare).
+
+    python -m benchmarks.synthetic --config bench.ini --reset
+    python -m benchmarks.suite --config bench.ini --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --config bench.ini --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+import numpy as np
+from dash import Dash
+
+from benchmarks.compare import compare, print_comparison, regressions, load_results
+from src.common.read_configs_in import read_database_config
+from src.data.cache import trade_cache
+from src.data.db_functions import (
+    configure_fetch, pooled_connection_and_cursor, close_all_pools, fetch_trades_page,
+)
+from src.data.loader import fetch_trade_bundle, load_trade_bundle, load_overlay_data
+from src.data.prefetch import configure_prefetch
+from src.utils.figure_cache import configure_figure_cache
+from src.utils.background import configure_background
+from src.utils.downsample import payload_bytes
+from src.utils.helper_functions import align_execution_times_to_intraday, align_execution_times_to_30mins
+from src.uicomponents.daily_chart import create_daily_plot_component
+from src.uicomponents.min30_chart import create_30min_plot_component
+from src.uicomponents.intraday_chart import create_intraday_plot_component
+from src.uicomponents.overlay_chart import create_overlay_plot_component
+from src.uicomponents.layout import create_layout
+from src.uicomponents.callbacks import trade_callbacks
+
+OVERLAY_TRADES = 10
+
+
+def summarize(samples: list, **extra) -> dict:
+    ms = np.asarray(samples) * 1e3
+    return {
+        "median_ms": float(np.median(ms)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "min_ms": float(ms.min()),
+        "n": len(ms),
+        **extra,
+    }
+
+
+def run(func, args_list: list, repeat: int, setup=None) -> list:
+    """Wall time of func(*args) for every args in args_list, repeat times, after one warm-up call."""
+    if setup:
+        setup()
+    func(*args_list[0])
+    samples = []
+    for _ in range(repeat):
+        for args in args_list:
+            if setup:
+                setup()
+            started = time.perf_counter()
+            func(*args)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def sample_trade_ids(cursor, n: int) -> list:
+    """n TradeIds spread evenly over the table (deterministic)."""
+    cursor.execute('SELECT "TradeId" FROM "trades" ORDER BY "TradeId";')
+    ids = [row[0] for row in cursor.fetchall()]
+    if not ids:
+        raise SystemExit("No trades in the database; run benchmarks.synthetic first.")
+    step = max(1, len(ids) // n)
+    return ids[::step][:n]
+
+
+# --- Benchmarks ---
+
+def bench_fetch(database_config, trade_ids, repeat) -> dict:
+    """The trade bundle query with a cleared trade_cache, and one page of the trades listing."""
+    results = {}
+    with pooled_connection_and_cursor(database_config) as (conn, cur):
+        bundle = lambda tid: fetch_trade_bundle(tid, cur)
+        results["fetch.trade_bundle"] = summarize(
+            run(bundle, [(tid,) for tid in trade_ids], repeat, setup=trade_cache.clear))
+
+        page = lambda: fetch_trades_page(cur, "trades", "marketdatad", 0, 15)
+        results["fetch.trades_page"] = summarize(run(page, [()], repeat * len(trade_ids)))
+    return results
+
+
+def bench_alignment(bundles, repeat) -> dict:
+    return {
+        "align.intraday": summarize(run(
+            align_execution_times_to_intraday,
+            [(b["executions"], b["intraday"]) for b in bundles], repeat)),
+        "align.30mins": summarize(run(
+            align_execution_times_to_30mins,
+            [(b["executions"], b["min30"]) for b in bundles], repeat)),
+    }
+
+
+def bench_plots(database_config, bundles, trade_ids, repeat) -> dict:
+    builders = {
+        "plot.daily": lambda b: create_daily_plot_component(b["daily"], b["executions"]),
+        "plot.30min": lambda b: create_30min_plot_component(
+            b["min30"], align_execution_times_to_30mins(b["executions"], b["min30"])),
+        "plot.intraday": lambda b: create_intraday_plot_component(
+            b["intraday"], align_execution_times_to_intraday(b["executions"], b["intraday"])),
+    }
+    results = {}
+    for name, build in builders.items():
+        size = int(np.median([payload_bytes(build(b)) for b in bundles]))
+        results[name] = summarize(run(build, [(b,) for b in bundles], repeat), payload_bytes=size)
+
+    overlay_data = load_overlay_data(trade_ids[:OVERLAY_TRADES], database_config)
+    results["plot.overlay"] = summarize(
+        run(create_overlay_plot_component, [(overlay_data,)], repeat * len(bundles)),
+        payload_bytes=payload_bytes(create_overlay_plot_component(overlay_data)),
+    )
+    return results
+
+
+def _callback_request(dependencies: list, output: str, values: dict) -> dict:
+    """Body of a /_dash-update-component request for the callback whose output contains output."""
+    dep = next(d for d in dependencies if output in d["output"])
+    outputs = [
+        dict(zip(("id", "property"), spec.rsplit(".", 1)))
+        for spec in dep["output"].strip(".").split("...")
+    ]
+    with_values = lambda deps: [{**d, "value": values.get(f"{d['id']}.{d['property']}")} for d in deps]
+    inputs = with_values(dep["inputs"])
+    return {
+        "output": dep["output"],
+        "outputs": outputs if dep["output"].startswith("..") else outputs[0],
+        "inputs": inputs,
+        "state": with_values(dep["state"]),
+        "changedPropIds": [f"{inputs[0]['id']}.{inputs[0]['property']}"],
+    }
+
+
+def bench_callbacks(database_config, trade_ids, repeat) -> dict:
+    app = Dash(__name__)
+    app.layout = create_layout(app, database_config)
+    trade_callbacks.register_callbacks(app, database_config)
+    client = app.server.test_client()
+    dependencies = client.get("/_dash-dependencies").get_json()
+
+    def post(body):
+        response = client.post("/_dash-update-component", json=body)
+        if response.status_code != 200:
+            raise RuntimeError(f"Callback {body['output']} failed with HTTP {response.status_code}")
+        return len(response.data)
+
+    trade_view = [
+        (_callback_request(dependencies, "trade-bundle-store.data",
+                           {"trade-request-store.data": {"trade_id": tid, "n_clicks": 1}}),)
+        for tid in trade_ids
+    ]
+    overlay = _callback_request(dependencies, "overlay-chart.figure", {
+        "overlay-button.n_clicks": 1,
+        "trade-table.selected_row_ids": trade_ids[:OVERLAY_TRADES],
+    })
+    table = _callback_request(dependencies, "trade-table.data", {
+        "trade-table.page_current": 0, "trade-table.page_size": 15,
+        "trade-table.sort_by": [], "trade-table.filter_query": "",
+    })
+
+    size = int(np.median([post(*args) for args in trade_view]))
+    return {
+        "callback.trade_view.cold": summarize(
+            run(post, trade_view, repeat, setup=trade_cache.clear), response_bytes=size),
+        "callback.trade_view.warm": summarize(run(post, trade_view, repeat), response_bytes=size),
+        "callback.overlay.cold": summarize(
+            run(post, [(overlay,)], repeat * 2, setup=trade_cache.clear), response_bytes=post(overlay)),
+        "callback.trade_table": summarize(run(post, [(table,)], repeat * len(trade_ids)), response_bytes=post(table)),
+    }
+
+
+# --- Results ---
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def table_counts(database_config) -> dict:
+    with pooled_connection_and_cursor(database_config) as (conn, cur):
+        counts = {}
+        for table in ("trades", "executions", "marketdatad", "marketdata30mins", "marketdataintrad"):
+            cur.execute(f'SELECT count(*) FROM "{table}";')
+            counts[table] = cur.fetchone()[0]
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--config", default="bench.ini")
+    parser.add_argument("--trades", type=int, default=10, help="trades sampled per benchmark")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fetch-mode", choices=["rows", "columnar"], default="columnar")
+    parser.add_argument("--only", nargs="+", choices=["fetch", "align", "plot", "callback"],
+                        default=["fetch", "align", "plot", "callback"])
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--save-baseline", help="also write the results to this path")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    database_config = read_database_config(filename=args.config, section="postgresql")
+    # Measure the work itself: no figure files, no background prefetching, no job processes
+    configure_figure_cache(enabled="false")
+    configure_prefetch(neighbours=0)
+    configure_background(enabled="false")
+    configure_fetch(mode=args.fetch_mode)
+
+    try:
+        with pooled_connection_and_cursor(database_config) as (conn, cur):
+            trade_ids = sample_trade_ids(cur, args.trades)
+        bundles = [load_trade_bundle(tid, database_config) for tid in trade_ids]
+
+        results = {}
+        if "fetch" in args.only:
+            results.update(bench_fetch(database_config, trade_ids, args.repeat))
+        if "align" in args.only:
+            results.update(bench_alignment(bundles, args.repeat))
+        if "plot" in args.only:
+            results.update(bench_plots(database_config, bundles, trade_ids, args.repeat))
+        if "callback" in args.only:
+            results.update(bench_callbacks(database_config, trade_ids, args.repeat))
+
+        report = {
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "git": git_revision(),
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "fetch_mode": args.fetch_mode,
+                "trade_ids": trade_ids,
+                "repeat": args.repeat,
+                "tables": table_counts(database_config),
+            },
+            "results": results,
+        }
+    finally:
+        close_all_pools()
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    print(f"{'benchmark':<34} {'median ms':>10} {'p95 ms':>9} {'n':>5}")
+    for name, r in results.items():
+        print(f"{name:<34} {r['median_ms']:>10.3f} {r['p95_ms']:>9.3f} {r['n']:>5}")
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        print()
+        rows = compare(load_results(args.baseline), report, args.threshold)
+        print_comparison(rows)
+        raise SystemExit(1 if regressions(rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
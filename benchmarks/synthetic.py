@@ -0,0 +1,220 @@
+"""
+Synthetic trade database for benchmarking.
+
+Creates the trades, executions, marketdatad, marketdata30mins and marketdataintrad
+tables in the database of --config and fills them with random-walk bars of
+realistic size, then applies src.data.schema (indexes, trade_latest_rvol) and fills trade_pnl.
+Use a scratch database: --reset drops the five tables first.
+
+    python -m benchmarks.synthetic --config bench.ini --trades 300 --reset
+"""
+import argparse
+import io
+import time
+
+import numpy as np
+import pandas as pd
+import psycopg2
+
+from src.common.read_configs_in import read_database_config
+from src.data import schema
+from src.data.pnl import update_pnl
+
+CREATE_TABLES = '''
+    CREATE TABLE trades (
+        "TradeId" integer PRIMARY KEY, "Symbol" text, "Date" date,
+        "Setup" text, "Rating" integer, "Side" text
+    );
+    CREATE TABLE executions (
+        "ExecId" serial PRIMARY KEY, "Symbol" text, "Date" date, "Time" time,
+        "Side" text, "Quantity" integer, "Price" numeric, "AvgPrice" numeric
+    );
+    CREATE TABLE marketdatad (
+        "TradeId" integer, "Symbol" text, "Date" date,
+        "Open" numeric, "High" numeric, "Low" numeric, "Close" numeric,
+        "Volume" bigint, "RelativeVolume" numeric
+    );
+    CREATE TABLE marketdata30mins (
+        "Symbol" text, "Date" timestamp,
+        "Open" numeric, "High" numeric, "Low" numeric, "Close" numeric,
+        "Volume" bigint, "EMA65" numeric, "TradeId" integer
+    );
+    CREATE TABLE marketdataintrad (
+        "TradeId" integer, "Symbol" text, "Date" date, "Time" timestamp,
+        "Open" numeric, "High" numeric, "Low" numeric, "Close" numeric,
+        "Volume" bigint, "VWAP" numeric, "EMA9" numeric, "Relatr" numeric
+    );
+'''
+
+TABLES = ["trades", "executions", "marketdatad", "marketdata30mins", "marketdataintrad"]
+
+SETUPS = [None, "Breakout", "Pullback", "Gap and go", "Reversal", "VWAP reclaim"]
+
+SESSION_MINUTES = 390
+BARS_30MIN = 13
+
+# Trades per COPY batch: keeps the intraday frames of a batch at a few hundred MB at most
+BATCH_TRADES = 50
+
+
+def _ohlc(close: np.ndarray, rng, noise: float) -> dict:
+    """Open / High / Low around a close path: open is the previous close."""
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    wick = np.abs(rng.normal(0.0, noise, (2, len(close))))
+    return {
+        "Open": open_.round(4),
+        "High": (np.maximum(open_, close) * (1 + wick[0])).round(4),
+        "Low": (np.minimum(open_, close) * (1 - wick[1])).round(4),
+        "Close": close.round(4),
+    }
+
+
+def _walk(start: float, n: int, rng, sigma: float) -> np.ndarray:
+    return start * np.exp(np.cumsum(rng.normal(0.0, sigma, n)))
+
+
+def make_trades(n_trades: int, n_symbols: int, rng) -> pd.DataFrame:
+    """Trades on distinct (Symbol, Date) pairs over the last two years of sessions."""
+    symbols = np.array([f"S{i:04d}" for i in range(n_symbols)])
+    days = pd.bdate_range(end=pd.Timestamp("2025-06-30"), periods=500)
+    pairs = rng.choice(len(symbols) * len(days), size=n_trades, replace=False)
+    return pd.DataFrame({
+        "TradeId": np.arange(1, n_trades + 1),
+        "Symbol": symbols[pairs % len(symbols)],
+        "Date": days[pairs // len(symbols)].date,
+        "Setup": rng.choice(np.array(SETUPS, dtype=object), n_trades),
+        "Rating": rng.choice([1, 2, 3, 4, 5], n_trades),
+        "Side": rng.choice(["LONG", "SHORT"], n_trades, p=[0.7, 0.3]),
+    })
+
+
+def make_trade_bars(trade, args, rng) -> dict:
+    """Daily, 30-min, 1-minute bars and executions of one trade."""
+    trade_date = pd.Timestamp(trade.Date)
+    price = rng.uniform(5, 300)
+
+    # Daily: history up to the trade plus a few sessions after it
+    days = pd.bdate_range(end=trade_date, periods=args.daily_bars - args.daily_after).append(
+        pd.bdate_range(trade_date + pd.offsets.BDay(1), periods=args.daily_after))
+    close = _walk(price, len(days), rng, 0.025)
+    volume = rng.lognormal(13, 0.6, len(days)).astype(np.int64)
+    daily = pd.DataFrame({
+        "TradeId": trade.TradeId, "Symbol": trade.Symbol, "Date": days.date,
+        **_ohlc(close, rng, 0.01), "Volume": volume,
+        "RelativeVolume": (volume / pd.Series(volume).rolling(20, min_periods=1).mean()).round(2),
+    })
+
+    # 30-min: the last min30_days sessions up to the trade
+    sessions = pd.bdate_range(end=trade_date, periods=args.min30_days)
+    stamps = (sessions.repeat(BARS_30MIN) + pd.Timedelta(hours=9, minutes=30)
+              + pd.to_timedelta(np.tile(np.arange(BARS_30MIN) * 30, len(sessions)), unit="min"))
+    close = _walk(price, len(stamps), rng, 0.006)
+    min30 = pd.DataFrame({
+        "Symbol": trade.Symbol, "Date": stamps, **_ohlc(close, rng, 0.002),
+        "Volume": rng.lognormal(11, 0.7, len(stamps)).astype(np.int64),
+        "EMA65": pd.Series(close).ewm(span=65, adjust=False).mean().round(4),
+        "TradeId": trade.TradeId,
+    })
+
+    # 1-minute: the last intraday_days sessions up to the trade
+    sessions = pd.bdate_range(end=trade_date, periods=args.intraday_days)
+    stamps = (sessions.repeat(SESSION_MINUTES) + pd.Timedelta(hours=9, minutes=30)
+              + pd.to_timedelta(np.tile(np.arange(SESSION_MINUTES), len(sessions)), unit="min"))
+    close = _walk(price, len(stamps), rng, 0.0015)
+    bars = _ohlc(close, rng, 0.0008)
+    volume = rng.lognormal(8, 0.9, len(stamps)).astype(np.int64)
+    session = stamps.normalize()
+    typical = pd.Series((bars["High"] + bars["Low"] + close) / 3 * volume)
+    vwap = typical.groupby(session).cumsum() / pd.Series(volume).groupby(session).cumsum()
+    intraday = pd.DataFrame({
+        "TradeId": trade.TradeId, "Symbol": trade.Symbol, "Date": session.date, "Time": stamps,
+        **bars, "Volume": volume, "VWAP": vwap.round(4),
+        "EMA9": pd.Series(close).ewm(span=9, adjust=False).mean().round(4),
+        "Relatr": rng.normal(0, 1, len(stamps)).round(3),
+    })
+
+    # Executions: a scaled entry and exit inside the trade session
+    n_fills = int(rng.integers(2, 13))
+    on_day = intraday[intraday["Date"] == trade_date.date()]
+    picks = np.sort(rng.choice(len(on_day), n_fills, replace=False))
+    entries = n_fills // 2 or 1
+    opening, closing = ("BUYTOOPEN", "SELLTOCLOSE") if trade.Side == "LONG" else ("SELLTOOPEN", "BUYTOCLOSE")
+    fill_price = on_day["Close"].to_numpy()[picks]
+    executions = pd.DataFrame({
+        "Symbol": trade.Symbol,
+        "Date": trade_date.date(),
+        "Time": (on_day["Time"].iloc[picks] + pd.to_timedelta(rng.integers(0, 60, n_fills), unit="s")).dt.time.to_numpy(),
+        "Side": [opening] * entries + [closing] * (n_fills - entries),
+        "Quantity": rng.choice([50, 100, 200, 500], n_fills),
+        "Price": fill_price,
+        "AvgPrice": np.round(np.cumsum(fill_price) / np.arange(1, n_fills + 1), 4),
+    })
+
+    return {"marketdatad": daily, "marketdata30mins": min30, "marketdataintrad": intraday, "executions": executions}
+
+
+def copy_frame(cursor, table: str, df: pd.DataFrame) -> None:
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False, na_rep="")
+    buf.seek(0)
+    columns = ", ".join(f'"{c}"' for c in df.columns)
+    cursor.copy_expert(f'COPY "{table}" ({columns}) FROM STDIN WITH (FORMAT csv, NULL \'\')', buf)
+
+
+def generate(conn, args) -> dict:
+    """Create and fill the tables; returns the row count per table."""
+    rng = np.random.default_rng(args.seed)
+    cur = conn.cursor()
+    for table in TABLES:
+        if schema.table_exists(cur, table):
+            if not args.reset:
+                raise SystemExit(f'Table "{table}" already exists; use --reset on a scratch database.')
+            cur.execute(f'DROP TABLE "{table}" CASCADE;')
+    cur.execute(f"DROP TABLE IF EXISTS {schema.RVOL_SUMMARY_TABLE};")
+    cur.execute(f"DROP TABLE IF EXISTS {schema.PNL_SUMMARY_TABLE};")
+    cur.execute(CREATE_TABLES)
+
+    trades = make_trades(args.trades, args.symbols, rng)
+    copy_frame(cur, "trades", trades)
+    counts = {"trades": len(trades)}
+
+    for start in range(0, len(trades), BATCH_TRADES):
+        batch = [make_trade_bars(trade, args, rng) for trade in trades.iloc[start:start + BATCH_TRADES].itertuples()]
+        for table in ("marketdatad", "marketdata30mins", "marketdataintrad", "executions"):
+            df = pd.concat([bars[table] for bars in batch], ignore_index=True)
+            copy_frame(cur, table, df)
+            counts[table] = counts.get(table, 0) + len(df)
+        print(f"  {min(start + BATCH_TRADES, len(trades))}/{len(trades)} trades")
+    conn.commit()
+    cur.close()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--config", default="bench.ini")
+    parser.add_argument("--trades", type=int, default=300)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--daily-bars", type=int, default=500, help="daily bars per trade")
+    parser.add_argument("--daily-after", type=int, default=20, help="of which after the trade date")
+    parser.add_argument("--min30-days", type=int, default=20, help="sessions of 30-min bars per trade")
+    parser.add_argument("--intraday-days", type=int, default=5, help="sessions of 1-minute bars per trade")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true", help="drop the tables if they exist")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**read_database_config(filename=args.config, section="postgresql"))
+    try:
+        started = time.perf_counter()
+        counts = generate(conn, args)
+        schema.apply(conn)
+        update_pnl(conn)
+        for table, rows in counts.items():
+            print(f"{table:<18} {rows:>10,} rows")
+        print(f"done in {time.perf_counter() - started:.1f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
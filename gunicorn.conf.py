@@ -0,0 +1,20 @@
+# gunicorn -c gunicorn.conf.py wsgi:server
+# Worker and thread counts come from the optional [server] section of database.ini.
+from src.app import SERVER_SETTINGS, configure_server, shutdown
+from src.common.read_configs_in import read_optional_config
+
+configure_server(**read_optional_config(filename="database.ini", section="server"))
+
+bind = SERVER_SETTINGS["bind"]
+workers = SERVER_SETTINGS["workers"]
+threads = SERVER_SETTINGS["threads"]
+worker_class = "gthread"
+timeout = int(SERVER_SETTINGS["timeout"])
+
+# No preloading: pools, threads and event loops must not be inherited through fork,
+# so every worker imports wsgi.py and starts its own
+preload_app = False
+
+
+def worker_exit(server, worker):
+    shutdown()
@@ -0,0 +1,150 @@
+import os
+import threading
+
+from dash import Dash
+from dash_bootstrap_components.themes import BOOTSTRAP
+
+try:
+    import fcntl
+except ImportError:     # Windows: background jobs then run in every process
+    fcntl = None
+
+from src.common.read_configs_in import apply_settings, read_database_config, read_optional_config
+from src.data.db_functions import configure_pool, configure_fetch, close_all_pools, get_pool_stats
+from src.data.cache import configure_cache, CACHE_SETTINGS, trade_cache
+from src.data.loader import start_cache_warm_up, configure_ranges
+from src.data.async_db import configure_async, close_async_pools
+from src.data.pnl import configure_pnl, start_pnl_updater, stop_pnl_updater, PNL_SETTINGS
+from src.data.prefetch import configure_prefetch, shutdown_prefetcher, get_prefetch_stats
+from src.utils.figure_cache import configure_figure_cache, get_figure_cache_stats
+from src.utils.metrics import configure_metrics, instrument_app, registry, METRICS_SETTINGS
+from src.utils.downsample import configure_lod
+from src.utils.indicators import configure_indicators, indicator_cache
+from src.utils.resample import configure_resample
+from src.utils.background import configure_background, background_enabled, BACKGROUND_SETTINGS
+from src.uicomponents.trades_table import configure_table
+from src.uicomponents.layout import create_layout
+from src.uicomponents.callbacks import trade_callbacks
+
+# The Dash app, for the development server (main.py) and for multi-process
+# serving with gunicorn (wsgi.py, gunicorn.conf.py). Every worker process builds
+# its own app, pools and threads; what they share is on disk: the figure cache,
+# the background callback jobs (utils.background) and, with [cache]
+# shared_directory or background callbacks on, the trade data cache.
+# The background jobs (cache warm-up, P&L updates) run in one process only: the
+# one holding an exclusive lock on lock_file. When it exits, the lock passes to
+# another worker, which starts them in turn.
+
+# assets/ next to main.py, wherever the server process was started from
+ASSETS_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+SERVER_SETTINGS = {
+    "bind": "127.0.0.1:8050",
+    "workers": 4,                       # gunicorn worker processes
+    "threads": 4,                       # request threads per worker
+    "timeout": 120.0,                   # seconds before a silent worker is restarted
+    "lock_file": ".tradeviewer.lock",   # elects the process that runs the background jobs
+}
+
+
+def configure_server(**settings) -> None:
+    """Override SERVER_SETTINGS, e.g. from the optional [server] section of database.ini."""
+    apply_settings(SERVER_SETTINGS, "server", **settings)
+
+
+def configure(filename: str = "database.ini") -> dict:
+    """Apply every optional section of filename, return the [postgresql] connection parameters."""
+    database_config = read_database_config(filename=filename, section="postgresql")
+    configure_pool(**read_optional_config(filename=filename, section="pool"))
+    configure_cache(**read_optional_config(filename=filename, section="cache"))
+    configure_fetch(**read_optional_config(filename=filename, section="fetch"))
+    configure_figure_cache(**read_optional_config(filename=filename, section="figure_cache"))
+    configure_prefetch(**read_optional_config(filename=filename, section="prefetch"))
+    configure_async(**read_optional_config(filename=filename, section="async"))
+    configure_lod(**read_optional_config(filename=filename, section="lod"))
+    configure_ranges(**read_optional_config(filename=filename, section="ranges"))
+    configure_metrics(**read_optional_config(filename=filename, section="metrics"))
+    configure_table(**read_optional_config(filename=filename, section="table"))
+    configure_indicators(**read_optional_config(filename=filename, section="indicators"))
+    configure_resample(**read_optional_config(filename=filename, section="resample"))
+    configure_pnl(**read_optional_config(filename=filename, section="pnl"))
+    configure_server(**read_optional_config(filename=filename, section="server"))
+    configure_background(**read_optional_config(filename=filename, section="background"))
+    if background_enabled() and not CACHE_SETTINGS["shared_directory"]:
+        # Background jobs run in their own processes: share the trade data they load
+        # through pickle files, as [cache] shared_directory would
+        configure_cache(shared_directory=os.path.join(BACKGROUND_SETTINGS["directory"], "trade_cache"))
+    return database_config
+
+
+# --- Background jobs ---
+
+_lock_file = None
+
+
+def _start_jobs(database_config) -> None:
+    if CACHE_SETTINGS["warm_up"]:
+        start_cache_warm_up(database_config, CACHE_SETTINGS["warm_up"])
+    if PNL_SETTINGS["interval"] > 0:
+        start_pnl_updater(database_config, PNL_SETTINGS["interval"])
+
+
+def _start_jobs_when_elected(database_config) -> None:
+    """Block until this process holds lock_file, then start the jobs. The lock is held until exit."""
+    global _lock_file
+    try:
+        lock_file = open(SERVER_SETTINGS["lock_file"], "a")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+    except OSError as e:
+        print(f"Error locking {SERVER_SETTINGS['lock_file']}, not running background jobs: {e}")
+        return
+    _lock_file = lock_file
+    _start_jobs(database_config)
+
+
+def start_background_jobs(database_config) -> None:
+    """Start the background jobs now, or once this process is elected (see SERVER_SETTINGS["lock_file"])."""
+    if not (CACHE_SETTINGS["warm_up"] or PNL_SETTINGS["interval"] > 0):
+        return
+    if fcntl is None:
+        _start_jobs(database_config)
+        return
+    threading.Thread(
+        target=_start_jobs_when_elected, args=(database_config,), name="background-jobs", daemon=True
+    ).start()
+
+
+# --- App ---
+
+def create_app(filename: str = "database.ini") -> Dash:
+    """Configure everything from filename and build the Dash app; app.server is the WSGI app."""
+    database_config = configure(filename)
+    start_background_jobs(database_config)
+
+    # Dash app
+    app = Dash(__name__, assets_folder=ASSETS_FOLDER, external_stylesheets=[BOOTSTRAP])
+    app.title = "Tradeviewer Dashboard"
+
+    # Layout
+    app.layout = create_layout(app, database_config)
+
+    # Register all callbacks
+    trade_callbacks.register_callbacks(app, database_config)
+
+    # Performance metrics on /metrics (after all callbacks are registered)
+    if METRICS_SETTINGS["enabled"]:
+        instrument_app(app)
+        registry.add_stats("tradeviewer_pool", get_pool_stats)
+        registry.add_stats("tradeviewer_trade_cache", trade_cache.get_stats)
+        registry.add_stats("tradeviewer_prefetch", get_prefetch_stats)
+        registry.add_stats("tradeviewer_figure_cache", get_figure_cache_stats)
+        registry.add_stats("tradeviewer_indicators", indicator_cache.get_stats)
+    return app
+
+
+def shutdown() -> None:
+    """Stop the background threads and close the pools of this process."""
+    stop_pnl_updater()
+    shutdown_prefetcher()
+    close_async_pools()
+    close_all_pools()
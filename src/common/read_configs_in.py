@@ -20,6 +20,34 @@ def read_database_config(filename,section):
     return db
 
 
+# ✅ Optional ini section (e.g. [pool]) -> empty dict when missing
+def read_optional_config(filename, section):
+    """
+    Same as read_database_config, but a missing section is not an error.
+    Comments may follow a value on the same line ("debug_panel = true  # ...").
+    """
+    parser = ConfigParser(inline_comment_prefixes=("#", ";"))
+    parser.read(filename)
+    if not parser.has_section(section):
+        return {}
+    return dict(parser.items(section))
+
+
+# ✅ Apply overrides (e.g. an optional section) to a module's *_SETTINGS dict
+def apply_settings(settings_dict, section, **overrides):
+    """
+    Cast every value to the type of its default and store it in settings_dict.
+    Booleans accept 1/true/yes/on (anything else is False), unknown keys raise.
+    section only names the settings in the error message.
+    """
+    for key, value in overrides.items():
+        if key not in settings_dict:
+            raise Exception(f"Unknown {section} setting '{key}'.")
+        default = settings_dict[key]
+        if isinstance(default, bool):
+            value = str(value).strip().lower() in ("1", "true", "yes", "on")
+        settings_dict[key] = type(default)(value)
+
 
 # ✅ Optional: Project-level JSON config
 def read_project_config(config_file):
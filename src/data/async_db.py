@@ -0,0 +1,176 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+
+try:
+    import psycopg
+    from psycopg_pool import AsyncConnectionPool
+except ImportError:     # optional: only needed with [async] enabled = true
+    psycopg = None
+    AsyncConnectionPool = None
+
+from src.common.read_configs_in import apply_settings
+from src.utils import metrics
+
+# asyncio data access on a dedicated event loop thread.
+# Queries of one request run concurrently on their own pooled connections
+# (asyncio.gather), so a slow marketdataintrad query no longer serializes the
+# others, and the Dash worker thread only waits for the slowest one. Every query
+# carries a timeout: statement_timeout on the server plus asyncio.wait_for on the
+# client, which cancels the query when it expires. Callbacks use the sync facade
+# (fetch_values) and never see the event loop.
+
+ASYNC_SETTINGS = {
+    "enabled": False,
+    "min_size": 1,
+    "max_size": 8,
+    "timeout": 15.0,        # seconds per query
+}
+
+
+class AsyncQueryTimeout(Exception):
+    pass
+
+
+# --- Event loop thread ---
+
+_loop = None
+_loop_lock = threading.Lock()
+_pools = {}
+_inherited_pools = []
+
+
+def _forget_loop_in_child() -> None:
+    """A forked child has no loop thread: start over, leaving the parent's connections alone."""
+    global _loop, _loop_lock
+    _inherited_pools.extend(_pools.values())
+    _pools.clear()
+    _loop, _loop_lock = None, threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_loop_in_child)
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_loop.run_forever, name="async-db", daemon=True)
+            thread.start()
+        return _loop
+
+
+def run_sync(coro, timeout: float = None):
+    """
+    Run coro on the data loop and block until it finishes. When timeout expires
+    the coroutine is cancelled (which cancels its queries) and AsyncQueryTimeout raised.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise AsyncQueryTimeout(f"Query batch exceeded {timeout}s and was cancelled.")
+
+
+# --- Pool ---
+
+def _conninfo(database_config: dict) -> str:
+    params = dict(database_config)
+    # psycopg2 accepts "database", libpq (and psycopg 3) only "dbname"
+    if "database" in params:
+        params["dbname"] = params.pop("database")
+    return psycopg.conninfo.make_conninfo(**params)
+
+
+async def _get_pool(database_config: dict):
+    """One AsyncConnectionPool per distinct connection config, opened on first use."""
+    if psycopg is None:
+        raise Exception("The async data layer needs psycopg 3: pip install 'psycopg[binary]' psycopg-pool")
+    conninfo = _conninfo(database_config)
+    opening = _pools.get(conninfo)
+    if opening is None:
+        # Stored as a task, so concurrent first callers all wait for the same open()
+        async def open_pool():
+            pool = AsyncConnectionPool(
+                conninfo,
+                min_size=ASYNC_SETTINGS["min_size"],
+                max_size=ASYNC_SETTINGS["max_size"],
+                open=False,
+            )
+            await pool.open()
+            return pool
+        opening = _pools[conninfo] = asyncio.ensure_future(open_pool())
+    return await opening
+
+
+# --- Queries ---
+
+async def _fetch_value(pool, name: str, query: str, params, timeout: float):
+    """First column of the first row of query."""
+    async def run():
+        start = time.perf_counter()
+        try:
+            async with pool.connection() as conn:
+                async with conn.transaction():
+                    await conn.execute(f"SET LOCAL statement_timeout = {int(timeout * 1000)}")
+                    cur = await conn.execute(query, params)
+                    row = await cur.fetchone()
+        finally:
+            metrics.observe("tradeviewer_db_query_seconds", time.perf_counter() - start, statement=f"async {name}")
+        return row[0] if row else None
+
+    try:
+        return await asyncio.wait_for(run(), timeout)
+    except asyncio.TimeoutError:
+        raise AsyncQueryTimeout(f"Query exceeded {timeout}s and was cancelled.")
+
+
+async def gather_values(database_config: dict, queries: dict, timeout: float = None) -> dict:
+    """
+    Run {name: (query, params)} concurrently. Returns {name: value}; a query that
+    failed or timed out maps to its exception so the other results stay usable.
+    """
+    timeout = timeout or ASYNC_SETTINGS["timeout"]
+    pool = await _get_pool(database_config)
+    results = await asyncio.gather(
+        *(_fetch_value(pool, name, query, params, timeout) for name, (query, params) in queries.items()),
+        return_exceptions=True,
+    )
+    return dict(zip(queries, results))
+
+
+def fetch_values(database_config: dict, queries: dict, timeout: float = None) -> dict:
+    """Sync facade of gather_values for use inside Dash callbacks."""
+    timeout = timeout or ASYNC_SETTINGS["timeout"]
+    # Small grace period so per-query timeouts are reported before the batch one
+    return run_sync(gather_values(database_config, queries, timeout), timeout + 1.0)
+
+
+# --- Configuration / shutdown ---
+
+def configure_async(**settings) -> None:
+    """Override ASYNC_SETTINGS, e.g. from the optional [async] section of database.ini."""
+    apply_settings(ASYNC_SETTINGS, "async", **settings)
+
+
+def close_async_pools() -> None:
+    """Close the async pools and stop the loop thread."""
+    global _loop
+    if _loop is None:
+        return
+
+    async def close():
+        for opening in _pools.values():
+            await (await opening).close()
+        _pools.clear()
+
+    try:
+        run_sync(close(), 10.0)
+    except Exception as e:
+        print(f"Error closing async pools: {e}")
+    _loop.call_soon_threadsafe(_loop.stop)
+    _loop = None
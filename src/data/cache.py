@@ -0,0 +1,242 @@
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.common.read_configs_in import apply_settings
+from src.utils.disk_lru import DiskLRU
+
+# In-process LRU/TTL cache for per-trade data.
+# Keys are (trade_id, table, kind): kind tells apart the differently shaped
+# results one table can produce (the bundle part vs the raw rows of a chart...).
+# Cached DataFrames are shared between callers, treat them as read-only.
+# With shared_directory set, entries are also written to that directory
+# (SharedCacheDirectory), so every worker process of a multi-process server
+# (wsgi.py) finds what another one loaded.
+
+CACHE_SETTINGS = {
+    "max_mb": 256.0,        # memory cap of all cached values
+    "ttl": 900.0,           # seconds before an entry is considered stale
+    "warm_up": 0,           # most recent trades to load in the background at startup
+    "shared_directory": "", # disk tier shared by worker processes, "" = off
+    "shared_max_mb": 2048.0,
+}
+
+MISSING = object()
+
+
+def estimate_bytes(value) -> int:
+    """Approximate memory footprint of a cached value."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_bytes(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+def is_empty(value) -> bool:
+    if isinstance(value, pd.DataFrame):
+        return value.empty
+    return value is None or value == {}
+
+
+class SharedCacheDirectory(DiskLRU):
+    """
+    Pickled cache entries in a directory that several processes share, one file
+    per key named {trade_id}_{table}_{digest of the key}.pkl (see utils.disk_lru).
+    The mtime is the time the entry was stored, for the TTL and for evicting the
+    oldest entries past max_bytes.
+    Only point it at a directory no one else can write to: entries are unpickled.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        super().__init__(directory, max_bytes, ".pkl")
+
+    def _prefix(self, trade_id, table) -> str:
+        return f"{trade_id}_{table}_"
+
+    def path(self, key) -> str:
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest()
+        return os.path.join(self.directory, f"{self._prefix(key[0], key[1])}{digest}.pkl")
+
+    def stamp(self, key, ttl: float):
+        """mtime_ns of the fresh file of key, or None."""
+        try:
+            mtime_ns = os.stat(self.path(key)).st_mtime_ns
+        except OSError:
+            return None
+        return mtime_ns if time.time() - mtime_ns / 1e9 <= ttl else None
+
+    def get(self, key, ttl: float) -> tuple:
+        """(value, mtime_ns) of the fresh file of key, or (MISSING, None)."""
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+                if time.time() - mtime_ns / 1e9 > ttl:
+                    return MISSING, None
+                return pickle.load(f), mtime_ns
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return MISSING, None
+
+    def put(self, key, value):
+        """Write value, return the mtime_ns of the new file (None on errors)."""
+        path = self.path(key)
+        try:
+            self._write(path, lambda f: pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL))
+            mtime_ns = os.stat(path).st_mtime_ns
+        except (OSError, pickle.PicklingError) as e:
+            print(f"Error writing shared cache: {e}")
+            return None
+        self._evict()
+        return mtime_ns
+
+    def invalidate(self, trade_id, tables=None) -> None:
+        prefixes = (f"{trade_id}_",) if tables is None \
+            else tuple(self._prefix(trade_id, table) for table in tables)
+        for entry in self._scan():
+            if entry.name.startswith(prefixes):
+                self._remove(entry.path)
+
+    def clear(self) -> None:
+        for entry in self._scan():
+            self._remove(entry.path)
+
+
+class TradeDataCache:
+    """
+    Memory-bounded LRU cache with a time-to-live.
+    The least recently used entries are evicted once max_bytes is exceeded.
+    With a shared SharedCacheDirectory, memory misses are looked up there and
+    puts are written through. A memory hit is only used while its file is
+    unchanged, so an invalidation or newer value from another process wins.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, shared: SharedCacheDirectory = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.shared = shared
+        self._entries = OrderedDict()   # key -> (value, nbytes, stored_at, shared file mtime_ns)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0, "shared_hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0,
+        }
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[2] > self.ttl:
+                self._drop(key)
+                self._stats["expirations"] += 1
+                entry = None
+
+        if entry is not None and self._is_current(key, entry):
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+            return entry[0]
+
+        if self.shared is not None:
+            value, mtime_ns = self.shared.get(key, self.ttl)
+            if value is not MISSING:
+                self._put_memory(key, value, mtime_ns)
+                with self._lock:
+                    self._stats["shared_hits"] += 1
+                return value
+
+        with self._lock:
+            if entry is not None and self._entries.get(key) is entry:
+                self._drop(key)
+            self._stats["misses"] += 1
+        return MISSING
+
+    def _is_current(self, key, entry) -> bool:
+        """A memory entry is current unless its shared file changed (or went) since."""
+        return self.shared is None or entry[3] is None or self.shared.stamp(key, self.ttl) == entry[3]
+
+    def __contains__(self, key) -> bool:
+        """Fresh entry present? Unlike get() this neither counts nor refreshes LRU order."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[2] <= self.ttl and self._is_current(key, entry):
+            return True
+        return self.shared is not None and self.shared.stamp(key, self.ttl) is not None
+
+    def put(self, key, value) -> None:
+        mtime_ns = self.shared.put(key, value) if self.shared is not None else None
+        self._put_memory(key, value, mtime_ns)
+
+    def _put_memory(self, key, value, mtime_ns) -> None:
+        nbytes = estimate_bytes(value)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, nbytes, time.monotonic(), mtime_ns)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, trade_id, tables=None) -> int:
+        """Drop the entries of trade_id, optionally only those of the given tables."""
+        with self._lock:
+            keys = [
+                k for k in self._entries
+                if k[0] == trade_id and (tables is None or k[1] in tables)
+            ]
+            for key in keys:
+                self._drop(key)
+            self._stats["invalidations"] += len(keys)
+        if self.shared is not None:
+            self.shared.invalidate(trade_id, tables)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.shared is not None:
+            self.shared.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+        lookups = stats["hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["shared_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _drop(self, key):
+        _, nbytes, _, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+
+
+trade_cache = TradeDataCache(
+    max_bytes=int(CACHE_SETTINGS["max_mb"] * 1024 * 1024),
+    ttl=CACHE_SETTINGS["ttl"],
+)
+# A forked child (background callback job) must not inherit a lock held by another thread
+os.register_at_fork(after_in_child=lambda: setattr(trade_cache, "_lock", threading.Lock()))
+
+
+def configure_cache(**settings) -> None:
+    """Override CACHE_SETTINGS, e.g. from the optional [cache] section of database.ini."""
+    apply_settings(CACHE_SETTINGS, "cache", **settings)
+    trade_cache.max_bytes = int(CACHE_SETTINGS["max_mb"] * 1024 * 1024)
+    trade_cache.ttl = CACHE_SETTINGS["ttl"]
+    trade_cache.shared = SharedCacheDirectory(
+        CACHE_SETTINGS["shared_directory"], int(CACHE_SETTINGS["shared_max_mb"] * 1024 * 1024)
+    ) if CACHE_SETTINGS["shared_directory"] else None
+
@@ -1,211 +1,487 @@
+import functools
+import io
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
 import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
 import pandas as pd
 
-# Return connection and cursor
-def get_connection_and_cursor(database_config):
-    """Create and return a database connection and cursor."""
-    conn = psycopg2.connect(**database_config)
-    if not conn:
-        raise Exception("Failed to connect to database.")
-    cur = conn.cursor()
-    return conn, cur
+from src.common.read_configs_in import apply_settings
+from src.data.cache import trade_cache
+from src.data.table_query import build_where, build_order_by
+from src.utils import metrics
 
+# --- Connection pool ---
 
-# Data fetch codes
+POOL_SETTINGS = {
+    "max_size": 8,          # upper limit of open connections per database
+    "max_idle": 300.0,      # seconds an idle connection may sit before it is recycled
+    "ping_after": 10.0,     # idle seconds after which a borrowed connection gets a SELECT 1
+    "timeout": 30.0,        # seconds to wait for a free connection before giving up
+}
 
-def fetch_marketdata(trade_id: int,cursor,table_name: str) -> pd.DataFrame:
-    try:
 
-        query = f'SELECT * FROM "{table_name}" WHERE "TradeId" = %s ORDER BY "Date";'
-        cursor.execute(query, (trade_id,))
-        rows = cursor.fetchall()
-        colnames = [desc[0] for desc in cursor.description]
-        df = pd.DataFrame(rows, columns=colnames)
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes free within the checkout timeout."""
 
-        if df.empty:
-            return df
 
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df = df.dropna(subset=['Date'])
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 connection pool shared by every callback of the process.
 
-        for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+    Connections are health-checked when borrowed, recycled after sitting idle
+    longer than max_idle and the pool never holds more than max_size of them.
+    """
 
-        df = df.dropna(subset=['Open', 'High', 'Low', 'Close', 'Volume'])
+    def __init__(self, database_config, max_size, max_idle, ping_after, timeout):
+        self.database_config = dict(database_config)
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+        self.timeout = timeout
+
+        self._cond = threading.Condition()
+        self._idle = []     # (conn, returned_at) pairs, most recently returned last
+        self._size = 0      # open connections, idle + borrowed
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "timeouts": 0,
+            "created": 0,
+            "recycled": 0,
+            "failed_health_checks": 0,
+        }
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, idle_for):
+        if conn.closed:
+            return False
+        if idle_for < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """Borrow a connection, opening a new one if the pool is below its size limit."""
+        started = time.monotonic()
+        waited = False
+        conn, returned_at = None, None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No database connection became free within {self.timeout}s."
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+        # Validate outside the lock so a slow ping does not block other borrowers
+        if conn is not None:
+            idle_for = time.monotonic() - returned_at
+            if idle_for > self.max_idle:
+                self._close(conn)
+                conn = None
+                self._bump("recycled")
+            elif not self._is_healthy(conn, idle_for):
+                self._close(conn)
+                conn = None
+                self._bump("failed_health_checks")
+
+        if conn is None:
+            try:
+                conn = psycopg2.connect(**self.database_config)
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            self._bump("created")
+            _setup_session(conn)
+
+        with self._cond:
+            self._stats["checkouts"] += 1
+            if waited:
+                self._stats["waits"] += 1
+                self._stats["wait_seconds"] += time.monotonic() - started
+        return conn
+
+    def putconn(self, conn):
+        """Return a borrowed connection. Broken connections are dropped instead of reused."""
+        if not conn.closed:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                self._close(conn)
+
+        with self._cond:
+            if conn.closed:
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            for conn, _ in self._idle:
+                self._close(conn)
+            self._size -= len(self._idle)
+            self._idle = []
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["size"] = self._size
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._size - len(self._idle)
+        return stats
+
+    def _bump(self, key):
+        with self._cond:
+            self._stats[key] += 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def configure_pool(**settings) -> None:
+    """
+    Override POOL_SETTINGS, e.g. from the optional [pool] section of database.ini.
+    Only affects pools created afterwards.
+    """
+    apply_settings(POOL_SETTINGS, "pool", **settings)
+
+
+def get_pool(database_config) -> ConnectionPool:
+    """Return the process-wide pool for database_config, creating it on first use."""
+    key = tuple(sorted(database_config.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(database_config, **POOL_SETTINGS)
+            _pools[key] = pool
+    return pool
+
+
+def get_pool_stats() -> list:
+    """Stats of every pool in this process, without credentials."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [
+        {"host": p.database_config.get("host"), "database": p.database_config.get("database"), **p.get_stats()}
+        for p in pools
+    ]
+
+
+def close_all_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
+
+
+# --- Forked processes ---
+# Background callback jobs (utils.background) run in a fork of the server
+# process. The child forgets the inherited pools without closing them: their
+# connections are the parent's sessions. It opens its own, which ask the server
+# to check every second that the client is still there, so the queries of a job
+# that gets killed (cancelled) stop instead of running to completion.
+
+# Statements run on every new pooled connection; failures are ignored (older servers)
+SESSION_SETUP = []
+CHILD_SESSION_SETUP = ["SET client_connection_check_interval = 1000;"]
+
+_inherited_pools = []   # kept referenced so no connection of the parent is ever closed here
+
+
+def _setup_session(conn) -> None:
+    for statement in SESSION_SETUP:
+        try:
+            with conn.cursor() as cur:
+                cur.execute(statement)
+            conn.commit()
+        except psycopg2.Error:
+            conn.rollback()
+
+
+def _forget_pools_in_child() -> None:
+    global _pools_lock
+    _inherited_pools.extend(_pools.values())
+    _pools.clear()
+    _pools_lock = threading.Lock()
+    SESSION_SETUP[:] = CHILD_SESSION_SETUP
+
+
+os.register_at_fork(after_in_child=_forget_pools_in_child)
+
+
+@contextmanager
+def pooled_connection_and_cursor(database_config):
+    """Borrow a connection and cursor from the pool and give them back when done."""
+    pool = get_pool(database_config)
+    if metrics.enabled():
+        start = time.perf_counter()
+        conn = pool.getconn()
+        metrics.observe("tradeviewer_db_connect_seconds", time.perf_counter() - start)
+        cur = conn.cursor(cursor_factory=InstrumentedCursor)
+    else:
+        conn = pool.getconn()
+        cur = conn.cursor()
+    try:
+        yield conn, cur
+    finally:
+        cur.close()
+        pool.putconn(conn)
+
+
+# --- Query metrics ---
+# With metrics enabled, pooled cursors time every statement. Statements are
+# labelled by verb and first table ("select intraday") so the label set stays small.
+
+_TABLE_PATTERN = re.compile(r'\b(?:FROM|INTO|UPDATE|JOIN)\s+"?(\w+)', re.IGNORECASE)
+
+
+def _query_label(query) -> str:
+    text = query if isinstance(query, str) else query.decode() if isinstance(query, bytes) else ""
+    words = text.split(None, 1)
+    if not words:
+        return "other"
+    verb = words[0].lower()
+    table = _TABLE_PATTERN.search(text)
+    return f"{verb} {table.group(1)}" if table else verb
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """Cursor recording execute / fetch / COPY durations, rows and bytes in src.utils.metrics."""
+
+    _label = "other"
+
+    def execute(self, query, vars=None):
+        self._label = _query_label(query)
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            metrics.observe("tradeviewer_db_query_seconds", time.perf_counter() - start, statement=self._label)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        metrics.observe("tradeviewer_db_fetch_seconds", time.perf_counter() - start, statement=self._label)
+        metrics.observe("tradeviewer_db_rows", len(rows), statement=self._label)
+        return rows
+
+    def copy_expert(self, sql, file, size=8192):
+        label = _query_label(sql)
+        position = file.tell() if file.seekable() else 0
+        start = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            metrics.observe("tradeviewer_db_query_seconds", time.perf_counter() - start, statement=label)
+            if file.seekable():
+                metrics.observe("tradeviewer_db_copy_bytes", file.tell() - position, statement=label)
+
+
+# --- Row vs columnar fetch ---
+# "rows":     cursor.fetchall() -> list of tuples of Decimal / datetime -> DataFrame.
+# "columnar": COPY (SELECT <typed casts>) TO STDOUT as CSV, parsed by pandas' C reader
+#             straight into typed NumPy column buffers. No per-row Python objects.
+# Both produce the same frames; flip FETCH_SETTINGS["mode"] to compare them.
+
+FETCH_SETTINGS = {
+    "mode": "columnar",
+    "backend": "postgres",      # "arrow": per-trade fetches read the offline mirror, see src/data/mirror.py
+    "mirror_dir": "mirror",
+}
+
+# pandas' C parser: the pyarrow engine is only faster for very large results
+# and adds several ms of setup to every small one
+CSV_ENGINE = "c"
+
+FLOAT_OIDS = {700, 701, 1700}          # float4, float8, numeric -> float8
+DATETIME_OIDS = {1082, 1114, 1184}     # date, timestamp, timestamptz
+TIME_OIDS = {1083}                     # time of day
+
+_column_types = {}
+
+
+def configure_fetch(**settings) -> None:
+    """Override FETCH_SETTINGS, e.g. from the optional [fetch] section of database.ini."""
+    apply_settings(FETCH_SETTINGS, "fetch", **settings)
+    if FETCH_SETTINGS["mode"] not in ("rows", "columnar"):
+        raise Exception(f"Fetch mode must be 'rows' or 'columnar', got '{FETCH_SETTINGS['mode']}'.")
+    if FETCH_SETTINGS["backend"] not in ("postgres", "arrow"):
+        raise Exception(f"Fetch backend must be 'postgres' or 'arrow', got '{FETCH_SETTINGS['backend']}'.")
+
+
+def use_mirror() -> bool:
+    """True when per-trade data comes from the offline Arrow mirror instead of SQL."""
+    return FETCH_SETTINGS["backend"] == "arrow"
+
+
+def _query_column_types(cursor, query: str, params) -> list:
+    """(name, type oid) of the query's columns, probed once with LIMIT 0 and cached."""
+    if query not in _column_types:
+        cursor.execute(f"SELECT * FROM ({query.strip().rstrip(';')}) q LIMIT 0;", params)
+        _column_types[query] = [(desc.name, desc.type_code) for desc in cursor.description]
+    return _column_types[query]
+
+
+def _timed_frame(mode: str):
+    """Record the duration and result size of a DataFrame builder when metrics are on."""
+    def decorator(build):
+        @functools.wraps(build)
+        def wrapper(*args):
+            if not metrics.enabled():
+                return build(*args)
+            start = time.perf_counter()
+            df = build(*args)
+            metrics.observe("tradeviewer_dataframe_seconds", time.perf_counter() - start, mode=mode)
+            metrics.observe("tradeviewer_dataframe_bytes", int(df.memory_usage(index=False).sum()), mode=mode)
+            return df
+        return wrapper
+    return decorator
 
-        return df
 
-    except Exception as e:
-        print(f"Error fetching data for TradeId {trade_id}: {e}")
-        return pd.DataFrame()
+def _time_objects(values: pd.Series) -> pd.Series:
+    """'HH:MM:SS[.ffffff]' strings -> datetime.time, the type psycopg2 returns."""
+    return (pd.Timestamp(0) + pd.to_timedelta(values, errors='coerce')).dt.time
 
-def fetch_trade_info(trade_id: int, cursor, table_name: str) -> dict:
-    try:
-        query = f'''
-            SELECT "Symbol", "Date", "Setup", "Rating"
-            FROM "{table_name}"
-            WHERE "TradeId" = %s
-            LIMIT 1;
-        '''
-        cursor.execute(query, (trade_id,))
-        result = cursor.fetchone()
-
-        if result:
-            symbol, date, setup, rating = result
-            return {
-                "Symbol": symbol,
-                "Date": pd.to_datetime(date),
-                "Setup": setup,
-                "Rating": rating
-            }
-        else:
-            return {}
 
-    except Exception as e:
-        print(f"Error fetching trade info for TradeId {trade_id}: {e}")
-        return {}
+def _copy_frame(cursor, query: str, params) -> pd.DataFrame:
+    columns = _query_column_types(cursor, query, params)
+    casts = ", ".join(
+        f'"{name}"::float8 AS "{name}"' if oid in FLOAT_OIDS else f'"{name}"'
+        for name, oid in columns
+    )
+    # A plain projection over the subquery keeps its ORDER BY
+    inner = cursor.mogrify(query.strip().rstrip(';'), params).decode()
+    buf = io.BytesIO()
+    cursor.copy_expert(f"COPY (SELECT {casts} FROM ({inner}) q) TO STDOUT WITH (FORMAT csv, HEADER true)", buf)
+    buf.seek(0)
+    return _csv_frame(buf, columns)
 
-def fetch_intraday_data(trade_id: int, cursor, table_name: str) -> pd.DataFrame:
-    try:
-        query = f'SELECT * FROM "{table_name}" WHERE "TradeId" = %s ORDER BY "Time";'
-        cursor.execute(query, (trade_id,))
-        rows = cursor.fetchall()
-        colnames = [desc[0] for desc in cursor.description]
-        df = pd.DataFrame(rows, columns=colnames)
 
-        if df.empty:
-            return df
+@_timed_frame("columnar")
+def _csv_frame(buf, columns) -> pd.DataFrame:
+    df = pd.read_csv(
+        buf,
+        engine=CSV_ENGINE,
+        dtype={name: "float64" for name, oid in columns if oid in FLOAT_OIDS},
+        keep_default_na=False,
+        na_values=[""],
+    )
+    for name, oid in columns:
+        if oid in DATETIME_OIDS:
+            df[name] = pd.to_datetime(df[name], errors='coerce')
+        elif oid in TIME_OIDS and df[name].dtype == object:
+            df[name] = _time_objects(df[name].astype(str))
+    return df
 
-        df['Time'] = pd.to_datetime(df['Time'], errors='coerce')
-        df = df.dropna(subset=['Time'])
 
-        # List of columns to convert to numeric, including VWAP and EMA9
-        numeric_cols = ['Open', 'High', 'Low', 'Close', 'Volume', 'VWAP', 'EMA9','Relatr']
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+def read_frame(cursor, query: str, params, mode: str = None) -> pd.DataFrame:
+    """Run query and return its result as a DataFrame using the configured fetch mode."""
+    if (mode or FETCH_SETTINGS["mode"]) == "columnar":
+        return _copy_frame(cursor, query, params)
 
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    colnames = [desc[0] for desc in cursor.description]
+    return _rows_frame(rows, colnames)
 
-        return df
 
-    except Exception as e:
-        print(f"Error fetching intraday data for TradeId {trade_id}: {e}")
-        return pd.DataFrame()
+@_timed_frame("rows")
+def _rows_frame(rows, colnames) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=colnames)
 
-def fetch_relative_volume(trade_id: int, cursor) -> pd.DataFrame:
-    """
-    Given a trade_id, fetch the Symbol and Date from trades table,
-    then query marketdatad for RelativeVolume where Symbol and Date match.
-    Returns a DataFrame with the relevant data.
-    """
-    try:
-        # Step 1: Get Symbol and Date from trades
-        query_trade = 'SELECT "Symbol", "Date" FROM "trades" WHERE "TradeId" = %s LIMIT 1;'
-        cursor.execute(query_trade, (trade_id,))
-        result = cursor.fetchone()
-        
-        if not result:
-            return pd.DataFrame()  # No trade found
-        
-        symbol, date = result
-        
-        # Step 2: Query marketdatad using Symbol and Date for RelativeVolume
-        query_marketdatad = '''
-            SELECT "Date", "RelativeVolume" 
-            FROM "marketdatad" 
-            WHERE "Symbol" = %s AND "Date" = %s
-            ORDER BY "Date"
-            LIMIT 1;
-        '''
-        cursor.execute(query_marketdatad, (symbol, date))
-        rows = cursor.fetchall()
-        colnames = [desc[0] for desc in cursor.description]
-        
-        df = pd.DataFrame(rows, columns=colnames)
-        
-        # Convert columns to proper types
-        if not df.empty:
-            df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-            df['RelativeVolume'] = pd.to_numeric(df['RelativeVolume'], errors='coerce')
-            df = df.dropna(subset=['Date', 'RelativeVolume'])
-        
-        return df
-    
-    except Exception as e:
-        print(f"Error fetching RelativeVolume for TradeId {trade_id}: {e}")
-        return pd.DataFrame()
 
-def fetch_marketdata30mins(trade_id: int, cursor,table_name:str) -> pd.DataFrame:
-    try:
-        query = f'''
-            SELECT "Symbol", "Date", "Open", "High", "Low", "Close", "Volume", "EMA65", "TradeId"
-            FROM "{table_name}"
-            WHERE "TradeId" = %s
-            ORDER BY "Date";
-        '''
-        cursor.execute(query, (trade_id,))
-        rows = cursor.fetchall()
-        colnames = [desc[0] for desc in cursor.description]
-        df = pd.DataFrame(rows, columns=colnames)
+# --- Trades listing with server-side paging ---
 
-        if df.empty:
-            return df
+# Listing columns used for ordering / change tracking only, never shown in the table
+HIDDEN_LISTING_COLUMNS = ["RvolDate", "RowVersion"]
 
-        # Parse timestamp
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df = df.dropna(subset=['Date'])
+# What the listing queries find in the schema (summary tables, columns) is cached
+# per database and looked up again once SCHEMA_RECHECK_SECONDS old, so objects
+# added by python -m src.data.schema apply show up without restarting the app.
+SCHEMA_RECHECK_SECONDS = 30.0
 
-        # Convert price and volume columns
-        for col in ['Open', 'High', 'Low', 'Close', 'Volume','EMA65']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+_schema_checks = {}
 
-        return df
 
-    except Exception as e:
-        print(f"Error fetching 30-min data for TradeId {trade_id}: {e}")
-        return pd.DataFrame()
+def _schema_check(cursor, key: tuple, query: str, params=None):
+    """First column of the first row of query, cached under (dsn,) + key."""
+    key = (cursor.connection.dsn,) + key
+    cached = _schema_checks.get(key)
+    if cached is None or time.monotonic() - cached[1] > SCHEMA_RECHECK_SECONDS:
+        cursor.execute(query, params)
+        cached = (cursor.fetchone()[0], time.monotonic())
+        _schema_checks[key] = cached
+    return cached[0]
 
-def fetch_trade_executions(trade_info: dict, cursor, table_name: str) -> pd.DataFrame:
 
-    try:
-        symbol = trade_info.get("Symbol")
-        trade_date = trade_info.get("Date")
-
-        if not symbol or not trade_date:
-            print(" Missing Symbol or Date in trade_info.")
-            return pd.DataFrame()
-
-        # Convert date to string in YYYYMMDD format (if it's a datetime object)
-        if isinstance(trade_date, pd.Timestamp):
-            trade_date_str = trade_date.strftime("%Y%m%d")
-        else:
-            trade_date_str = str(trade_date)
-
-        query = f"""
-            SELECT * FROM {table_name}
-            WHERE "Symbol" = %s AND "Date" = %s
-            ORDER BY "Time" ASC
-        """
+def has_rvol_summary(cursor) -> bool:
+    """True when the trade_latest_rvol summary (python -m src.data.schema apply) exists."""
+    return _schema_check(cursor, ("trade_latest_rvol",), "SELECT to_regclass('trade_latest_rvol') IS NOT NULL;")
 
-        cursor.execute(query, (symbol, trade_date_str))
-        rows = cursor.fetchall()
 
-        # Get column names
-        colnames = [desc[0] for desc in cursor.description]
+# trade_pnl columns shown in the trades listing (see src.data.pnl)
+PNL_LISTING_COLUMNS = ["RealizedPnL", "AvgEntry", "AvgExit", "MaxPosition", "HoldingMinutes"]
 
-        return pd.DataFrame(rows, columns=colnames)
 
-    except Exception as e:
-        print(f" Error fetching trade executions: {e}")
-        return pd.DataFrame()
-
-def fetch_trades_with_rvol(cursor, trades_table: str, marketdatad_table: str) -> pd.DataFrame:
-    query = f"""
-        SELECT
-            t.*,
-            m."RelativeVolume"
+def has_pnl_summary(cursor) -> bool:
+    """True when the trade_pnl summary (python -m src.data.schema apply) exists."""
+    return _schema_check(cursor, ("trade_pnl",), "SELECT to_regclass('trade_pnl') IS NOT NULL;")
+
+
+def trades_listing_sql(cursor, trades_table: str, marketdatad_table: str) -> str:
+    """
+    Trades with their latest RelativeVolume, as a subquery that can be filtered and paged.
+    Reads the trigger-maintained trade_latest_rvol table when it exists; otherwise
+    falls back to a LATERAL lookup of the newest marketdatad row per trade.
+    Adds the realized P&L columns when trade_pnl exists.
+    """
+    pnl_columns, pnl_join = "", ""
+    if has_pnl_summary(cursor):
+        pnl_columns = "".join(f', p."{c}"' for c in PNL_LISTING_COLUMNS)
+        pnl_join = 'LEFT JOIN trade_pnl p ON p."TradeId" = t."TradeId"'
+
+    if has_rvol_summary(cursor):
+        return f"""
+            SELECT t.*, r."RelativeVolume", r."Date" AS "RvolDate"{pnl_columns}
+            FROM {trades_table} t
+            JOIN trade_latest_rvol r ON r."TradeId" = t."TradeId"
+            {pnl_join}
+            WHERE r."RelativeVolume" > 0
+        """
+    return f"""
+        SELECT t.*, m."RelativeVolume", m."Date" AS "RvolDate"{pnl_columns}
         FROM {trades_table} t
         LEFT JOIN LATERAL (
             SELECT "RelativeVolume", "Date"
@@ -214,22 +490,144 @@ def fetch_trades_with_rvol(cursor, trades_table: str, marketdatad_table: str) ->
             ORDER BY m."Date" DESC
             LIMIT 1
         ) m ON TRUE
+        {pnl_join}
         WHERE m."RelativeVolume" > 0
-        ORDER BY m."Date" DESC;
     """
-    cursor.execute(query)
-    columns = [desc[0] for desc in cursor.description]
-    data = cursor.fetchall()
-    return pd.DataFrame(data, columns=columns)
-
-
-
-def update_trade_setup(trade_id: int, setup: str, cursor, conn) -> None:
-    query = 'UPDATE "trades" SET "Setup" = %s WHERE "TradeId" = %s;'
-    cursor.execute(query, (setup, trade_id))
-    conn.commit()
-  
-def update_trade_rating(trade_id: int, rating: int, cursor, conn) -> None:
-    query = 'UPDATE "trades" SET "Rating" = %s WHERE "TradeId" = %s;'
-    cursor.execute(query, (rating, trade_id))
-    conn.commit()
\ No newline at end of file
+
+
+_listing_columns = {}
+
+
+def fetch_trades_listing_columns(cursor, trades_table: str, marketdatad_table: str) -> list:
+    """Column names of the trades listing (what sorting and filtering may reference)."""
+    # Per shape of the listing, and looked up again like the schema checks (new trades columns)
+    key = (cursor.connection.dsn, trades_table, marketdatad_table, has_rvol_summary(cursor), has_pnl_summary(cursor))
+    cached = _listing_columns.get(key)
+    if cached is None or time.monotonic() - cached[1] > SCHEMA_RECHECK_SECONDS:
+        cursor.execute(f"SELECT * FROM ({trades_listing_sql(cursor, trades_table, marketdatad_table)}) listing LIMIT 0;")
+        columns = [desc[0] for desc in cursor.description if desc[0] not in HIDDEN_LISTING_COLUMNS]
+        cached = (columns, time.monotonic())
+        _listing_columns[key] = cached
+    return cached[0]
+
+
+def fetch_trades_page(cursor, trades_table: str, marketdatad_table: str,
+                      page_current: int, page_size: int, sort_by=None, filter_query: str = "") -> tuple:
+    """
+    One page of the trades listing plus the total row count for the same filter.
+    Returns (DataFrame, total_rows).
+    """
+    try:
+        columns = fetch_trades_listing_columns(cursor, trades_table, marketdatad_table)
+        listing = trades_listing_sql(cursor, trades_table, marketdatad_table)
+        where, params = build_where(filter_query, columns)
+        order_by = build_order_by(sort_by, columns, default='"RvolDate" DESC', tiebreaker="TradeId")
+
+        cursor.execute(f"SELECT count(*) FROM ({listing}) listing {where};", params)
+        total = cursor.fetchone()[0]
+
+        cursor.execute(
+            f"SELECT * FROM ({listing}) listing {where} {order_by} LIMIT %s OFFSET %s;",
+            params + [page_size, page_current * page_size],
+        )
+        colnames = [desc[0] for desc in cursor.description]
+        df = pd.DataFrame(cursor.fetchall(), columns=colnames).drop(columns=HIDDEN_LISTING_COLUMNS, errors="ignore")
+        return df, total
+
+    except Exception as e:
+        print(f"Error fetching trades page: {e}")
+        cursor.connection.rollback()
+        return pd.DataFrame(), 0
+
+
+# --- Change tracking (trades."RowVersion", see src.data.schema) ---
+
+def has_change_tracking(cursor, trades_table: str = "trades") -> bool:
+    """True when trades_table has the trigger-maintained "RowVersion" column."""
+    return _schema_check(
+        cursor, ("RowVersion", trades_table),
+        "SELECT EXISTS (SELECT 1 FROM information_schema.columns "
+        "WHERE table_name = %s AND column_name = 'RowVersion');",
+        (trades_table.strip('"'),),
+    )
+
+
+# xmin of the statement's snapshot: every transaction below it has finished
+TRADES_WATERMARK = "pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+
+
+def fetch_trades_version(cursor, trades_table: str) -> int:
+    """Watermark of trades_table: what a client has seen once it loaded the table after this call."""
+    cursor.execute(f"SELECT {TRADES_WATERMARK};")
+    return cursor.fetchone()[0]
+
+
+def fetch_trades_changes(cursor, trades_table: str, marketdatad_table: str,
+                         since: int, filter_query: str = "") -> tuple:
+    """
+    Trades inserted or updated at or after watermark since.
+    Returns (changed TradeIds, new watermark, DataFrame of the changed listing rows
+    that pass filter_query). Changed trades missing from the DataFrame dropped
+    out of the listing or the filter. Trades written by transactions that were
+    still running at since are returned again, changed or not.
+    """
+    try:
+        # Watermark and rows from the same snapshot
+        cursor.execute(
+            f'SELECT w.version, t."TradeId" FROM (SELECT {TRADES_WATERMARK} AS version) w '
+            f'LEFT JOIN {trades_table} t ON t."RowVersion" >= %s;', (since,)
+        )
+        changed = cursor.fetchall()
+        version = changed[0][0]
+        if changed[0][1] is None:
+            return [], version, pd.DataFrame()
+        trade_ids = [row[1] for row in changed]
+
+        columns = fetch_trades_listing_columns(cursor, trades_table, marketdatad_table)
+        listing = trades_listing_sql(cursor, trades_table, marketdatad_table)
+        where, params = build_where(filter_query, columns)
+        where = f'{where} AND "TradeId" = ANY(%s)' if where else 'WHERE "TradeId" = ANY(%s)'
+        cursor.execute(f"SELECT * FROM ({listing}) listing {where};", params + [trade_ids])
+        colnames = [desc[0] for desc in cursor.description]
+        df = pd.DataFrame(cursor.fetchall(), columns=colnames).drop(columns=HIDDEN_LISTING_COLUMNS, errors="ignore")
+        return trade_ids, version, df
+
+    except Exception as e:
+        print(f"Error fetching trades changes: {e}")
+        cursor.connection.rollback()
+        return [], since, pd.DataFrame()
+
+
+def update_trades_bulk(rows, cursor, conn) -> dict:
+    """
+    Apply (trade_id, setup, rating) tuples in one UPDATE ... FROM (VALUES ...) and
+    one commit. None leaves that field unchanged. Returns {trade_id: status}.
+    """
+    # One row per TradeId (the last one wins), as UPDATE ... FROM would pick arbitrarily
+    rows = list({int(trade_id): (int(trade_id), setup, rating) for trade_id, setup, rating in rows}.values())
+    results = {trade_id: "not found" for trade_id, _, _ in rows}
+    if not rows:
+        return results
+
+    query = '''
+        UPDATE "trades" AS t
+        SET "Setup" = COALESCE(v.setup, t."Setup"),
+            "Rating" = COALESCE(v.rating, t."Rating")
+        FROM (VALUES %s) AS v(trade_id, setup, rating)
+        WHERE t."TradeId" = v.trade_id
+        RETURNING t."TradeId";
+    '''
+    try:
+        updated = psycopg2.extras.execute_values(
+            cursor, query, rows, template="(%s::integer, %s::text, %s::integer)",
+            page_size=len(rows), fetch=True
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    for (trade_id,) in updated:
+        results[trade_id] = "updated"
+        trade_cache.invalidate(trade_id, ["trades"])
+    return results
@@ -0,0 +1,539 @@
+import threading
+
+import pandas as pd
+
+from src.common.read_configs_in import apply_settings
+from src.data.cache import MISSING, is_empty, trade_cache
+from src.data.db_functions import pooled_connection_and_cursor, read_frame, use_mirror, FETCH_SETTINGS
+from src.data import async_db, mirror
+from src.utils.indicators import add_indicators
+from src.utils.resample import resample_bars
+
+# One Fetch click used to query every table separately, once per chart
+# module. The bundle loads everything a trade view needs in a single statement:
+# every part is a scalar subquery that Postgres aggregates to JSON, so the whole
+# bundle comes back as one row in one round trip. Parts already in trade_cache
+# are left out of the statement. In the columnar fetch mode the (large) intraday
+# bars are streamed with COPY instead, see db_functions.read_frame.
+
+# part -> (source table, subquery). "t" is the trade row CTE.
+BUNDLE_PARTS = {
+    "trade": ("trades", '(SELECT row_to_json(t) FROM t)'),
+    "executions": ("executions", '''(SELECT json_agg(e ORDER BY e."Time")
+           FROM "executions" e JOIN t ON e."Symbol" = t."Symbol" AND e."Date" = t."Date")'''),
+    "daily": ("marketdatad", '''(SELECT json_agg(d ORDER BY d."Date")
+           FROM "marketdatad" d WHERE d."TradeId" = %(trade_id)s
+            AND (%(daily_days)s::int IS NULL OR d."Date" >= (SELECT "Date" FROM t) - %(daily_days)s::int
+                 AND d."Date" < (SELECT "Date" FROM t) + %(daily_days)s::int + 1))'''),
+    "min30": ("marketdata30mins", '''(SELECT json_agg(m ORDER BY m."Date")
+           FROM "marketdata30mins" m WHERE m."TradeId" = %(trade_id)s
+            AND (%(min30_days)s::int IS NULL OR m."Date" >= (SELECT "Date" FROM t) - %(min30_days)s::int
+                 AND m."Date" < (SELECT "Date" FROM t) + %(min30_days)s::int + 1))'''),
+    "intraday": ("marketdataintrad", '''(SELECT json_agg(i ORDER BY i."Date", i."Time")
+           FROM "marketdataintrad" i WHERE i."TradeId" = %(trade_id)s)'''),
+    "rvol": ("marketdatad", '''(SELECT r."RelativeVolume"
+           FROM "marketdatad" r JOIN t ON r."Symbol" = t."Symbol" AND r."Date" = t."Date"
+          LIMIT 1)'''),
+}
+
+
+# --- Viewport windows ---
+# With RANGE_SETTINGS["enabled"] the daily / 30-min parts only hold the bars within
+# N days of the trade date. The charts fetch further history with load_more_bars
+# when they are panned past the loaded range (see uicomponents/chart_ranges.py).
+
+RANGE_SETTINGS = {
+    "enabled": True,
+    "daily_days": 120,      # calendar days either side of the trade date
+    "min30_days": 7,
+    "daily_chunk": 120,     # bars per load_more_bars call
+    "min30_chunk": 65,
+}
+
+# part -> (table, window setting, chunk setting)
+RANGE_PARTS = {
+    "daily": ("marketdatad", "daily_days", "daily_chunk"),
+    "min30": ("marketdata30mins", "min30_days", "min30_chunk"),
+}
+
+
+def configure_ranges(**settings) -> None:
+    """Override RANGE_SETTINGS, e.g. from the optional [ranges] section of database.ini."""
+    apply_settings(RANGE_SETTINGS, "range", **settings)
+
+
+def bundle_params(trade_id: int) -> dict:
+    """Query parameters of the bundle statements; NULL window = full history."""
+    enabled = RANGE_SETTINGS["enabled"]
+    return {
+        "trade_id": trade_id,
+        "daily_days": RANGE_SETTINGS["daily_days"] if enabled else None,
+        "min30_days": RANGE_SETTINGS["min30_days"] if enabled else None,
+    }
+
+
+def _window(df: pd.DataFrame, part: str, trade_date) -> pd.DataFrame:
+    """Apply the bundle window of part to an already loaded frame (mirror backend)."""
+    if not RANGE_SETTINGS["enabled"] or part not in RANGE_PARTS or df.empty or trade_date is None:
+        return df
+    days = pd.Timedelta(days=RANGE_SETTINGS[RANGE_PARTS[part][1]])
+    trade_date = pd.Timestamp(trade_date).normalize()
+    dates = pd.to_datetime(df["Date"])
+    return df[(dates >= trade_date - days) & (dates < trade_date + days + pd.Timedelta(days=1))].reset_index(drop=True)
+
+
+# Parts streamed with COPY in the columnar fetch mode instead of being aggregated
+# to JSON. Only the intraday bars: multi-day 1-minute sets are where per-row
+# objects hurt, while the few hundred daily / 30-min rows are cheaper to keep
+# in the single JSON round trip than to pay a COPY round trip for.
+COLUMNAR_QUERIES = {
+    "intraday": 'SELECT * FROM "marketdataintrad" WHERE "TradeId" = %(trade_id)s ORDER BY "Date", "Time";',
+}
+
+
+def build_bundle_query(parts) -> str:
+    select_list = ",\n        ".join(f"{BUNDLE_PARTS[part][1]} AS {part}" for part in parts)
+    return f'''
+    WITH t AS (
+        SELECT * FROM "trades" WHERE "TradeId" = %(trade_id)s LIMIT 1
+    )
+    SELECT
+        {select_list};
+'''
+
+
+PRICE_COLS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def empty_bundle(trade_id: int) -> dict:
+    return {
+        "trade_id": trade_id,
+        "trade": {},
+        "executions": pd.DataFrame(),
+        "daily": pd.DataFrame(),
+        "min30": pd.DataFrame(),
+        "intraday": pd.DataFrame(),
+        "rvol": float("nan"),
+    }
+
+
+# --- JSON / COPY -> DataFrame conversion ---
+# JSON carries no types, so dates, times and numerics are restored here the same
+# way the fetch_* functions in db_functions do it. Frames from the columnar path
+# are already typed and pass through the same steps unchanged.
+
+def _frame(records) -> pd.DataFrame:
+    if isinstance(records, pd.DataFrame):
+        return records
+    return pd.DataFrame(records or [])
+
+def _to_numeric(df: pd.DataFrame, cols) -> pd.DataFrame:
+    for col in cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def _to_timestamp(dates: pd.Series, times: pd.Series) -> pd.Series:
+    """
+    Parse a Time column that may hold full timestamps or only time of day.
+    Time-of-day values ("09:31:00") are combined with the row's date.
+    """
+    if pd.api.types.is_datetime64_any_dtype(times):
+        return times
+    times = times.astype(str)
+    if times.str.contains(r'\d{4}-\d{2}-\d{2}', regex=True).all():
+        return pd.to_datetime(times, errors='coerce')
+    return pd.to_datetime(dates, errors='coerce').dt.normalize() + pd.to_timedelta(times, errors='coerce')
+
+
+def _daily_frame(records) -> pd.DataFrame:
+    df = _frame(records)
+    if df.empty:
+        return df
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df = df.dropna(subset=['Date'])
+    df = _to_numeric(df, PRICE_COLS + ['RelativeVolume'])
+    return df.dropna(subset=PRICE_COLS)
+
+
+def _min30_frame(records) -> pd.DataFrame:
+    df = _frame(records)
+    if df.empty:
+        return df
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df = df.dropna(subset=['Date'])
+    return _to_numeric(df, PRICE_COLS + ['EMA65'])
+
+
+def _intraday_frame(records) -> pd.DataFrame:
+    df = _frame(records)
+    if df.empty:
+        return df
+    df['Time'] = _to_timestamp(df['Date'], df['Time'])
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df = df.dropna(subset=['Time'])
+    df = _to_numeric(df, PRICE_COLS + ['VWAP', 'EMA9', 'Relatr'])
+    return df.dropna(subset=PRICE_COLS)
+
+
+def _executions_frame(records) -> pd.DataFrame:
+    df = _frame(records)
+    if df.empty:
+        return df
+    # Same python types psycopg2 returns for date / time columns
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce').dt.date
+    df['Time'] = (pd.Timestamp(0) + pd.to_timedelta(df['Time'].astype(str), errors='coerce')).dt.time
+    return _to_numeric(df, ['Price', 'AvgPrice', 'Quantity'])
+
+
+def _trade_dict(record) -> dict:
+    if not record:
+        return {}
+    trade = dict(record)
+    trade['Date'] = pd.to_datetime(trade.get('Date'))
+    return trade
+
+
+def _rvol_value(value) -> float:
+    return float(value) if value is not None else float("nan")
+
+
+PART_CONVERTERS = {
+    "trade": _trade_dict,
+    "executions": _executions_frame,
+    "daily": _daily_frame,
+    "min30": _min30_frame,
+    "intraday": _intraday_frame,
+    "rvol": _rvol_value,
+}
+
+
+def _cache_key(trade_id: int, part: str) -> tuple:
+    return (trade_id, BUNDLE_PARTS[part][0], f"bundle:{part}")
+
+
+def _cached_parts(trade_id: int) -> tuple:
+    """Bundle pre-filled from trade_cache, and the parts that still need a query."""
+    bundle = empty_bundle(trade_id)
+    missing = []
+    for part in BUNDLE_PARTS:
+        value = trade_cache.get(_cache_key(trade_id, part))
+        if value is MISSING:
+            missing.append(part)
+        else:
+            bundle[part] = value
+    return bundle, missing
+
+
+def _store_parts(bundle: dict, raw_parts: dict) -> None:
+    """Convert raw query results into the bundle and cache the non-empty ones."""
+    for part, raw in raw_parts.items():
+        value = PART_CONVERTERS[part](raw)
+        bundle[part] = value
+        if not is_empty(value):
+            trade_cache.put(_cache_key(bundle["trade_id"], part), value)
+
+
+# --- Public API ---
+
+def fetch_trade_bundle(trade_id: int, cursor) -> dict:
+    """
+    Load the trade row, executions, daily / 30-min / intraday bars and RVOL.
+    Cached parts are reused, the rest comes from one JSON query (plus a COPY
+    of the intraday bars in the columnar fetch mode).
+    """
+    bundle, missing = _cached_parts(trade_id)
+    if not missing:
+        return bundle
+
+    try:
+        params = bundle_params(trade_id)
+        raw_parts = {}
+
+        if FETCH_SETTINGS["mode"] == "columnar":
+            for part in [p for p in missing if p in COLUMNAR_QUERIES]:
+                raw_parts[part] = read_frame(cursor, COLUMNAR_QUERIES[part], params)
+
+        json_parts = [p for p in missing if p not in raw_parts]
+        if json_parts:
+            cursor.execute(build_bundle_query(json_parts), params)
+            raw_parts.update(zip(json_parts, cursor.fetchone()))
+
+        _store_parts(bundle, raw_parts)
+        return bundle
+
+    except Exception as e:
+        print(f"Error fetching trade bundle for TradeId {trade_id}: {e}")
+        # Leave the cursor usable for the next trade (cache warm-up, prefetch)
+        cursor.connection.rollback()
+        return empty_bundle(trade_id)
+
+
+def fetch_trade_bundle_concurrently(trade_id: int, database_config) -> dict:
+    """
+    Same bundle as fetch_trade_bundle, but every missing part is its own query and
+    the queries run concurrently on the async data layer. A part that fails or
+    times out stays empty instead of failing the whole bundle.
+    """
+    bundle, missing = _cached_parts(trade_id)
+    if not missing:
+        return bundle
+
+    params = bundle_params(trade_id)
+    queries = {part: (build_bundle_query([part]), params) for part in missing}
+    try:
+        results = async_db.fetch_values(database_config, queries)
+    except Exception as e:
+        print(f"Error fetching trade bundle for TradeId {trade_id}: {e}")
+        return bundle
+
+    raw_parts = {}
+    for part, raw in results.items():
+        if isinstance(raw, Exception):
+            print(f"Error fetching {part} for TradeId {trade_id}: {raw}")
+        else:
+            raw_parts[part] = raw
+    _store_parts(bundle, raw_parts)
+    return bundle
+
+
+def fetch_trade_bundle_from_mirror(trade_id: int) -> dict:
+    """Same bundle as fetch_trade_bundle, read from the offline Arrow mirror."""
+    bundle, missing = _cached_parts(trade_id)
+    if not missing:
+        return bundle
+
+    directory = FETCH_SETTINGS["mirror_dir"]
+    try:
+        trade = mirror.trade_row(directory, trade_id)
+        if not trade:
+            return bundle
+
+        raw_parts = {}
+        for part in missing:
+            if part == "trade":
+                raw_parts[part] = trade
+            elif part == "executions":
+                raw_parts[part] = mirror.read_partition(directory, "executions", trade["Date"], trade["Symbol"])
+            elif part == "rvol":
+                df = mirror.relative_volume(directory, trade_id)
+                raw_parts[part] = df["RelativeVolume"].iloc[0] if not df.empty else None
+            else:
+                df = mirror.read_trade_rows(directory, BUNDLE_PARTS[part][0], trade_id)
+                raw_parts[part] = _window(df, part, trade["Date"])
+
+        _store_parts(bundle, raw_parts)
+        return bundle
+
+    except Exception as e:
+        print(f"Error reading trade bundle for TradeId {trade_id} from the mirror: {e}")
+        return empty_bundle(trade_id)
+
+
+def is_bundle_cached(trade_id: int) -> bool:
+    """True when every part of the trade's bundle is in trade_cache."""
+    return all(_cache_key(trade_id, part) in trade_cache for part in BUNDLE_PARTS)
+
+
+# --- Resampled bars ---
+# Coarser bar sizes of the intraday chart are built from the 1-minute bars (see
+# utils.resample) and cached in trade_cache per bar size, so they are dropped
+# together with the bars when marketdataintrad is invalidated. Trades without
+# stored 30-min / daily bars get them from the 1-minute bars too, for the
+# sessions those cover. Resampled bars have no stored indicator columns, so
+# theirs are computed even with [indicators] enabled = false.
+
+def resampled_bars(trade_id: int, df_intraday: pd.DataFrame, bar_size: str) -> pd.DataFrame:
+    """df_intraday (1-minute bars) resampled to bar_size, cached per source frame."""
+    if bar_size == "1m" or df_intraday is None or df_intraday.empty:
+        return df_intraday
+    source = f"{len(df_intraday)}:{df_intraday['Time'].iloc[0]}:{df_intraday['Time'].iloc[-1]}"
+    key = (trade_id, "marketdataintrad", f"resample:{bar_size}:{source}")
+    df = trade_cache.get(key)
+    if df is MISSING:
+        df = resample_bars(df_intraday, bar_size)
+        trade_cache.put(key, df)
+    return df
+
+
+def intraday_bars(bundle: dict, bar_size: str) -> pd.DataFrame:
+    """Intraday bars of the bundle at bar_size, with their indicators."""
+    if bar_size == "1m":
+        return bundle["intraday"]
+    df = resampled_bars(bundle["trade_id"], bundle["intraday"], bar_size)
+    return add_indicators(df, bundle["trade_id"], "intraday", bar_size, force=True)
+
+
+def with_derived_parts(bundle: dict) -> dict:
+    """Bundle whose empty 30-min / daily parts are filled from its 1-minute bars."""
+    if bundle["intraday"].empty:
+        return bundle
+    bundle = dict(bundle)
+    for part, bar_size in (("min30", "30m"), ("daily", "daily")):
+        if bundle[part].empty:
+            df = resampled_bars(bundle["trade_id"], bundle["intraday"], bar_size)
+            df = df.drop(columns=["Date"]).rename(columns={"Time": "Date"})
+            bundle[part] = add_indicators(df, bundle["trade_id"], part, force=True)
+    return bundle
+
+
+def with_indicators(bundle: dict) -> dict:
+    """Bundle whose bar frames carry the indicator columns the charts show (see utils.indicators)."""
+    bundle = dict(bundle)
+    for part in ("daily", "min30", "intraday"):
+        bundle[part] = add_indicators(bundle[part], bundle["trade_id"], part)
+    return bundle
+
+
+def load_trade_bundle(trade_id: int, database_config) -> dict:
+    """
+    Load the bundle for trade_id from the mirror, the async data layer or a pooled
+    connection, with missing 30-min / daily bars derived from the 1-minute bars
+    and the indicators computed from its bars.
+    """
+    if use_mirror():
+        bundle = fetch_trade_bundle_from_mirror(trade_id)
+    elif async_db.ASYNC_SETTINGS["enabled"]:
+        bundle = fetch_trade_bundle_concurrently(trade_id, database_config)
+    else:
+        with pooled_connection_and_cursor(database_config) as (conn, cur):
+            bundle = fetch_trade_bundle(trade_id, cur)
+    return with_indicators(with_derived_parts(bundle))
+
+
+# --- Further history for panned charts ---
+
+def fetch_more_bars(trade_id: int, part: str, edge, direction: str, cursor) -> pd.DataFrame:
+    """
+    The next chunk of daily / 30-min bars of trade_id beyond edge (the first or last
+    loaded Date), direction "older" or "newer". Returned in ascending Date order.
+    Indicators of newer bars continue the series of the loaded ones; older bars
+    are computed on their own.
+    """
+    table_name, _, chunk_setting = RANGE_PARTS[part]
+    limit = RANGE_SETTINGS[chunk_setting]
+    older = direction == "older"
+
+    try:
+        if use_mirror():
+            df = mirror.read_trade_rows(FETCH_SETTINGS["mirror_dir"], table_name, trade_id)
+            if not df.empty:
+                dates = pd.to_datetime(df["Date"])
+                edge = pd.Timestamp(edge)
+                df = df[dates < edge].tail(limit) if older else df[dates > edge].head(limit)
+        else:
+            query = f'''
+                SELECT * FROM "{table_name}"
+                WHERE "TradeId" = %s AND "Date" {"<" if older else ">"} %s
+                ORDER BY "Date" {"DESC" if older else "ASC"}
+                LIMIT %s;
+            '''
+            df = read_frame(cursor, query, (trade_id, str(edge), limit))
+            if older:
+                df = df.iloc[::-1]
+
+        return add_indicators(PART_CONVERTERS[part](df.reset_index(drop=True)), trade_id, part)
+
+    except Exception as e:
+        print(f"Error fetching {direction} {part} bars for TradeId {trade_id}: {e}")
+        return pd.DataFrame()
+
+
+def load_more_bars(trade_id: int, part: str, edge, direction: str, database_config) -> pd.DataFrame:
+    """Borrow a pooled connection and run fetch_more_bars."""
+    if use_mirror():
+        return fetch_more_bars(trade_id, part, edge, direction, None)
+    with pooled_connection_and_cursor(database_config) as (conn, cur):
+        return fetch_more_bars(trade_id, part, edge, direction, cur)
+
+
+# --- Many trades at once (overlay view) ---
+# One "TradeId" = ANY(%s) query per table regardless of how many trades are
+# selected; rows are split per trade in memory. Trades already cached are skipped.
+
+OVERLAY_QUERIES = {
+    "intraday": '''
+        SELECT * FROM "marketdataintrad"
+        WHERE "TradeId" = ANY(%(trade_ids)s)
+        ORDER BY "TradeId", "Date", "Time";
+    ''',
+    "executions": '''
+        SELECT e.*, t."TradeId" AS "TradeRef"
+        FROM "executions" e
+        JOIN "trades" t ON e."Symbol" = t."Symbol" AND e."Date" = t."Date"
+        WHERE t."TradeId" = ANY(%(trade_ids)s)
+        ORDER BY t."TradeId", e."Time";
+    ''',
+}
+OVERLAY_GROUP_COLUMN = {"intraday": "TradeId", "executions": "TradeRef"}
+
+
+def fetch_overlay_data(trade_ids, cursor) -> dict:
+    """{trade_id: {"intraday": DataFrame, "executions": DataFrame}} for all trade_ids."""
+    trade_ids = [int(t) for t in trade_ids]
+    data = {trade_id: {"intraday": pd.DataFrame(), "executions": pd.DataFrame()} for trade_id in trade_ids}
+
+    for part, query in OVERLAY_QUERIES.items():
+        missing = []
+        for trade_id in trade_ids:
+            value = trade_cache.get(_cache_key(trade_id, part))
+            if value is MISSING:
+                missing.append(trade_id)
+            else:
+                data[trade_id][part] = value
+        if not missing:
+            continue
+
+        try:
+            df = read_frame(cursor, query, {"trade_ids": missing})
+        except Exception as e:
+            print(f"Error fetching {part} for TradeIds {missing}: {e}")
+            cursor.connection.rollback()
+            continue
+
+        group_col = OVERLAY_GROUP_COLUMN[part]
+        for trade_id, group in df.groupby(group_col, sort=False):
+            group = group.drop(columns=["TradeRef"], errors="ignore").reset_index(drop=True)
+            value = PART_CONVERTERS[part](group)
+            data[int(trade_id)][part] = value
+            if not is_empty(value):
+                trade_cache.put(_cache_key(int(trade_id), part), value)
+
+    return data
+
+
+def load_overlay_data(trade_ids, database_config) -> dict:
+    """Borrow a pooled connection and load intraday bars and executions of trade_ids."""
+    if use_mirror():
+        bundles = [fetch_trade_bundle_from_mirror(int(t)) for t in trade_ids]
+        return {b["trade_id"]: {"intraday": b["intraday"], "executions": b["executions"]} for b in bundles}
+    with pooled_connection_and_cursor(database_config) as (conn, cur):
+        return fetch_overlay_data(trade_ids, cur)
+
+
+# --- Cache warm-up ---
+
+def warm_up_cache(database_config, n_trades: int) -> None:
+    """Load the bundles of the n_trades most recent trades into trade_cache."""
+    try:
+        with pooled_connection_and_cursor(database_config) as (conn, cur):
+            cur.execute(
+                'SELECT "TradeId" FROM "trades" ORDER BY "Date" DESC, "TradeId" DESC LIMIT %s;',
+                (n_trades,),
+            )
+            trade_ids = [row[0] for row in cur.fetchall()]
+            for trade_id in trade_ids:
+                with_indicators(with_derived_parts(fetch_trade_bundle(trade_id, cur)))
+        print(f"Cache warmed up with {len(trade_ids)} trades: {trade_cache.get_stats()}")
+    except Exception as e:
+        print(f"Error warming up cache: {e}")
+
+
+def start_cache_warm_up(database_config, n_trades: int) -> threading.Thread:
+    """Run warm_up_cache on a daemon thread so startup is not delayed."""
+    thread = threading.Thread(
+        target=warm_up_cache, args=(database_config, n_trades), name="cache-warm-up", daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,112 @@
+import os
+from urllib.parse import quote
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc
+except ImportError:     # optional: only needed with the "arrow" fetch backend
+    pa = None
+
+# Read side of the offline market data mirror (written by src.data.mirror_sync).
+#
+#   <directory>/trades.arrow
+#   <directory>/<table>/Date=<YYYY-MM-DD>/Symbol=<symbol>/part.arrow
+#
+# Files are uncompressed Arrow IPC, opened with a memory map: reading a partition
+# maps the file and wraps its buffers, nothing is parsed or copied until the
+# rows are converted to pandas. Bar tables are partitioned by the Date / Symbol
+# of the trade they belong to, executions by their own Date / Symbol, so every
+# trade lookup resolves to exactly one partition (partition pruning) and the
+# TradeId predicate is applied to that partition only.
+
+TRADES_FILE = "trades.arrow"
+PARTITION_FILE = "part.arrow"
+
+_trade_index = {}       # trades.arrow path -> (mtime_ns, {TradeId: (Symbol, Date)}, pa.Table)
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise Exception("The arrow fetch backend needs pyarrow: pip install pyarrow")
+
+
+def partition_path(directory: str, table_name: str, date, symbol) -> str:
+    return os.path.join(
+        directory,
+        table_name,
+        f"Date={pd.Timestamp(date):%Y-%m-%d}",
+        f"Symbol={quote(str(symbol), safe='')}",
+        PARTITION_FILE,
+    )
+
+
+def read_arrow(path: str):
+    """Memory-mapped Arrow table of path, or None when the file does not exist."""
+    _require_pyarrow()
+    try:
+        source = pa.memory_map(path, "r")
+    except FileNotFoundError:
+        return None
+    return pa.ipc.open_file(source).read_all()
+
+
+def _trades(directory: str) -> tuple:
+    """({TradeId: (Symbol, Date)}, trades table), re-read only when trades.arrow changes."""
+    path = os.path.join(directory, TRADES_FILE)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        raise Exception(f"No market data mirror in '{directory}', run: python -m src.data.mirror_sync")
+
+    cached = _trade_index.get(path)
+    if cached is None or cached[0] != mtime:
+        table = read_arrow(path)
+        index = dict(zip(
+            table["TradeId"].to_pylist(),
+            zip(table["Symbol"].to_pylist(), table["Date"].to_pylist()),
+        ))
+        cached = _trade_index[path] = (mtime, index, table)
+    return cached[1], cached[2]
+
+
+def trade_row(directory: str, trade_id: int) -> dict:
+    """The trades row of trade_id as a dict, {} when unknown."""
+    index, table = _trades(directory)
+    if trade_id not in index:
+        return {}
+    rows = table.filter(pc.equal(table["TradeId"], trade_id)).slice(0, 1).to_pylist()
+    return rows[0] if rows else {}
+
+
+def read_partition(directory: str, table_name: str, date, symbol) -> pd.DataFrame:
+    """All rows of one Date / Symbol partition."""
+    table = read_arrow(partition_path(directory, table_name, date, symbol))
+    return table.to_pandas() if table is not None else pd.DataFrame()
+
+
+def read_trade_rows(directory: str, table_name: str, trade_id: int) -> pd.DataFrame:
+    """Rows of a bar table belonging to trade_id."""
+    index, _ = _trades(directory)
+    if trade_id not in index:
+        return pd.DataFrame()
+    symbol, date = index[trade_id]
+
+    table = read_arrow(partition_path(directory, table_name, date, symbol))
+    if table is None:
+        return pd.DataFrame()
+    return table.filter(pc.equal(table["TradeId"], trade_id)).to_pandas()
+
+
+def relative_volume(directory: str, trade_id: int) -> pd.DataFrame:
+    """Date / RelativeVolume of the marketdatad row on the trade's own Symbol and Date."""
+    row = trade_row(directory, trade_id)
+    if not row:
+        return pd.DataFrame()
+    df = read_partition(directory, "marketdatad", row["Date"], row["Symbol"])
+    if df.empty:
+        return df
+    df = df[(df["Symbol"] == row["Symbol"]) & (pd.to_datetime(df["Date"]) == pd.Timestamp(row["Date"]))]
+    return df[["Date", "RelativeVolume"]].head(1).reset_index(drop=True)
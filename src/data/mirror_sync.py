@@ -0,0 +1,172 @@
+"""
+Export the market data tables to the offline Arrow mirror read by src.data.mirror.
+
+    python -m src.data.mirror_sync                    # incremental: changed partitions only
+    python -m src.data.mirror_sync --full             # rewrite every partition
+    python -m src.data.mirror_sync --directory D:/tv  # mirror location (default: [fetch] mirror_dir)
+
+Incremental runs compare a per-partition fingerprint (row count + sum of row
+hashes, computed by Postgres) with the one stored in manifest.json and only
+re-export partitions that are new or changed. Partitions whose rows are gone
+are deleted.
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import psycopg2
+
+from src.common.read_configs_in import read_database_config, read_optional_config
+from src.data.db_functions import read_frame, configure_fetch, FETCH_SETTINGS
+from src.data.mirror import TRADES_FILE, partition_path, pa
+
+MANIFEST_FILE = "manifest.json"
+
+# Partitions exported per query
+BATCH_SIZE = 200
+
+# table -> (partitioned through the trade row?, ORDER BY inside a partition)
+MIRROR_TABLES = {
+    "marketdatad": (True, 'm."TradeId", m."Date"'),
+    "marketdata30mins": (True, 'm."TradeId", m."Date"'),
+    "marketdataintrad": (True, 'm."TradeId", m."Date", m."Time"'),
+    "executions": (False, 'm."Time"'),
+}
+
+
+def _source(table_name: str) -> tuple:
+    """(FROM clause, partition date expression, partition symbol expression)."""
+    by_trade, _ = MIRROR_TABLES[table_name]
+    if by_trade:
+        return (f'"{table_name}" m JOIN "trades" t ON m."TradeId" = t."TradeId"', 't."Date"', 't."Symbol"')
+    return (f'"{table_name}" m', 'm."Date"', 'm."Symbol"')
+
+
+def fingerprints(cursor, table_name: str) -> dict:
+    """{"YYYY-MM-DD|symbol": [row count, row hash sum]} for every partition of table_name."""
+    source, date_expr, symbol_expr = _source(table_name)
+    cursor.execute(f'''
+        SELECT {date_expr}::text, {symbol_expr}, count(*), sum(hashtext(m::text)::bigint)::text
+        FROM {source}
+        WHERE {date_expr} IS NOT NULL AND {symbol_expr} IS NOT NULL
+        GROUP BY 1, 2;
+    ''')
+    return {f"{date}|{symbol}": [count, checksum] for date, symbol, count, checksum in cursor.fetchall()}
+
+
+def _write_arrow(df, path: str) -> None:
+    """Write df as an uncompressed Arrow IPC file, atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def _remove_partition(path: str, directory: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        return
+    # Prune the now empty Symbol= / Date= directories
+    parent = os.path.dirname(path)
+    while parent != directory:
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
+
+
+def export_partitions(cursor, directory: str, table_name: str, keys) -> int:
+    """Export the given "date|symbol" partitions of table_name, returns the rows written."""
+    source, date_expr, symbol_expr = _source(table_name)
+    _, order_by = MIRROR_TABLES[table_name]
+    query = f'''
+        SELECT m.*, {date_expr} AS "_PartDate", {symbol_expr} AS "_PartSymbol"
+        FROM {source}
+        WHERE ({date_expr}, {symbol_expr}) IN (SELECT * FROM unnest(%s::date[], %s::text[]))
+        ORDER BY "_PartDate", "_PartSymbol", {order_by};
+    '''
+
+    written = 0
+    keys = sorted(keys)
+    for start in range(0, len(keys), BATCH_SIZE):
+        batch = [key.split("|", 1) for key in keys[start:start + BATCH_SIZE]]
+        df = read_frame(cursor, query, ([d for d, _ in batch], [s for _, s in batch]), mode="columnar")
+
+        for (date, symbol), part in df.groupby(["_PartDate", "_PartSymbol"], sort=False):
+            part = part.drop(columns=["_PartDate", "_PartSymbol"]).reset_index(drop=True)
+            _write_arrow(part, partition_path(directory, table_name, date, symbol))
+            written += len(part)
+    return written
+
+
+def sync(conn, directory: str, full: bool = False) -> dict:
+    """Bring the mirror in directory up to date, returns {table: (changed, removed, rows)}."""
+    if pa is None:
+        raise Exception("The market data mirror needs pyarrow: pip install pyarrow")
+    os.makedirs(directory, exist_ok=True)
+
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    manifest = {}
+    if not full and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    summary = {}
+    with conn.cursor() as cur:
+        trades = read_frame(cur, 'SELECT * FROM "trades" ORDER BY "TradeId";', None, mode="columnar")
+        _write_arrow(trades, os.path.join(directory, TRADES_FILE))
+
+        for table_name in MIRROR_TABLES:
+            current = fingerprints(cur, table_name)
+            previous = manifest.get(table_name, {})
+
+            changed = [key for key, fp in current.items() if previous.get(key) != fp]
+            removed = [key for key in previous if key not in current]
+
+            rows = export_partitions(cur, directory, table_name, changed)
+            for key in removed:
+                date, symbol = key.split("|", 1)
+                _remove_partition(partition_path(directory, table_name, date, symbol), directory)
+
+            manifest[table_name] = current
+            summary[table_name] = (len(changed), len(removed), rows)
+            print(f"{table_name}: {len(changed)} partitions exported ({rows} rows), {len(removed)} removed")
+    conn.rollback()
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export market data tables to the offline Arrow mirror.")
+    parser.add_argument("--config", default="database.ini")
+    parser.add_argument("--directory", default=None)
+    parser.add_argument("--full", action="store_true", help="re-export every partition")
+    args = parser.parse_args()
+
+    configure_fetch(**read_optional_config(filename=args.config, section="fetch"))
+    directory = args.directory or FETCH_SETTINGS["mirror_dir"]
+
+    conn = psycopg2.connect(**read_database_config(filename=args.config, section="postgresql"))
+    try:
+        sync(conn, directory, full=args.full)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
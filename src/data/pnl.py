@@ -0,0 +1,288 @@
+"""
+Realized P&L, average entry / exit, position size and holding time per trade,
+reconstructed from the executions and stored in trade_pnl (see src.data.schema).
+
+    python -m src.data.pnl update      # trades whose executions were added or deleted
+    python -m src.data.pnl rebuild     # every trade, e.g. after executions were edited in place
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import psycopg2
+import psycopg2.extras
+
+from src.common.read_configs_in import apply_settings, read_database_config
+from src.data.db_functions import pooled_connection_and_cursor, read_frame
+from src.data.schema import PNL_SUMMARY_TABLE, table_exists
+from src.utils.helper_functions import execution_timestamps
+
+# Positions are tracked at average cost: an opening fill adds its cost to the
+# position, a closing fill realizes (fill price - average cost) per share and
+# leaves the average unchanged. A fill that takes the position through zero is
+# split into the closing part and an opening part.
+# The whole executions table goes through in one pass: the per-trade running
+# position is a grouped cumsum, and the cost of the position follows
+#     cost[t] = ratio[t] * cost[t-1] + added[t]
+# (ratio = remaining / previous shares on closes, added = price * shares on
+# opens), a linear recurrence solved with a cumulative product per round trip.
+
+PNL_SETTINGS = {
+    "interval": 0.0,    # seconds between background updates in the app, 0 = off (run the CLI instead)
+}
+
+EXECUTIONS_QUERY = '''
+    SELECT t."TradeId", e."ExecId", e."Date" + e."Time" AS "Time", e."Side", e."Quantity",
+           COALESCE(e."Price", e."AvgPrice") AS "Price"
+    FROM "executions" e
+    JOIN "trades" t ON e."Symbol" = t."Symbol" AND e."Date" = t."Date"
+    {where}
+    ORDER BY t."TradeId", 3, e."ExecId";
+'''
+
+# Trades whose execution count or highest ExecId differs from what their row was
+# computed from: new executions (whenever their transaction commits), deleted
+# ones, and trades without a row yet. Compared per trade, as ExecIds are not
+# committed in order.
+CHANGED_TRADES_QUERY = f'''
+    SELECT c."TradeId"
+    FROM (
+        SELECT t."TradeId", count(e."ExecId") AS "Executions", max(e."ExecId") AS "LastExecId"
+        FROM "trades" t
+        LEFT JOIN "executions" e ON e."Symbol" = t."Symbol" AND e."Date" = t."Date"
+        GROUP BY t."TradeId"
+    ) c
+    LEFT JOIN {PNL_SUMMARY_TABLE} p ON p."TradeId" = c."TradeId"
+    WHERE COALESCE(p."Executions", 0) <> c."Executions"
+       OR p."LastExecId" IS DISTINCT FROM c."LastExecId";
+'''
+
+PNL_COLUMNS = [
+    "TradeId", "RealizedPnL", "AvgEntry", "AvgExit", "MaxPosition", "OpenPosition",
+    "Fills", "FirstFill", "LastFill", "HoldingMinutes", "Executions", "LastExecId",
+]
+
+# PNL_COLUMNS stored as integer
+INTEGER_COLUMNS = ["MaxPosition", "OpenPosition", "Fills", "Executions", "LastExecId"]
+
+UPSERT_QUERY = f'''
+    INSERT INTO {PNL_SUMMARY_TABLE} ({", ".join(f'"{c}"' for c in PNL_COLUMNS)})
+    VALUES %s
+    ON CONFLICT ("TradeId") DO UPDATE SET
+        {", ".join(f'"{c}" = EXCLUDED."{c}"' for c in PNL_COLUMNS[1:])};
+'''
+
+
+def configure_pnl(**settings) -> None:
+    """Override PNL_SETTINGS, e.g. from the optional [pnl] section of database.ini."""
+    apply_settings(PNL_SETTINGS, "pnl", **settings)
+
+
+# --- Engine ---
+
+def _split_reversals(fills: pd.DataFrame) -> pd.DataFrame:
+    """Fills that take the position through zero as a closing and an opening fill."""
+    position = fills.groupby("TradeId", sort=False)["Qty"].cumsum().to_numpy()
+    before = position - fills["Qty"].to_numpy()
+    reversal = (before != 0) & (position != 0) & (np.sign(position) != np.sign(before))
+    if not reversal.any():
+        return fills
+
+    closing = fills[reversal].assign(Qty=-before[reversal])
+    opening = fills[reversal].assign(Qty=position[reversal], Part=1)
+    return (pd.concat([fills[~reversal], closing, opening])
+            .sort_values(["Seq", "Part"], kind="stable")
+            .reset_index(drop=True))
+
+
+def compute_pnl(executions: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row of PNL_COLUMNS per TradeId of executions (TradeId, ExecId, Time as a
+    timestamp or Date + time of day, Side, Quantity, Price), sorted by TradeId and
+    fill time. Executions and LastExecId count every execution of the trade, the
+    other columns only its non-zero fills (empty without any).
+    """
+    if executions.empty:
+        return pd.DataFrame(columns=PNL_COLUMNS)
+
+    executed = executions.groupby("TradeId", sort=False).agg(
+        Executions=("ExecId", "size"),
+        LastExecId=("ExecId", "max"),
+    )
+
+    side = executions["Side"].astype(str).str.upper()
+    fills = pd.DataFrame({
+        "TradeId": executions["TradeId"].to_numpy(),
+        "ExecId": executions["ExecId"].to_numpy(),
+        "Timestamp": execution_timestamps(executions).to_numpy(),
+        "Qty": np.where(side.str.startswith("BUY"), 1, -1)
+               * pd.to_numeric(executions["Quantity"], errors="coerce").fillna(0).to_numpy(dtype=np.int64),
+        "Price": pd.to_numeric(executions["Price"], errors="coerce").to_numpy(dtype=float),
+        "Seq": np.arange(len(executions)),
+        "Part": 0,
+    })
+    fills = _split_reversals(fills[fills["Qty"] != 0].reset_index(drop=True))
+
+    qty = fills["Qty"].to_numpy()
+    price = fills["Price"].to_numpy()
+    position = fills.groupby("TradeId", sort=False)["Qty"].cumsum().to_numpy()
+    before = position - qty
+    shares = np.abs(qty)
+    opening = (before == 0) | (np.sign(qty) == np.sign(before))
+
+    # Round trips: a new one starts with every fill out of a flat position
+    round_trip = np.cumsum(before == 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(opening, 1.0, np.abs(position) / np.abs(before))
+    added = np.where(opening, price * shares, 0.0)
+
+    # cost[t] = growth[t] * cumsum(added / growth) with growth the cumulative ratio;
+    # the fill that closes a round trip has ratio 0 and leaves no cost
+    growth = pd.Series(np.where(ratio == 0, 1.0, ratio)).groupby(round_trip).cumprod().to_numpy()
+    cost = np.where(ratio == 0, 0.0, growth * pd.Series(added / growth).groupby(round_trip).cumsum().to_numpy())
+    cost_before = np.where(before == 0, 0.0, np.concatenate(([0.0], cost[:-1])))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        average_cost = np.where(before == 0, np.nan, cost_before / np.abs(before))
+    realized = np.where(opening, 0.0, (price - average_cost) * shares * np.sign(before))
+
+    per_fill = pd.DataFrame({
+        "TradeId": fills["TradeId"].to_numpy(),
+        "RealizedPnL": realized,
+        "EntryValue": np.where(opening, price * shares, 0.0),
+        "EntryShares": np.where(opening, shares, 0),
+        "ExitValue": np.where(opening, 0.0, price * shares),
+        "ExitShares": np.where(opening, 0, shares),
+        "Position": np.abs(position),
+        "OpenPosition": position,
+        "Fill": fills["Part"].to_numpy() == 0,
+        "FirstFill": fills["Timestamp"].to_numpy(),
+        "LastFill": fills["Timestamp"].to_numpy(),
+    })
+    result = per_fill.groupby("TradeId", sort=False).agg(
+        RealizedPnL=("RealizedPnL", "sum"),
+        EntryValue=("EntryValue", "sum"),
+        EntryShares=("EntryShares", "sum"),
+        ExitValue=("ExitValue", "sum"),
+        ExitShares=("ExitShares", "sum"),
+        MaxPosition=("Position", "max"),
+        OpenPosition=("OpenPosition", "last"),
+        Fills=("Fill", "sum"),
+        FirstFill=("FirstFill", "min"),
+        LastFill=("LastFill", "max"),
+    )
+    result = executed.join(result).reset_index()
+    result[INTEGER_COLUMNS] = result[INTEGER_COLUMNS].astype("Int64")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result["AvgEntry"] = (result["EntryValue"] / result["EntryShares"]).round(4)
+        result["AvgExit"] = (result["ExitValue"] / result["ExitShares"]).round(4)
+    result["RealizedPnL"] = result["RealizedPnL"].round(2)
+    result["HoldingMinutes"] = ((result["LastFill"] - result["FirstFill"]).dt.total_seconds() / 60).round(1)
+    return result[PNL_COLUMNS]
+
+
+# --- Summary table ---
+
+def fetch_executions(cursor, trade_ids=None) -> pd.DataFrame:
+    """Executions of trade_ids (None = all trades) with their TradeId, in fill order."""
+    if trade_ids is None:
+        return read_frame(cursor, EXECUTIONS_QUERY.format(where=""), None)
+    return read_frame(cursor, EXECUTIONS_QUERY.format(where='WHERE t."TradeId" = ANY(%s)'), (list(trade_ids),))
+
+
+def _rows(df: pd.DataFrame) -> list:
+    """Rows of df as Python values, NaN / NaT as NULL."""
+    df = df.astype(object).where(df.notna(), None)
+    return list(df.itertuples(index=False, name=None))
+
+
+def write_pnl(cursor, df: pd.DataFrame) -> None:
+    if not df.empty:
+        psycopg2.extras.execute_values(cursor, UPSERT_QUERY, _rows(df), page_size=1000)
+
+
+def update_pnl(conn, rebuild: bool = False) -> int:
+    """
+    Recompute the trades whose executions were added or deleted since the last run
+    (all trades with rebuild) and write them to trade_pnl; trades left without
+    executions lose their row. Returns the number of trades written.
+    """
+    cur = conn.cursor()
+    try:
+        if rebuild:
+            cur.execute(f"TRUNCATE {PNL_SUMMARY_TABLE};")
+            df = compute_pnl(fetch_executions(cur))
+        else:
+            cur.execute(CHANGED_TRADES_QUERY)
+            trade_ids = [row[0] for row in cur.fetchall()]
+            if not trade_ids:
+                return 0
+            df = compute_pnl(fetch_executions(cur, trade_ids))
+            written = set(df["TradeId"])
+            gone = [tid for tid in trade_ids if tid not in written]
+            if gone:
+                cur.execute(f'DELETE FROM {PNL_SUMMARY_TABLE} WHERE "TradeId" = ANY(%s);', (gone,))
+        write_pnl(cur, df)
+        conn.commit()
+        return len(df)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+# --- Background updates in the app ---
+
+_stop = threading.Event()
+
+
+def _run_updates(database_config, interval: float) -> None:
+    while not _stop.wait(interval):
+        try:
+            with pooled_connection_and_cursor(database_config) as (conn, cur):
+                if not table_exists(cur, PNL_SUMMARY_TABLE):
+                    continue
+                updated = update_pnl(conn)
+            if updated:
+                print(f"P&L updated for {updated} trades")
+        except Exception as e:
+            print(f"Error updating P&L: {e}")
+
+
+def start_pnl_updater(database_config, interval: float) -> threading.Thread:
+    """Run update_pnl every interval seconds on a daemon thread."""
+    _stop.clear()
+    thread = threading.Thread(
+        target=_run_updates, args=(database_config, interval), name="pnl-updater", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def stop_pnl_updater() -> None:
+    _stop.set()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconstruct per-trade P&L from the executions into trade_pnl.")
+    parser.add_argument("command", choices=["update", "rebuild"])
+    parser.add_argument("--config", default="database.ini")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**read_database_config(filename=args.config, section="postgresql"))
+    try:
+        if not table_exists(conn.cursor(), PNL_SUMMARY_TABLE):
+            raise SystemExit(f"{PNL_SUMMARY_TABLE} does not exist, run python -m src.data.schema apply first.")
+        started = time.perf_counter()
+        updated = update_pnl(conn, rebuild=args.command == "rebuild")
+        print(f"{updated} trades written to {PNL_SUMMARY_TABLE} in {time.perf_counter() - started:.2f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
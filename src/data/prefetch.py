@@ -0,0 +1,127 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.common.read_configs_in import apply_settings
+from src.data.loader import is_bundle_cached, load_trade_bundle
+
+# Background prefetch of the trades around the one being reviewed.
+# Stepping through the table row by row, the next / previous rows' bundles are
+# loaded into trade_cache on a small thread pool while the current chart is read.
+# Jumping elsewhere cancels whatever has not started yet.
+
+PREFETCH_SETTINGS = {
+    "neighbours": 2,        # rows before and after the selected one (0 disables prefetch)
+    "workers": 2,           # concurrent prefetch queries, each holds a pooled connection
+}
+
+
+class TradePrefetcher:
+    """
+    Schedules load_trade_bundle for neighbouring trades and keeps count of how
+    useful that was:
+
+    hits       selected trade had finished prefetching
+    late       selected trade was still being prefetched
+    misses     selected trade was not prefetched
+    wasted     prefetched (or started) trades that were never selected
+    cancelled  queued prefetches dropped before they started
+    """
+
+    def __init__(self, database_config, workers: int):
+        self.database_config = database_config
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._jobs = {}                 # trade_id -> Future
+        self._lock = threading.Lock()
+        self._stats = {"scheduled": 0, "hits": 0, "late": 0, "misses": 0, "wasted": 0, "cancelled": 0}
+
+    def select(self, trade_id, neighbour_ids) -> None:
+        """Record the selection of trade_id and prefetch neighbour_ids instead of the previous set."""
+        wanted = [t for t in dict.fromkeys(neighbour_ids) if t is not None and t != trade_id]
+
+        with self._lock:
+            self._record_selection(trade_id)
+
+            for other_id in [t for t in self._jobs if t not in wanted]:
+                future = self._jobs.pop(other_id)
+                if future.cancel():
+                    self._stats["cancelled"] += 1
+                else:
+                    self._stats["wasted"] += 1
+
+            for other_id in wanted:
+                if other_id in self._jobs or is_bundle_cached(other_id):
+                    continue
+                self._jobs[other_id] = self._executor.submit(self._load, other_id)
+                self._stats["scheduled"] += 1
+
+    def _record_selection(self, trade_id) -> None:
+        future = self._jobs.pop(trade_id, None)
+        if future is None:
+            self._stats["misses"] += 1
+        elif future.done():
+            self._stats["hits"] += 1
+        else:
+            self._stats["late"] += 1
+
+    def _load(self, trade_id) -> None:
+        try:
+            load_trade_bundle(trade_id, self.database_config)
+        except Exception as e:
+            print(f"Error prefetching TradeId {trade_id}: {e}")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = sum(not f.done() for f in self._jobs.values())
+        selections = stats["hits"] + stats["late"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / selections if selections else 0.0
+        return stats
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for future in self._jobs.values():
+                future.cancel()
+            self._jobs.clear()
+        self._executor.shutdown(wait=False)
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def configure_prefetch(**settings) -> None:
+    """Override PREFETCH_SETTINGS, e.g. from the optional [prefetch] section of database.ini."""
+    apply_settings(PREFETCH_SETTINGS, "prefetch", **settings)
+
+
+def get_prefetcher(database_config):
+    """The process-wide TradePrefetcher, or None when prefetching is disabled."""
+    global _prefetcher
+    if PREFETCH_SETTINGS["neighbours"] <= 0:
+        return None
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = TradePrefetcher(database_config, PREFETCH_SETTINGS["workers"])
+        return _prefetcher
+
+
+def get_prefetch_stats() -> dict:
+    return _prefetcher.get_stats() if _prefetcher is not None else {}
+
+
+def shutdown_prefetcher() -> None:
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is not None:
+            _prefetcher.shutdown()
+            _prefetcher = None
+
+
+def neighbour_ids(rows, row_index: int, k: int) -> list:
+    """TradeIds of the k rows after and before row_index, nearest first, next row before previous."""
+    ids = []
+    for offset in range(1, k + 1):
+        for i in (row_index + offset, row_index - offset):
+            if 0 <= i < len(rows):
+                ids.append(rows[i].get("TradeId"))
+    return ids
@@ -0,0 +1,279 @@
+"""
+Schema / index bootstrap for the Tradeviewer database.
+
+    python -m src.data.schema check     # report missing indexes, summary objects and triggers
+    python -m src.data.schema apply     # create whatever is missing
+    python -m src.data.schema refresh   # rebuild trade_latest_rvol from marketdatad
+"""
+import argparse
+
+import psycopg2
+
+from src.common.read_configs_in import read_database_config
+
+# (table, columns, index name) the fetch_* / loader queries rely on
+REQUIRED_INDEXES = [
+    ("marketdatad", ("TradeId", "Date"), "ix_marketdatad_tradeid_date"),
+    ("marketdatad", ("Symbol", "Date"), "ix_marketdatad_symbol_date"),
+    ("marketdata30mins", ("TradeId", "Date"), "ix_marketdata30mins_tradeid_date"),
+    ("marketdataintrad", ("TradeId", "Time"), "ix_marketdataintrad_tradeid_time"),
+    ("executions", ("Symbol", "Date", "Time"), "ix_executions_symbol_date_time"),
+    ("trade_latest_rvol", ("Date",), "ix_trade_latest_rvol_date"),
+    ("trades", ("RowVersion",), "ix_trades_row_version"),
+]
+
+# --- Latest RelativeVolume per TradeId ---
+# Kept current by statement-level triggers on marketdatad, so every batch of new
+# daily bars only touches the TradeIds it contains.
+
+RVOL_SUMMARY_TABLE = "trade_latest_rvol"
+
+CREATE_RVOL_SUMMARY = f'''
+    CREATE TABLE {RVOL_SUMMARY_TABLE} AS
+    SELECT DISTINCT ON ("TradeId") "TradeId", "Date", "RelativeVolume"
+    FROM "marketdatad"
+    WHERE "TradeId" IS NOT NULL
+    ORDER BY "TradeId", "Date" DESC;
+
+    ALTER TABLE {RVOL_SUMMARY_TABLE} ADD PRIMARY KEY ("TradeId");
+'''
+
+REFRESH_RVOL_SUMMARY = f'''
+    TRUNCATE {RVOL_SUMMARY_TABLE};
+    INSERT INTO {RVOL_SUMMARY_TABLE} ("TradeId", "Date", "RelativeVolume")
+    SELECT DISTINCT ON ("TradeId") "TradeId", "Date", "RelativeVolume"
+    FROM "marketdatad"
+    WHERE "TradeId" IS NOT NULL
+    ORDER BY "TradeId", "Date" DESC;
+'''
+
+CREATE_RVOL_TRIGGERS = f'''
+    CREATE OR REPLACE FUNCTION refresh_trade_latest_rvol() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO {RVOL_SUMMARY_TABLE} ("TradeId", "Date", "RelativeVolume")
+        SELECT DISTINCT ON ("TradeId") "TradeId", "Date", "RelativeVolume"
+        FROM changed_rows
+        WHERE "TradeId" IS NOT NULL
+        ORDER BY "TradeId", "Date" DESC
+        ON CONFLICT ("TradeId") DO UPDATE
+            SET "Date" = EXCLUDED."Date", "RelativeVolume" = EXCLUDED."RelativeVolume"
+            WHERE {RVOL_SUMMARY_TABLE}."Date" <= EXCLUDED."Date";
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS trg_trade_latest_rvol_insert ON "marketdatad";
+    CREATE TRIGGER trg_trade_latest_rvol_insert
+        AFTER INSERT ON "marketdatad"
+        REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION refresh_trade_latest_rvol();
+
+    DROP TRIGGER IF EXISTS trg_trade_latest_rvol_update ON "marketdatad";
+    CREATE TRIGGER trg_trade_latest_rvol_update
+        AFTER UPDATE ON "marketdatad"
+        REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION refresh_trade_latest_rvol();
+'''
+
+# --- Realized P&L per TradeId ---
+# Filled and kept current by src.data.pnl from the executions; "Executions" and
+# "LastExecId" are the number of executions and the highest ExecId the row was
+# computed from.
+
+PNL_SUMMARY_TABLE = "trade_pnl"
+
+CREATE_PNL_SUMMARY = f'''
+    CREATE TABLE {PNL_SUMMARY_TABLE} (
+        "TradeId" integer PRIMARY KEY,
+        "RealizedPnL" double precision,
+        "AvgEntry" double precision,
+        "AvgExit" double precision,
+        "MaxPosition" integer,
+        "OpenPosition" integer,
+        "Fills" integer,
+        "FirstFill" timestamp,
+        "LastFill" timestamp,
+        "HoldingMinutes" double precision,
+        "Executions" integer,
+        "LastExecId" integer
+    );
+'''
+
+# --- Change tracking on trades ---
+# Every inserted or updated trades row gets the id of the transaction that wrote
+# it as its "RowVersion" (PostgreSQL 13 or later). A new latest RelativeVolume in
+# trade_latest_rvol stamps the trade too, as the listing shows it; so does new P&L
+# in trade_pnl. Transaction ids are assigned when a transaction starts writing,
+# not when it commits, so a higher version can become visible before a lower one.
+# The watermark a client keeps is therefore the xmin of its snapshot: every
+# transaction below it has finished, and the next fetch asks for the rows at or
+# above it (db_functions.fetch_trades_changes). Rows of transactions still running
+# at the previous fetch are delivered again; unchanged ones are skipped by the
+# trade table. Deletes are not tracked.
+
+ROW_VERSION_TRIGGERS = [
+    "trg_trades_row_version", "trg_trade_latest_rvol_row_version", "trg_trade_pnl_row_version",
+]
+
+CREATE_CHANGE_TRACKING = f'''
+    ALTER TABLE "trades" ADD COLUMN IF NOT EXISTS "RowVersion" bigint;
+
+    CREATE OR REPLACE FUNCTION stamp_trades_row_version() RETURNS trigger AS $$
+    BEGIN
+        NEW."RowVersion" := pg_current_xact_id()::text::bigint;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS trg_trades_row_version ON "trades";
+    CREATE TRIGGER trg_trades_row_version
+        BEFORE INSERT OR UPDATE ON "trades"
+        FOR EACH ROW EXECUTE FUNCTION stamp_trades_row_version();
+
+    CREATE OR REPLACE FUNCTION touch_trades_row_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE "trades" SET "RowVersion" = pg_current_xact_id()::text::bigint WHERE "TradeId" = NEW."TradeId";
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS trg_trade_latest_rvol_row_version ON {RVOL_SUMMARY_TABLE};
+    CREATE TRIGGER trg_trade_latest_rvol_row_version
+        AFTER INSERT OR UPDATE ON {RVOL_SUMMARY_TABLE}
+        FOR EACH ROW EXECUTE FUNCTION touch_trades_row_version();
+
+    DROP TRIGGER IF EXISTS trg_trade_pnl_row_version ON {PNL_SUMMARY_TABLE};
+    CREATE TRIGGER trg_trade_pnl_row_version
+        AFTER INSERT OR UPDATE ON {PNL_SUMMARY_TABLE}
+        FOR EACH ROW EXECUTE FUNCTION touch_trades_row_version();
+
+    UPDATE "trades" SET "RowVersion" = pg_current_xact_id()::text::bigint WHERE "RowVersion" IS NULL;
+'''
+
+EXISTING_INDEXES = '''
+    SELECT t.relname, array_agg(a.attname::text ORDER BY k.ord)
+    FROM pg_index i
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord) ON TRUE
+    JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+    WHERE t.relname = ANY(%s) AND pg_table_is_visible(t.oid)
+    GROUP BY i.indexrelid, t.relname;
+'''
+
+
+def table_exists(cursor, table_name: str) -> bool:
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL;", (table_name,))
+    return cursor.fetchone()[0]
+
+
+def trigger_exists(cursor, trigger_name: str) -> bool:
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = %s);", (trigger_name,))
+    return cursor.fetchone()[0]
+
+
+def find_missing_indexes(cursor) -> list:
+    """
+    Required indexes that no existing index covers. An index covers a
+    requirement when the required columns are its leading columns.
+    """
+    tables = sorted({table for table, _, _ in REQUIRED_INDEXES})
+    cursor.execute(EXISTING_INDEXES, (tables,))
+    existing = {}
+    for table, columns in cursor.fetchall():
+        existing.setdefault(table, []).append(tuple(columns))
+
+    missing = []
+    for table, columns, name in REQUIRED_INDEXES:
+        if not table_exists(cursor, table):
+            missing.append((table, columns, name))
+            continue
+        if not any(idx[:len(columns)] == columns for idx in existing.get(table, [])):
+            missing.append((table, columns, name))
+    return missing
+
+
+def check(cursor) -> bool:
+    """Print what is missing, return True when the schema is complete."""
+    complete = True
+
+    for name in [RVOL_SUMMARY_TABLE, PNL_SUMMARY_TABLE]:
+        if table_exists(cursor, name):
+            print(f"ok       table {name}")
+        else:
+            print(f"MISSING  table {name}")
+            complete = False
+
+    for name in ["trg_trade_latest_rvol_insert", "trg_trade_latest_rvol_update"] + ROW_VERSION_TRIGGERS:
+        if trigger_exists(cursor, name):
+            print(f"ok       trigger {name}")
+        else:
+            print(f"MISSING  trigger {name}")
+            complete = False
+
+    missing = find_missing_indexes(cursor)
+    for table, columns, name in REQUIRED_INDEXES:
+        cols = ", ".join(columns)
+        status = "MISSING " if (table, columns, name) in missing else "ok      "
+        print(f"{status} index {table} ({cols})")
+    return complete and not missing
+
+
+def apply(conn) -> None:
+    """
+    Create the summary tables, the triggers and every missing index. trade_pnl
+    starts empty, python -m src.data.pnl update fills it.
+    """
+    cur = conn.cursor()
+
+    if not table_exists(cur, RVOL_SUMMARY_TABLE):
+        print(f"Creating {RVOL_SUMMARY_TABLE} ...")
+        cur.execute(CREATE_RVOL_SUMMARY)
+    if not table_exists(cur, PNL_SUMMARY_TABLE):
+        print(f"Creating {PNL_SUMMARY_TABLE} ...")
+        cur.execute(CREATE_PNL_SUMMARY)
+    cur.execute(CREATE_RVOL_TRIGGERS)
+    cur.execute(CREATE_CHANGE_TRACKING)
+    conn.commit()
+
+    # CONCURRENTLY keeps the tables writable, but cannot run inside a transaction
+    conn.autocommit = True
+    try:
+        for table, columns, name in find_missing_indexes(cur):
+            cols = ", ".join(f'"{c}"' for c in columns)
+            print(f"Creating index {name} on {table} ({cols}) ...")
+            cur.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON "{table}" ({cols});')
+        cur.execute(f'ANALYZE {RVOL_SUMMARY_TABLE};')
+    finally:
+        conn.autocommit = False
+        cur.close()
+
+
+def refresh(conn) -> None:
+    """Rebuild trade_latest_rvol, e.g. after marketdatad rows were deleted."""
+    with conn.cursor() as cur:
+        cur.execute(REFRESH_RVOL_SUMMARY)
+    conn.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check or create the indexes and summary tables Tradeviewer needs.")
+    parser.add_argument("command", choices=["check", "apply", "refresh"])
+    parser.add_argument("--config", default="database.ini")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**read_database_config(filename=args.config, section="postgresql"))
+    try:
+        if args.command == "check":
+            complete = check(conn.cursor())
+            raise SystemExit(0 if complete else 1)
+        if args.command == "apply":
+            apply(conn)
+        else:
+            refresh(conn)
+        check(conn.cursor())
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
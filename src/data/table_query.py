@@ -0,0 +1,81 @@
+import re
+
+# Translate the DataTable's custom paging props (filter_query, sort_by) into
+# parameterized SQL. Column names are only accepted if they appear in the
+# listing's own columns, values always travel as query parameters.
+
+FILTER_PART = re.compile(
+    r'^\{(?P<column>[^}]+)\}\s*'
+    r'(?P<operator>[si]?(?:contains|datestartswith|eq|ne|lt|le|gt|ge|<=|>=|!=|=|<|>))\s*'
+    r'(?P<value>.*)$'
+)
+
+COMPARISONS = {
+    'eq': '=', '=': '=',
+    'ne': '<>', '!=': '<>',
+    'lt': '<', '<': '<',
+    'le': '<=', '<=': '<=',
+    'gt': '>', '>': '>',
+    'ge': '>=', '>=': '>=',
+}
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+        return value[1:-1]
+    return value
+
+
+def parse_filter_query(filter_query: str) -> list:
+    """
+    Split a DataTable filter_query like '{Symbol} contains AAPL && {Rating} >= 3'
+    into (column, operator, value) tuples. Unparseable parts are skipped.
+    """
+    parts = []
+    for part in (filter_query or '').split(' && '):
+        match = FILTER_PART.match(part.strip())
+        if match:
+            parts.append((match['column'], match['operator'], _unquote(match['value'])))
+    return parts
+
+
+def build_where(filter_query: str, columns) -> tuple:
+    """Return ('WHERE ...' or '', params) for the filter_query, restricted to columns."""
+    clauses, params = [], []
+    for column, operator, value in parse_filter_query(filter_query):
+        if column not in columns:
+            continue
+        case_sensitive = operator.startswith('s')
+        case_insensitive = operator.startswith('i')
+        op = operator[1:] if operator[0] in 'si' and operator[1:] else operator
+
+        if op == 'contains':
+            like = 'LIKE' if case_sensitive else 'ILIKE'
+            clauses.append(f'CAST("{column}" AS text) {like} %s')
+            params.append(f'%{value}%')
+        elif op == 'datestartswith':
+            clauses.append(f'CAST("{column}" AS text) LIKE %s')
+            params.append(f'{value}%')
+        elif case_insensitive:
+            # ieq, ine, ilt ...: compare the text of both sides lower-cased
+            clauses.append(f'lower(CAST("{column}" AS text)) {COMPARISONS[op]} lower(%s)')
+            params.append(value)
+        else:
+            clauses.append(f'"{column}" {COMPARISONS[op]} %s')
+            params.append(value)
+
+    return (f"WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+
+def build_order_by(sort_by, columns, default: str, tiebreaker: str) -> str:
+    """ORDER BY for the DataTable sort_by list; tiebreaker keeps paging stable."""
+    terms = [
+        f'"{s["column_id"]}" {"DESC" if s.get("direction") == "desc" else "ASC"} NULLS LAST'
+        for s in (sort_by or [])
+        if s.get("column_id") in columns
+    ]
+    if not terms:
+        terms = [default]
+    terms.append(f'"{tiebreaker}"')
+    return 'ORDER BY ' + ', '.join(terms)
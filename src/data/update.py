@@ -1,5 +1,5 @@
-from src.data.db_functions import get_connection_and_cursor
-from src.data.db_functions import update_trade_setup, update_trade_rating  # import your existing functions
+from src.data.db_functions import pooled_connection_and_cursor
+from src.data.db_functions import update_trades_bulk
 
 def update_trade(database_config, trade_id: int, setup: str = None, rating: int = None) -> str:
 
@@ -7,19 +7,54 @@ def update_trade(database_config, trade_id: int, setup: str = None, rating: int
         return "No Trade ID provided."
 
     messages = []
+    if setup:
+        messages.append(f"Setup='{setup}'")
+    if rating is not None:
+        messages.append(f"Rating={rating}")
+    if not messages:
+        return "Nothing to update."
 
-    conn, cursor = get_connection_and_cursor(database_config)
     try:
-        if setup:
-            update_trade_setup(trade_id, setup, cursor, conn)
-            messages.append(f"Setup='{setup}'")
-        if rating is not None:
-            update_trade_rating(trade_id, rating, cursor, conn)
-            messages.append(f"Rating={rating}")
+        # Setup and rating go out in one statement / one commit
+        with pooled_connection_and_cursor(database_config) as (conn, cursor):
+            results = update_trades_bulk([(trade_id, setup or None, rating)], cursor, conn)
 
-        return f"Saved for Trade {trade_id}: {'; '.join(messages)}" if messages else "Nothing to update."
+        if results.get(int(trade_id)) != "updated":
+            return f"Trade {trade_id} not found."
+        return f"Saved for Trade {trade_id}: {'; '.join(messages)}"
 
     except Exception as e:
         return f"Error: {str(e)}"
-    finally:
-        conn.close()
+
+
+def update_trades(database_config, trade_ids, setup: str = None, rating: int = None) -> str:
+    """
+    Apply the same Setup and/or Rating to many trades in a single transaction
+    and summarize the per-trade results.
+    """
+    if not trade_ids:
+        return "No trades selected."
+    if not setup and rating is None:
+        return "Nothing to update."
+
+    try:
+        with pooled_connection_and_cursor(database_config) as (conn, cursor):
+            results = update_trades_bulk(
+                [(trade_id, setup or None, rating) for trade_id in trade_ids], cursor, conn
+            )
+    except Exception as e:
+        return f"Error: {str(e)} (no trades were changed)"
+
+    updated = [tid for tid, status in results.items() if status == "updated"]
+    missing = [tid for tid, status in results.items() if status != "updated"]
+
+    fields = []
+    if setup:
+        fields.append(f"Setup='{setup}'")
+    if rating is not None:
+        fields.append(f"Rating={rating}")
+
+    message = f"Saved for {len(updated)} trades: {'; '.join(fields)}"
+    if missing:
+        message += f" | Not found: {', '.join(map(str, missing))}"
+    return message
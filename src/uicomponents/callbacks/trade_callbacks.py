@@ -1,25 +1,17 @@
-from dash import Input, Output, State, no_update
+from dash import Input, Output, State, ClientsideFunction
 
 # --- Register Callbacks ---
-def register_callbacks(app):
+def register_callbacks(app, database_config):
     """
     Handles interaction between the trade table and trade ID input.
     Other components (header, table, charts) now have their own callbacks.
     """
-    @app.callback(
+    # When a user clicks a row in the trade table, update the Trade ID input box.
+    # Runs in the browser (assets/clientside.js); neighbouring trades are
+    # prefetched by the trade view callback once a trade is actually loaded.
+    app.clientside_callback(
+        ClientsideFunction("tradeviewer", "selectTradeId"),
         Output("trade-id-input", "value"),
         Input("trade-table", "active_cell"),
         State("trade-table", "derived_viewport_data"),
     )
-    def update_trade_id_input(active_cell, visible_data):
-        """
-        When a user clicks a row in the trade table, update the Trade ID input box.
-        """
-        if active_cell and visible_data:
-            row_index = active_cell["row"]
-            column_id = active_cell["column_id"]
-
-            if column_id == "TradeId" and 0 <= row_index < len(visible_data):
-                return visible_data[row_index]["TradeId"]
-
-        return no_update
\ No newline at end of file
@@ -0,0 +1,100 @@
+from dash import html, dcc, Input, Output, State, ClientsideFunction
+
+# Indicator / marker toggles, the timeframe switch and the intraday bar size.
+# The toggles and the timeframe switch run as clientside callbacks
+# (assets/clientside.js) on figures the browser already holds; a new bar size
+# is resampled on the server (see trade_view), with its progress in trade-load-progress.
+
+# Trace names the toggles switch, across the daily, 30-min and intraday charts
+TOGGLEABLE_TRACES = ["VWAP", "EMA9", "EMA65", "Relatr", "Executions"]
+
+TIMEFRAMES = [
+    {"label": "All", "value": "all"},
+    {"label": "Daily", "value": "daily"},
+    {"label": "30 min", "value": "min30"},
+    {"label": "Intraday", "value": "intraday"},
+]
+
+# Bar sizes of the intraday chart, see utils.resample.BAR_SIZES
+INTRADAY_BAR_SIZES = ["1m", "5m", "15m", "30m", "1h"]
+
+
+# --- Render function ---
+def render():
+    return html.Div(
+        className="chart-controls",
+        children=[
+            dcc.Checklist(
+                id="indicator-toggles",
+                options=[{"label": name, "value": name} for name in TOGGLEABLE_TRACES],
+                value=list(TOGGLEABLE_TRACES),
+                inline=True,
+                inputStyle={"marginRight": "3px", "marginLeft": "8px"},
+            ),
+            dcc.RadioItems(
+                id="timeframe-select",
+                options=TIMEFRAMES,
+                value="all",
+                inline=True,
+                inputStyle={"marginRight": "3px", "marginLeft": "8px"},
+                style={"marginLeft": "16px"},
+            ),
+            dcc.RadioItems(
+                id="intraday-bar-size",
+                options=[{"label": size, "value": size} for size in INTRADAY_BAR_SIZES],
+                value="1m",
+                inline=True,
+                inputStyle={"marginRight": "3px", "marginLeft": "8px"},
+                style={"marginLeft": "16px"},
+            ),
+            # Shown while a trade loads in the background (see trade_view)
+            html.Progress(id="trade-load-progress", value="0", max="4", style={"visibility": "hidden"}),
+            # Summary of the trade loaded in the charts; lets Fetch skip the server
+            dcc.Store(id="trade-bundle-store"),
+            dcc.Store(id="trade-request-store"),
+        ],
+        style={"display": "flex", "alignItems": "center", "marginBottom": "4px"},
+    )
+
+
+# --- Callback registration ---
+def register_callbacks(app):
+    app.clientside_callback(
+        ClientsideFunction("tradeviewer", "requestTrade"),
+        Output("trade-request-store", "data"),
+        Input("fetch-button", "n_clicks"),
+        State("trade-id-input", "value"),
+        State("trade-bundle-store", "data"),
+    )
+
+    app.clientside_callback(
+        ClientsideFunction("tradeviewer", "markBundleStale"),
+        Output("trade-bundle-store", "data", allow_duplicate=True),
+        Input("save-status-message", "children"),
+        State("trade-bundle-store", "data"),
+        prevent_initial_call=True,
+    )
+
+    app.clientside_callback(
+        ClientsideFunction("tradeviewer", "applyTraceVisibility"),
+        Output("daily-chart", "figure", allow_duplicate=True),
+        Output("chart30mins", "figure", allow_duplicate=True),
+        Output("intraday-chart", "figure", allow_duplicate=True),
+        Input("indicator-toggles", "value"),
+        Input("daily-chart", "figure"),
+        Input("chart30mins", "figure"),
+        Input("intraday-chart", "figure"),
+        State("indicator-toggles", "options"),
+        prevent_initial_call=True,
+    )
+
+    app.clientside_callback(
+        ClientsideFunction("tradeviewer", "showTimeframe"),
+        Output("daily-chart", "style"),
+        Output("chart30mins", "style"),
+        Output("intraday-chart", "style"),
+        Input("timeframe-select", "value"),
+        State("daily-chart", "style"),
+        State("chart30mins", "style"),
+        State("intraday-chart", "style"),
+    )
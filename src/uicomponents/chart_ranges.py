@@ -0,0 +1,127 @@
+from dash import html, dcc, Input, Output, State, Patch, no_update
+import pandas as pd
+from src.data.loader import RANGE_PARTS, RANGE_SETTINGS, load_more_bars
+from src.utils.figure_templates import trace_indices
+from src.uicomponents.daily_chart import DAILY_TRACES, daily_trace_arrays
+from src.uicomponents.min30_chart import MIN30_TRACES, min30_trace_arrays
+
+# The daily / 30-min charts start with the bars around the trade date only (see
+# loader.RANGE_SETTINGS). Panning or zooming past the first / last loaded bar
+# fetches the next chunk and merges it into the figure with a Patch, so only the
+# new bars travel to the browser. Per chart a dcc.Store remembers the loaded range.
+
+# part -> (graph id, store id, trace array builder)
+RANGE_CHARTS = {
+    "daily": ("daily-chart", "daily-range-store", daily_trace_arrays),
+    "min30": ("chart30mins", "min30-range-store", min30_trace_arrays),
+}
+
+# part -> trace order of the chart skeleton
+RANGE_TRACES = {"daily": DAILY_TRACES, "min30": MIN30_TRACES}
+
+# Fetch when the visible range gets within this many bars of the loaded edge
+EDGE_MARGIN = 1.0
+
+
+# --- Render function ---
+def render():
+    return html.Div([dcc.Store(id=store_id) for _, store_id, _ in RANGE_CHARTS.values()])
+
+
+def range_store(trade_id, part: str, df: pd.DataFrame) -> dict:
+    """Initial store data for a chart that was just loaded with df."""
+    if df is None or df.empty or not RANGE_SETTINGS["enabled"]:
+        return None
+    dates = pd.to_datetime(df["Date"])
+    return {
+        "trade_id": trade_id,
+        "first": str(dates.min()),
+        "last": str(dates.max()),
+        "count": len(df),
+        "older_done": False,
+        "newer_done": False,
+        "traces": trace_indices(RANGE_TRACES[part]),
+    }
+
+
+def _visible_range(relayout: dict):
+    """(start, end) category positions of the x axis from relayoutData, or None."""
+    for axis in ("xaxis", "xaxis2"):
+        if f"{axis}.range[0]" in relayout and f"{axis}.range[1]" in relayout:
+            return relayout[f"{axis}.range[0]"], relayout[f"{axis}.range[1]"]
+        if f"{axis}.range" in relayout:
+            return tuple(relayout[f"{axis}.range"])
+    return None
+
+
+def _prepend(node, values: list) -> None:
+    """Patch has no multi-item prepend: reverse, extend with the reversed values, reverse."""
+    node.reverse()
+    node.extend(values[::-1])
+    node.reverse()
+
+
+def _merge(patch: Patch, store: dict, arrays: dict, prepend: bool) -> None:
+    for name, props in arrays.items():
+        index = store["traces"].get(name)
+        if index is None:
+            continue
+        for prop, values in props.items():
+            if prepend:
+                _prepend(patch["data"][index][prop], values)
+            else:
+                patch["data"][index][prop].extend(values)
+
+
+# --- Callback registration ---
+def register_callbacks(app, database_config):
+    for part, (graph_id, store_id, trace_arrays) in RANGE_CHARTS.items():
+        _register_range_callback(app, database_config, part, graph_id, store_id, trace_arrays)
+
+
+def _register_range_callback(app, database_config, part, graph_id, store_id, trace_arrays):
+    chunk = RANGE_PARTS[part][2]
+
+    @app.callback(
+        Output(graph_id, "figure", allow_duplicate=True),
+        Output(store_id, "data", allow_duplicate=True),
+        Input(graph_id, "relayoutData"),
+        State(store_id, "data"),
+        prevent_initial_call=True,
+    )
+    def extend_chart_range(relayout, store):
+        """Fetch older / newer bars when the chart is panned past the loaded range."""
+        visible = _visible_range(relayout or {})
+        if not store or visible is None:
+            return no_update, no_update
+
+        start, end = visible
+        load_older = start < EDGE_MARGIN and not store["older_done"]
+        load_newer = end > store["count"] - 1 - EDGE_MARGIN and not store["newer_done"]
+        if not (load_older or load_newer):
+            return no_update, no_update
+
+        store = dict(store)
+        patch = Patch()
+
+        if load_older:
+            df = load_more_bars(store["trade_id"], part, store["first"], "older", database_config)
+            store["older_done"] = len(df) < RANGE_SETTINGS[chunk]
+            if not df.empty:
+                _merge(patch, store, trace_arrays(df), prepend=True)
+                store["first"] = str(pd.to_datetime(df["Date"]).min())
+                store["count"] += len(df)
+                # Category positions moved right by the prepended bars: keep the view
+                start, end = start + len(df), end + len(df)
+                for axis in ("xaxis", "xaxis2"):
+                    patch["layout"][axis]["range"] = [start, end]
+
+        if load_newer:
+            df = load_more_bars(store["trade_id"], part, store["last"], "newer", database_config)
+            store["newer_done"] = len(df) < RANGE_SETTINGS[chunk]
+            if not df.empty:
+                _merge(patch, store, trace_arrays(df), prepend=False)
+                store["last"] = str(pd.to_datetime(df["Date"]).max())
+                store["count"] += len(df)
+
+        return patch, store
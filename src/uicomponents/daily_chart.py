@@ -1,16 +1,34 @@
-from dash import Input, Output, State, no_update
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import pandas as pd
-from src.data.db_functions import get_connection_and_cursor, fetch_marketdata, fetch_trade_info, fetch_trade_executions
+from src.utils.figure_templates import apply_update, empty_update, execution_props, layout_update
 
+# Trace order of the skeleton: name -> trace type
+DAILY_TRACES = {'OHLC Daily': 'candlestick', 'Executions': 'scatter', 'Volume Daily': 'bar'}
+DAILY_AXES = ('xaxis', 'xaxis2', 'yaxis', 'yaxis2')
 
 
-def create_daily_plot_component(df_daily: pd.DataFrame, 
-                                df_executions: pd.DataFrame)-> go.Figure:
-    import pandas as pd
-    import plotly.graph_objects as go
-    from plotly.subplots import make_subplots
+def daily_trace_arrays(df_daily: pd.DataFrame) -> dict:
+    """
+    {trace name: {property: list}} of the bar traces. Plain lists rather than
+    NumPy arrays: chart_ranges prepends / extends them with Patch, which cannot
+    edit the base64 typed arrays NumPy data is serialized to.
+    """
+    dates = pd.to_datetime(df_daily['Date'], errors='coerce').dt.strftime('%Y-%m-%d').tolist()
+    return {
+        'OHLC Daily': {
+            'x': dates,
+            'open': df_daily['Open'].tolist(),
+            'high': df_daily['High'].tolist(),
+            'low': df_daily['Low'].tolist(),
+            'close': df_daily['Close'].tolist(),
+        },
+        'Volume Daily': {'x': dates, 'y': df_daily['Volume'].tolist()},
+    }
+
 
+def daily_skeleton() -> go.Figure:
+    """Daily chart without data: candles + execution markers over volume, traces in DAILY_TRACES order."""
     fig_daily = make_subplots(
         rows=2, cols=1,
         shared_xaxes=True,
@@ -19,83 +37,56 @@ def create_daily_plot_component(df_daily: pd.DataFrame,
         subplot_titles=[f'Daily']
     )
 
-    if not df_daily.empty:
-        df_daily = df_daily.copy()
-        df_daily['Date'] = pd.to_datetime(df_daily['Date'], errors='coerce')
-        df_daily['DateStr'] = df_daily['Date'].dt.strftime('%Y-%m-%d')
+    fig_daily.add_trace(go.Candlestick(
+        x=[], open=[], high=[], low=[], close=[],
+        name='OHLC Daily'
+    ), row=1, col=1)
 
-        fig_daily.add_trace(go.Candlestick(
-            x=df_daily['DateStr'],
-            open=df_daily['Open'],
-            high=df_daily['High'],
-            low=df_daily['Low'],
-            close=df_daily['Close'],
-            name='OHLC Daily'
-        ), row=1, col=1)
+    fig_daily.add_trace(go.Scatter(
+        x=[], y=[],
+        mode='markers',
+        marker=dict(size=12),
+        name='Executions'
+    ), row=1, col=1)
 
-        if df_executions is not None and not df_executions.empty:
-            df_executions = df_executions.copy()
-            # convert to datetime safely
-            df_executions['Date'] = pd.to_datetime(df_executions['Date'], errors='coerce')
-            df_executions = df_executions.dropna(subset=['Date'])  # drop rows where conversion failed
-            df_executions['DateStr'] = df_executions['Date'].dt.strftime('%Y-%m-%d')
+    fig_daily.add_trace(go.Bar(
+        x=[], y=[],
+        marker_color='blue',
+        name='Volume Daily'
+    ), row=2, col=1)
 
-            color_map = {'BUYTOOPEN': 'blue', 'BUYTOCLOSE': 'blue', 'SELLTOCLOSE': 'red', 'SELLTOOPEN': 'red'}
-            symbol_map = {'BUYTOOPEN': 'triangle-up', 'BUYTOCLOSE': 'triangle-up', 
-                          'SELLTOCLOSE': 'triangle-down', 'SELLTOOPEN': 'triangle-down'}
-            colors = df_executions['Side'].map(color_map).fillna('black')
-            symbols = df_executions['Side'].map(symbol_map).fillna('circle')
-            price_col = 'AvgPrice' if 'AvgPrice' in df_executions.columns else 'Price'
-
-            fig_daily.add_trace(go.Scatter(
-                x=df_executions['DateStr'],
-                y=df_executions[price_col],
-                mode='markers',
-                marker=dict(color=colors, size=12, symbol=symbols),
-                name='Executions'
-            ), row=1, col=1)
+    fig_daily.update_layout(
+        height=600,
+        showlegend=False,
+        xaxis=dict(type='category', tickangle=45, tickfont=dict(size=10)),
+        xaxis2=dict(type='category', tickangle=45, tickfont=dict(size=10)),
+        yaxis=dict(title='Price'),
+        yaxis2=dict(title='Volume'),
+        xaxis_rangeslider_visible=False,
+    )
+    return fig_daily
 
-        fig_daily.add_trace(go.Bar(
-            x=df_daily['DateStr'],
-            y=df_daily['Volume'],
-            marker_color='blue',
-            name='Volume Daily'
-        ), row=2, col=1)
 
-        fig_daily.update_layout(
-            height=600,
-            showlegend=False,
-            xaxis=dict(type='category', tickangle=45, tickfont=dict(size=10)),
-            xaxis2=dict(type='category', tickangle=45, tickfont=dict(size=10)),
-            yaxis=dict(title='Price'),
-            yaxis2=dict(title='Volume'),
-            xaxis_rangeslider_visible=False,
-        )
-    else:
-        fig_daily = go.Figure()
-        fig_daily.update_layout(title="No daily data available")
+def daily_figure_update(df_daily: pd.DataFrame, df_executions: pd.DataFrame) -> dict:
+    """Per-trade data of the daily skeleton, see figure_templates."""
+    if df_daily.empty:
+        return empty_update(DAILY_TRACES, DAILY_AXES, "No daily data available")
 
-    return fig_daily
+    arrays = daily_trace_arrays(df_daily)
+    executions = {'x': [], 'y': []}
+    if df_executions is not None and not df_executions.empty:
+        df_executions = df_executions.copy()
+        # convert to datetime safely
+        df_executions['Date'] = pd.to_datetime(df_executions['Date'], errors='coerce')
+        df_executions = df_executions.dropna(subset=['Date'])  # drop rows where conversion failed
+        executions = execution_props(df_executions, df_executions['Date'].dt.strftime('%Y-%m-%d').tolist())
 
-# --- Callback registration ---
-def register_daily_chart_callback(app, database_config):
-    @app.callback(
-        Output("daily-chart", "figure"),
-        Input("fetch-button", "n_clicks"),
-        State("trade-id-input", "value"),
- 
-    )
-    def update_daily_chart(n_clicks, trade_id):
-        if not trade_id:
-            return go.Figure()
+    return {
+        "data": [arrays['OHLC Daily'], executions, arrays['Volume Daily']],
+        "layout": layout_update(DAILY_AXES),
+    }
 
-        conn, cur = get_connection_and_cursor(database_config)
-        try:
-            df_daily = fetch_marketdata(trade_id, cur, "marketdatad")
-            trade_info = fetch_trade_info(trade_id, cur, "trades")
-            executions = fetch_trade_executions(trade_info, cur, "executions")
-        finally:
-            cur.close()
-            conn.close()
 
-        return create_daily_plot_component(df_daily, executions)
+def create_daily_plot_component(df_daily: pd.DataFrame, 
+                                df_executions: pd.DataFrame)-> go.Figure:
+    return apply_update(daily_skeleton(), daily_figure_update(df_daily, df_executions))
@@ -1,11 +1,17 @@
 from dash import Dash, html, dcc
+from src.utils.metrics import METRICS_SETTINGS
+from src.uicomponents.daily_chart import daily_skeleton
+from src.uicomponents.min30_chart import min30_skeleton
+from src.uicomponents.intraday_chart import intraday_skeleton
 from src.uicomponents import (
+    chart_controls,
+    chart_ranges,
+    metrics_panel,
+    overlay_chart,
     trade_controls,
-    daily_chart,
-    min30_chart,
-    intraday_chart,
     trade_info,
     trades_table,
+    trade_view,
 )
 
 def create_layout(app: Dash, database_config: dict) -> html.Div:
@@ -16,22 +22,29 @@ def create_layout(app: Dash, database_config: dict) -> html.Div:
 
     # --- Register callbacks ---
     trade_controls.register_callbacks(app, database_config)
-    trade_info.register_callbacks(app, database_config)
-    daily_chart.register_daily_chart_callback(app, database_config)
-    min30_chart.register_30min_chart_callback(app, database_config)
-    intraday_chart.register_intraday_chart_callback(app, database_config)
+    trade_view.register_callbacks(app, database_config)
     trades_table.register_callbacks(app, database_config)
+    overlay_chart.register_callbacks(app, database_config)
+    chart_ranges.register_callbacks(app, database_config)
+    chart_controls.register_callbacks(app)
+    show_metrics = METRICS_SETTINGS["enabled"] and METRICS_SETTINGS["debug_panel"]
+    if show_metrics:
+        metrics_panel.register_callbacks(app)
 
     # --- Instantiate components ---
     trade_controls_component = trade_controls.render()
     trade_header_component = trade_info.render()
     trade_table_component = trades_table.render()
+    overlay_component = overlay_chart.render()
+    range_stores = chart_ranges.render()
+    chart_controls_component = chart_controls.render()
 
     # --- Top Chart Row: Daily + 30min ---
+    # The charts start as empty skeletons; trade switches patch in the data
     top_chart_row = html.Div(
         [
-            dcc.Graph(id="daily-chart", style={"height": "600px", "width": "100%"}),
-            dcc.Graph(id="chart30mins", style={"height": "600px", "width": "100%"}),
+            dcc.Graph(id="daily-chart", figure=daily_skeleton(), style={"height": "600px", "width": "100%"}),
+            dcc.Graph(id="chart30mins", figure=min30_skeleton(), style={"height": "600px", "width": "100%"}),
         ],
         style={
             "display": "flex",
@@ -60,7 +73,7 @@ def create_layout(app: Dash, database_config: dict) -> html.Div:
     bottom_row = html.Div(
         [
             html.Div(
-                dcc.Graph(id="intraday-chart", style={"height": "600px", "width": "100%"}),
+                dcc.Graph(id="intraday-chart", figure=intraday_skeleton(), style={"height": "600px", "width": "100%"}),
                 style={
                     "flex": "1",
                     "padding": "5px",
@@ -100,7 +113,10 @@ def create_layout(app: Dash, database_config: dict) -> html.Div:
         children=[
             html.H1(app.title),
             status_display,
+            chart_controls_component,
             top_chart_row,
             bottom_row,
-        ],
+            overlay_component,
+            range_stores,
+        ] + ([metrics_panel.render()] if show_metrics else []),
     )
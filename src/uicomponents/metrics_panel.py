@@ -0,0 +1,57 @@
+from dash import html, dcc, Input, Output
+from src.utils.metrics import registry
+
+# Debug panel with the latest latency / size summaries of src.utils.metrics.
+# Only part of the layout when [metrics] debug_panel = true; it polls the
+# in-process registry, so with several workers it shows the serving worker only.
+
+REFRESH_MS = 5000
+
+# Metric name suffix -> display unit
+UNITS = {"_seconds": ("ms", 1000.0), "_bytes": ("KiB", 1 / 1024)}
+
+
+# --- Render function ---
+def render():
+    return html.Details(
+        [
+            html.Summary("Performance metrics"),
+            dcc.Interval(id="metrics-interval", interval=REFRESH_MS),
+            html.Div(id="metrics-panel-table"),
+        ],
+        style={"marginTop": "10px", "fontSize": "13px"},
+    )
+
+
+def _scale(name: str):
+    for suffix, (unit, factor) in UNITS.items():
+        if name.endswith(suffix):
+            return unit, factor
+    return "", 1.0
+
+
+def metrics_table() -> html.Table:
+    header = html.Tr([html.Th(c) for c in ("Metric", "Labels", "Count", "p50", "p95", "p99", "Unit")])
+    rows = []
+    for name, labels, count, _, quantiles in registry.snapshot():
+        unit, factor = _scale(name)
+        rows.append(html.Tr(
+            [
+                html.Td(name.removeprefix("tradeviewer_")),
+                html.Td(", ".join(f"{k}={v}" for k, v in labels.items())),
+                html.Td(count),
+            ]
+            + [html.Td(f"{value * factor:.1f}") for value in quantiles.values()]
+            + [html.Td(unit)]
+        ))
+    return html.Table([header] + rows, style={"borderSpacing": "12px 2px"})
+
+
+# --- Callback registration ---
+def register_callbacks(app):
+    @app.callback(
+        Output("metrics-panel-table", "children"),
+        Input("metrics-interval", "n_intervals"),
+    )
+    def refresh_metrics_panel(_):
+        return metrics_table()
@@ -1,119 +1,115 @@
-from dash import Input, Output, State, no_update
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
-from src.data.db_functions import get_connection_and_cursor, fetch_marketdata30mins, fetch_trade_info, fetch_trade_executions
-from src.utils.helper_functions import align_execution_times_to_30mins
+from src.utils.figure_templates import apply_update, empty_update, execution_props, layout_update
 
-def create_30min_plot_component(df_30min: pd.DataFrame, 
-                                df_executions: pd.DataFrame)-> go.Figure:
-    if not df_30min.empty:
-        df_30min = df_30min.copy()
-        # Format datetime as date+time string without seconds (for cleaner labels)
-        df_30min['DateStr'] = df_30min['Date'].dt.strftime('%Y-%m-%d %H:%M')
-
-        fig_30min = make_subplots(
-            rows=2, cols=1,
-            shared_xaxes=True,
-            vertical_spacing=0.02,
-            row_heights=[0.7, 0.2],
-            subplot_titles=[f'30-Minutes']
-        )
+# Trace order of the skeleton: name -> trace type
+MIN30_TRACES = {'OHLC 30min': 'candlestick', 'EMA65': 'scatter', 'Executions': 'scatter', 'Volume 30min': 'bar'}
+MIN30_AXES = ('xaxis', 'xaxis2', 'yaxis', 'yaxis2')
 
-        fig_30min.add_trace(go.Candlestick(
-            x=df_30min['DateStr'],
-            open=df_30min['Open'],
-            high=df_30min['High'],
-            low=df_30min['Low'],
-            close=df_30min['Close'],
-            name='OHLC 30min'
-        ), row=1, col=1)
-
-        if 'EMA65' in df_30min.columns:
-            fig_30min.add_trace(go.Scatter(
-                x=df_30min['DateStr'],
-                y=df_30min['EMA65'],
-                mode='lines',
-                line=dict(color='blue', width=1),
-                name='EMA65'
-            ), row=1, col=1)
-
-        # ➕ Execution markers (30min)
-        if df_executions is not None and not df_executions.empty:
-            df_executions = df_executions.copy()
-            # Combine Date and Time as string (same format as df_30min DateStr)
-            df_executions['DateTimeStr'] = df_executions.apply(
-                lambda row: f"{row['Date'].strftime('%Y-%m-%d')} {row['Time'].strftime('%H:%M')}", axis=1
-            )
-
-            color_map = {'BUYTOOPEN': 'blue', 'BUYTOCLOSE': 'blue', 'SELLTOCLOSE': 'red', 'SELLTOOPEN': 'red'}
-            symbol_map = {'BUYTOOPEN': 'triangle-up', 'BUYTOCLOSE': 'triangle-up', 'SELLTOCLOSE': 'triangle-down', 'SELLTOOPEN': 'triangle-down'}
-            colors = df_executions['Side'].map(color_map).fillna('black')
-            symbols = df_executions['Side'].map(symbol_map).fillna('circle')
-            price_col = 'AvgPrice' if 'AvgPrice' in df_executions.columns else 'Price'
-
-            fig_30min.add_trace(go.Scatter(
-                x=df_executions['DateTimeStr'],
-                y=df_executions[price_col],
-                mode='markers',
-                marker=dict(color=colors, size=12, symbol=symbols),
-                name='Executions'
-            ), row=1, col=1)
-
-        fig_30min.add_trace(go.Bar(
-            x=df_30min['DateStr'],
-            y=df_30min['Volume'],
-            marker_color='blue',
-            name='Volume 30min'
-        ), row=2, col=1)
-
-        fig_30min.update_layout(
-            height=600,
-            showlegend=False,
-            xaxis=dict(
-                type='category',
-                tickangle=45,
-                tickfont=dict(size=15),
-                showticklabels=False
-            ),
-            xaxis2=dict(
-                type='category',
-                tickangle=45,
-                tickfont=dict(size=15),
-                showticklabels=False
-            ),
-            yaxis=dict(title='Price'),
-            yaxis2=dict(title='Volume'),
-            xaxis_rangeslider_visible=False,
-        )
-    else:
-        fig_30min = go.Figure()
-        fig_30min.update_layout(title="No 30-minute data available")
 
-    return fig_30min
+def min30_trace_arrays(df_30min: pd.DataFrame) -> dict:
+    """{trace name: {property: list}} of the bar traces, see daily_trace_arrays."""
+    # Date + time without seconds (for cleaner labels)
+    dates = pd.to_datetime(df_30min['Date'], errors='coerce').dt.strftime('%Y-%m-%d %H:%M').tolist()
+    arrays = {
+        'OHLC 30min': {
+            'x': dates,
+            'open': df_30min['Open'].tolist(),
+            'high': df_30min['High'].tolist(),
+            'low': df_30min['Low'].tolist(),
+            'close': df_30min['Close'].tolist(),
+        },
+        'Volume 30min': {'x': dates, 'y': df_30min['Volume'].tolist()},
+    }
+    if 'EMA65' in df_30min.columns:
+        arrays['EMA65'] = {'x': dates, 'y': df_30min['EMA65'].tolist()}
+    return arrays
+
+
+def min30_skeleton() -> go.Figure:
+    """30-min chart without data, traces in MIN30_TRACES order."""
+    fig_30min = make_subplots(
+        rows=2, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.02,
+        row_heights=[0.7, 0.2],
+        subplot_titles=[f'30-Minutes']
+    )
+
+    fig_30min.add_trace(go.Candlestick(
+        x=[], open=[], high=[], low=[], close=[],
+        name='OHLC 30min'
+    ), row=1, col=1)
 
-# --- Callback registration ---
-def register_30min_chart_callback(app, database_config):
-    @app.callback(
-        Output("chart30mins", "figure"),
-        Input("fetch-button", "n_clicks"),
-        State("trade-id-input", "value"),
+    fig_30min.add_trace(go.Scatter(
+        x=[], y=[],
+        mode='lines',
+        line=dict(color='blue', width=1),
+        name='EMA65'
+    ), row=1, col=1)
+
+    # ➕ Execution markers (30min)
+    fig_30min.add_trace(go.Scatter(
+        x=[], y=[],
+        mode='markers',
+        marker=dict(size=12),
+        name='Executions'
+    ), row=1, col=1)
+
+    fig_30min.add_trace(go.Bar(
+        x=[], y=[],
+        marker_color='blue',
+        name='Volume 30min'
+    ), row=2, col=1)
+
+    fig_30min.update_layout(
+        height=600,
+        showlegend=False,
+        xaxis=dict(
+            type='category',
+            tickangle=45,
+            tickfont=dict(size=15),
+            showticklabels=False
+        ),
+        xaxis2=dict(
+            type='category',
+            tickangle=45,
+            tickfont=dict(size=15),
+            showticklabels=False
+        ),
+        yaxis=dict(title='Price'),
+        yaxis2=dict(title='Volume'),
+        xaxis_rangeslider_visible=False,
     )
-    def update_30min_chart(n_clicks, trade_id):
-        if not trade_id:
-            return go.Figure()
+    return fig_30min
 
-        conn, cur = get_connection_and_cursor(database_config)
-        try:
-            df_30min = fetch_marketdata30mins(trade_id, cur, "marketdata30mins")
-            trade_info = fetch_trade_info(trade_id, cur, "trades")
-            executions = fetch_trade_executions(trade_info, cur, "executions")
-        finally:
-            cur.close()
-            conn.close()
 
-        # --- Align executions to 30min bars ---
-        executions_aligned = align_execution_times_to_30mins(executions, df_30min)
+def min30_figure_update(df_30min: pd.DataFrame, df_executions: pd.DataFrame) -> dict:
+    """Per-trade data of the 30-min skeleton, see figure_templates."""
+    if df_30min.empty:
+        return empty_update(MIN30_TRACES, MIN30_AXES, "No 30-minute data available")
 
+    arrays = min30_trace_arrays(df_30min)
+    executions = {'x': [], 'y': []}
+    if df_executions is not None and not df_executions.empty:
+        # Combine Date and Time as string (same format as the 30-min x labels)
+        labels = df_executions.apply(
+            lambda row: f"{row['Date'].strftime('%Y-%m-%d')} {row['Time'].strftime('%H:%M')}", axis=1
+        )
+        executions = execution_props(df_executions, labels.tolist())
 
-        return create_30min_plot_component(df_30min, executions_aligned)
\ No newline at end of file
+    return {
+        "data": [
+            arrays['OHLC 30min'],
+            arrays.get('EMA65', {'x': [], 'y': []}),
+            executions,
+            arrays['Volume 30min'],
+        ],
+        "layout": layout_update(MIN30_AXES),
+    }
+
+
+def create_30min_plot_component(df_30min: pd.DataFrame, 
+                                df_executions: pd.DataFrame)-> go.Figure:
+    return apply_update(min30_skeleton(), min30_figure_update(df_30min, df_executions))
@@ -0,0 +1,89 @@
+from dash import html, dcc, Input, Output, State
+import plotly.graph_objects as go
+import plotly.express as px
+from src.data.loader import load_overlay_data
+from src.utils.helper_functions import normalize_to_entry
+
+# Upper bound on overlaid trades, more lines than this is unreadable anyway
+MAX_OVERLAY_TRADES = 20
+
+
+# --- Render function ---
+def render():
+    """Overlay button + chart comparing the selected trades from their entry."""
+    return html.Div(
+        [
+            html.Button("Overlay Selected", id="overlay-button", n_clicks=0, style={"marginBottom": "5px"}),
+            dcc.Graph(id="overlay-chart", style={"height": "600px", "width": "100%"}),
+        ],
+        style={"padding": "5px", "boxSizing": "border-box"},
+    )
+
+
+def create_overlay_plot_component(overlay_data: dict) -> go.Figure:
+    """
+    One line per trade: minutes from entry on x, % move from the entry price on y.
+    overlay_data is {trade_id: {"intraday": DataFrame, "executions": DataFrame}}.
+    """
+    fig = go.Figure()
+    colors = px.colors.qualitative.Plotly
+
+    for i, (trade_id, data) in enumerate(overlay_data.items()):
+        df_bars, df_executions = normalize_to_entry(data["intraday"], data["executions"])
+        if df_bars.empty:
+            continue
+
+        color = colors[i % len(colors)]
+        symbol = df_bars["Symbol"].iloc[0] if "Symbol" in df_bars.columns else ""
+        name = f"{trade_id} {symbol}".strip()
+
+        fig.add_trace(go.Scattergl(
+            x=df_bars["MinutesFromEntry"],
+            y=df_bars["PctFromEntry"],
+            mode="lines",
+            line=dict(color=color, width=1.5),
+            name=name,
+            legendgroup=name,
+        ))
+
+        if not df_executions.empty:
+            fig.add_trace(go.Scattergl(
+                x=df_executions["MinutesFromEntry"],
+                y=df_executions["PctFromEntry"],
+                mode="markers",
+                marker=dict(color=color, size=9, symbol="diamond"),
+                name=f"{name} executions",
+                legendgroup=name,
+                showlegend=False,
+            ))
+
+    if not fig.data:
+        fig.update_layout(title="Select trades in the table to overlay them")
+        return fig
+
+    fig.add_hline(y=0, line=dict(color="black", width=1, dash="dash"))
+    fig.add_vline(x=0, line=dict(color="black", width=1, dash="dash"))
+    fig.update_layout(
+        title="Trades overlaid from entry",
+        xaxis=dict(title="Minutes from entry"),
+        yaxis=dict(title="% from entry price"),
+    )
+    return fig
+
+
+# --- Callback registration ---
+def register_callbacks(app, database_config):
+    """Loads all selected trades with one batched query per table and overlays them."""
+    @app.callback(
+        Output("overlay-chart", "figure"),
+        Input("overlay-button", "n_clicks"),
+        State("trade-table", "selected_row_ids"),
+        prevent_initial_call=True,
+    )
+    def update_overlay_chart(n_clicks, selected_ids):
+        trade_ids = [int(t) for t in (selected_ids or [])][:MAX_OVERLAY_TRADES]
+        if not trade_ids:
+            return create_overlay_plot_component({})
+
+        overlay_data = load_overlay_data(trade_ids, database_config)
+        return create_overlay_plot_component(overlay_data)
@@ -25,6 +25,10 @@ def render():
             dcc.Input(id="rating-input", type="number", min=1, max=5, step=1, style={"width": "50px"}),
 
             html.Button("Save Rating", id="save-rating-button", n_clicks=0, style={"marginLeft": "4px"}),
+
+            html.Button("Apply to Selected", id="save-selected-button", n_clicks=0,
+                        title="Apply the chosen setup and/or rating to every selected row of the trade table",
+                        style={"marginLeft": "8px"}),
         ],
     )
 
@@ -36,18 +40,27 @@ def register_callbacks(app, database_config):
         Output("save-status-message", "children"),
         Input("save-setup-button", "n_clicks"),
         Input("save-rating-button", "n_clicks"),
+        Input("save-selected-button", "n_clicks"),
         State("trade-id-input", "value"),
         State("setup-dropdown", "value"),
         State("rating-input", "value"),
+        State("trade-table", "selected_row_ids"),
         prevent_initial_call=True,
     )
-    def update_trade_callback(setup_clicks, rating_clicks, trade_id, setup, rating):
+    def update_trade_callback(setup_clicks, rating_clicks, selected_clicks, trade_id, setup, rating, selected_ids):
         ctx = callback_context
-        if not ctx.triggered or not trade_id:
+        if not ctx.triggered:
             raise dash.exceptions.PreventUpdate
 
         triggered = ctx.triggered[0]["prop_id"].split(".")[0]
 
+        # Bulk mode: both fields, every selected row, one transaction
+        if triggered == "save-selected-button":
+            return update.update_trades(database_config, selected_ids, setup, rating)
+
+        if not trade_id:
+            raise dash.exceptions.PreventUpdate
+
         # Only pass the value relevant to the button clicked
         setup_value = setup if triggered == "save-setup-button" else None
         rating_value = rating if triggered == "save-rating-button" else None
@@ -0,0 +1,155 @@
+from dash import Input, Output, State, no_update
+from src.data.loader import load_trade_bundle, intraday_bars
+from src.data.prefetch import PREFETCH_SETTINGS, get_prefetcher, neighbour_ids
+from src.utils.helper_functions import align_execution_times_to_intraday, align_execution_times_to_30mins
+from src.utils.figure_cache import cached_figure
+from src.utils.figure_templates import update_patch
+from src.utils.downsample import LOD_SETTINGS
+from src.utils.background import background_callback, report_progress
+from src.uicomponents.daily_chart import daily_figure_update
+from src.uicomponents.min30_chart import min30_figure_update
+from src.uicomponents.intraday_chart import intraday_figure_update
+from src.uicomponents.trade_info import create_trade_header
+from src.uicomponents.chart_ranges import range_store
+
+
+# (value, max) of the progress bar while a trade view job runs, see chart_controls
+PROGRESS_OUTPUTS = [Output("trade-load-progress", "value"), Output("trade-load-progress", "max")]
+PROGRESS_RUNNING = [
+    (Output("trade-load-progress", "style"), {"visibility": "visible"}, {"visibility": "hidden"}),
+]
+
+
+# --- Callback registration ---
+def register_callbacks(app, database_config):
+    """
+    Loads the trade bundle once per trade request (a Fetch click for a trade
+    that is not loaded yet, see chart_controls) and fans it out to the header
+    and all three charts, and resets the loaded ranges of the daily / 30-min
+    charts. The charts keep the skeletons they got at startup and only receive
+    the new arrays as Patches. Neighbouring table rows are prefetched in the background.
+    A new intraday bar size only patches the intraday chart, from the bundle in trade_cache.
+    With [background] enabled both run as background jobs (utils.background) that report
+    their progress in trade-load-progress; a new trade request kills the job of the previous one.
+    """
+    @app.callback(
+        Output("trade-header", "children"),
+        Output("daily-chart", "figure"),
+        Output("chart30mins", "figure"),
+        Output("intraday-chart", "figure"),
+        Output("daily-range-store", "data"),
+        Output("min30-range-store", "data"),
+        Output("trade-bundle-store", "data"),
+        Input("trade-request-store", "data"),
+        State("intraday-bar-size", "value"),
+        prevent_initial_call=True,
+        **background_callback(progress=PROGRESS_OUTPUTS, running=PROGRESS_RUNNING),
+    )
+    @report_progress
+    def update_trade_view(set_progress, request, bar_size):
+        trade_id = (request or {}).get("trade_id")
+        if not trade_id:
+            return no_update, no_update, no_update, no_update, None, None, None
+
+        set_progress((0, 4))
+        bundle = load_trade_bundle(trade_id, database_config)
+        executions = bundle["executions"]
+        set_progress((1, 4))
+
+        header = create_trade_header(trade_id, bundle["trade"], bundle["rvol"])
+
+        # Figure updates come from the disk cache while their input data is unchanged
+        update_daily = cached_figure(
+            trade_id, "daily", [bundle["daily"], executions],
+            lambda: daily_figure_update(bundle["daily"], executions),
+        )
+        set_progress((2, 4))
+        update_30min = cached_figure(
+            trade_id, "30min", [bundle["min30"], executions],
+            lambda: min30_figure_update(
+                bundle["min30"], align_execution_times_to_30mins(executions, bundle["min30"])
+            ),
+        )
+        set_progress((3, 4))
+        update_intraday = intraday_update(trade_id, bundle, bar_size)
+
+        return (
+            header,
+            update_patch(update_daily),
+            update_patch(update_30min),
+            update_patch(update_intraday),
+            range_store(trade_id, "daily", bundle["daily"]),
+            range_store(trade_id, "min30", bundle["min30"]),
+            bundle_summary(bundle),
+        )
+
+    @app.callback(
+        Output("intraday-chart", "figure", allow_duplicate=True),
+        Input("intraday-bar-size", "value"),
+        State("trade-bundle-store", "data"),
+        prevent_initial_call=True,
+        **background_callback(
+            progress=PROGRESS_OUTPUTS, running=PROGRESS_RUNNING, cancel=[Input("trade-request-store", "data")]
+        ),
+    )
+    @report_progress
+    def update_intraday_bar_size(set_progress, bar_size, loaded):
+        trade_id = (loaded or {}).get("trade_id")
+        if not trade_id:
+            return no_update
+        set_progress((0, 2))
+        bundle = load_trade_bundle(trade_id, database_config)
+        set_progress((1, 2))
+        return update_patch(intraday_update(trade_id, bundle, bar_size))
+
+    # In the server process, where the prefetcher's threads and cache live
+    @app.callback(
+        Input("trade-request-store", "data"),
+        State("trade-table", "derived_viewport_data"),
+        prevent_initial_call=True,
+    )
+    def prefetch_neighbours(request, visible_data):
+        """Prefetch the rows around the requested trade in the table's current sort order."""
+        trade_id = (request or {}).get("trade_id")
+        prefetcher = get_prefetcher(database_config)
+        if not trade_id or prefetcher is None:
+            return
+        rows = visible_data or []
+        row_index = next((i for i, row in enumerate(rows) if row.get("TradeId") == trade_id), None)
+        neighbours = neighbour_ids(rows, row_index, PREFETCH_SETTINGS["neighbours"]) if row_index is not None else []
+        prefetcher.select(trade_id, neighbours)
+
+
+def intraday_update(trade_id, bundle: dict, bar_size: str) -> dict:
+    """Intraday figure update at bar_size; executions snap to the bar they fall in."""
+    bar_size = bar_size or "1m"
+    bars = intraday_bars(bundle, bar_size)
+    executions = bundle["executions"]
+    how = "nearest" if bar_size == "1m" else "previous"
+    max_points = LOD_SETTINGS["max_points"]
+    # The LOD settings shape the figure as much as the data does
+    chart = "intraday" if bar_size == "1m" else f"intraday{bar_size}"
+    chart = f"{chart}_lod{max_points}_gl{LOD_SETTINGS['webgl_threshold']}"
+    return cached_figure(
+        trade_id, chart, [bars, executions],
+        lambda: intraday_figure_update(
+            bars, align_execution_times_to_intraday(executions, bars, how), max_points,
+        ),
+    )
+
+
+def bundle_summary(bundle: dict) -> dict:
+    """JSON-able summary of the loaded bundle kept in the browser (trade-bundle-store)."""
+    trade = bundle["trade"] or {}
+    rvol = bundle["rvol"]
+    return {
+        "trade_id": bundle["trade_id"],
+        "symbol": trade.get("Symbol"),
+        "date": trade["Date"].strftime("%Y-%m-%d") if trade.get("Date") is not None else None,
+        "setup": trade.get("Setup"),
+        "rating": trade.get("Rating"),
+        "rvol": None if rvol != rvol else rvol,
+        "executions": len(bundle["executions"]),
+        "bars": {part: len(bundle[part]) for part in ("daily", "min30", "intraday")},
+        "stale": False,
+    }
@@ -1,32 +1,33 @@
-from dash import html, dash_table, Input, Output, State, no_update
-from src.data.db_functions import get_connection_and_cursor, fetch_trades_with_rvol
+import json
+
+from dash import html, dcc, dash_table, Input, Output, State, Patch, no_update, callback_context
+from plotly.io.json import to_json_plotly
+
+from src.common.read_configs_in import apply_settings
+from src.data.db_functions import (
+    pooled_connection_and_cursor, fetch_trades_page, fetch_trades_listing_columns,
+    has_change_tracking, fetch_trades_version, fetch_trades_changes,
+)
+
+PAGE_SIZE = 15
+
+TABLE_SETTINGS = {
+    "refresh_seconds": 15.0,    # poll for changed / new trades, 0 = only after saves
+}
 
-def generate_table(dataframe, max_rows=15):
-    """
-    Generate a clean DataTable styled entirely through external CSS.
-    """
-    return dash_table.DataTable(
-        id='trade-table',
-        columns=[{"name": i, "id": i} for i in dataframe.columns],
-        data=dataframe.to_dict('records'),
-        sort_action='native',
-        page_size=max_rows,
-        page_action='native',
-        fixed_rows={'headers': True},
-        persistence=True,
-        persistence_type='session',
-        persisted_props=['page_current', 'sort_by', 'filter_query'],
-        style_as_list_view=True,
-        
-    )
+
+def configure_table(**settings) -> None:
+    """Override TABLE_SETTINGS, e.g. from the optional [table] section of database.ini."""
+    apply_settings(TABLE_SETTINGS, "table", **settings)
 
 
 # --- Render function ---
 def render():
     """
-    Returns the placeholder Div for the trade table.
-    The content will be updated via callback.
+    Returns the trade table. Paging, sorting and filtering run on the server:
+    only the visible page is queried and sent to the browser.
     """
+    refresh_ms = int(TABLE_SETTINGS["refresh_seconds"] * 1000)
     return html.Div(
         id="trade-data-table",
         children=[
@@ -34,35 +35,140 @@ def render():
                 id="trade-table",
                 columns=[],
                 data=[],
+                page_current=0,
+                page_size=PAGE_SIZE,
+                page_action='custom',
+                sort_action='custom',
+                sort_mode='multi',
+                sort_by=[],
+                filter_action='custom',
+                filter_query='',
+                row_selectable='multi',
+                selected_row_ids=[],
+                fixed_rows={'headers': True},
+                persistence=True,
+                persistence_type='session',
+                persisted_props=['page_current', 'sort_by', 'filter_query'],
+                style_as_list_view=True,
                 style_table={"overflowX": "auto"},
-            )
+            ),
+            # Change-tracking watermark of the page above (db_functions.fetch_trades_version)
+            dcc.Store(id="trade-table-version"),
+            dcc.Interval(id="trade-table-refresh", interval=max(refresh_ms, 1000), disabled=refresh_ms <= 0),
         ],
         style={"width": "95%", "padding": "20px"}
     )
 
 
+def _load_page(cur, page_current, page_size, sort_by, filter_query) -> tuple:
+    """(records, columns, page_count, version) of one page of the trade table."""
+    # Watermark first: a change committed while the page loads is picked up by the next refresh
+    version = fetch_trades_version(cur, "trades") if has_change_tracking(cur) else None
+    columns = fetch_trades_listing_columns(cur, "trades", "marketdatad")
+    df_page, total = fetch_trades_page(
+        cur, "trades", "marketdatad", page_current, page_size, sort_by, filter_query
+    )
+
+    if not df_page.empty:
+        df_page["id"] = df_page["TradeId"]
+
+    page_count = max(1, -(-total // page_size))
+    return df_page.to_dict('records'), [{"name": c, "id": c} for c in columns], page_count, version
+
+
+def _patch_rows(data: list, records: list, changed_ids: list, sort_by):
+    """
+    Patch replacing the changed rows of data in place, no_update when none of them
+    differs from what data holds, or None when the change can move rows: a changed
+    trade is not on the page, left the filter or has new values in a sort column.
+    """
+    positions = {row["id"]: i for i, row in enumerate(data)}
+    on_page = {tid for tid in changed_ids if tid in positions}
+    visible = {record["id"] for record in records}
+    if visible - on_page or on_page - visible:
+        return None
+
+    # The default order (latest RelativeVolume date) moves with RelativeVolume
+    sort_columns = [s["column_id"] for s in sort_by or []] or ["RelativeVolume"]
+    patch, patched = Patch(), False
+    for record in records:
+        old = data[positions[record["id"]]]
+        if record == old:
+            # Delivered again while its writer was still running at the last watermark
+            continue
+        if any(record.get(col) != old.get(col) for col in sort_columns):
+            return None
+        patch[positions[record["id"]]] = record
+        patched = True
+    return patch if patched else no_update
+
+
 def register_callbacks(app, database_config):
     """
-    Updates the trade table when the Fetch Data button is clicked or trade-id changes.
+    Fetches the requested page of the trade table on Fetch Data clicks and whenever
+    the page, sort or filter changes. Rows carry id=TradeId so multi-row selection
+    survives paging.
+    After saves and on every trade-table-refresh tick only trades changed since the
+    page was loaded are fetched (trades."RowVersion", see src.data.schema). Edits of
+    rows on the page are patched into the table; new trades, or changes that move
+    rows, reload just the current page.
     """
     @app.callback(
-        Output("trade-data-table", "children"),
+        Output("trade-table", "data"),
+        Output("trade-table", "columns"),
+        Output("trade-table", "page_count"),
+        Output("trade-table-version", "data"),
         Input("fetch-button", "n_clicks"),
-        State("trade-id-input", "value"),
+        Input("trade-table", "page_current"),
+        Input("trade-table", "page_size"),
+        Input("trade-table", "sort_by"),
+        Input("trade-table", "filter_query"),
+    )
+    def update_trade_table(n_clicks, page_current, page_size, sort_by, filter_query):
+        with pooled_connection_and_cursor(database_config) as (conn, cur):
+            return _load_page(cur, page_current or 0, page_size or PAGE_SIZE, sort_by, filter_query)
+
+    @app.callback(
+        Output("trade-table", "data", allow_duplicate=True),
+        Output("trade-table", "page_count", allow_duplicate=True),
+        Output("trade-table-version", "data", allow_duplicate=True),
+        Input("save-status-message", "children"),
+        Input("trade-table-refresh", "n_intervals"),
+        State("trade-table-version", "data"),
+        State("trade-table", "data"),
+        State("trade-table", "page_current"),
+        State("trade-table", "page_size"),
+        State("trade-table", "sort_by"),
+        State("trade-table", "filter_query"),
+        prevent_initial_call=True,
     )
-    def update_trade_table(n_clicks, trade_id):
-        if not trade_id:
-            return no_update
-
-        conn, cur = get_connection_and_cursor(database_config)
-        try:
-            df_rvol_trades = fetch_trades_with_rvol(cur, "trades", "marketdatad")
-        finally:
-            cur.close()
-            conn.close()
-
-        if df_rvol_trades.empty:
-            return html.Div("No trades available for this Trade ID.")
-
-        
-        return generate_table(df_rvol_trades)
\ No newline at end of file
+    def refresh_trade_table(save_status, n_intervals, version, data, page_current, page_size, sort_by, filter_query):
+        page_current = page_current or 0
+        page_size = page_size or PAGE_SIZE
+
+        triggered = callback_context.triggered[0]["prop_id"].split(".")[0]
+
+        with pooled_connection_and_cursor(database_config) as (conn, cur):
+            if not has_change_tracking(cur) or version is None:
+                # Without change tracking only saves reload the page, as before
+                if triggered == "trade-table-refresh":
+                    return no_update, no_update, no_update
+                records, _, page_count, version = _load_page(cur, page_current, page_size, sort_by, filter_query)
+                return records, page_count, version
+
+            changed_ids, new_version, df_changed = fetch_trades_changes(
+                cur, "trades", "marketdatad", version, filter_query
+            )
+            if not changed_ids:
+                return no_update, no_update, new_version
+
+            # Compare in the form the browser holds the rows (dates as ISO strings)
+            if not df_changed.empty:
+                df_changed["id"] = df_changed["TradeId"]
+            records = json.loads(to_json_plotly(df_changed.to_dict('records')))
+            patch = _patch_rows(data or [], records, changed_ids, sort_by)
+            if patch is not None:
+                return patch, no_update, new_version
+
+            records, _, page_count, version = _load_page(cur, page_current, page_size, sort_by, filter_query)
+            return records, page_count, version
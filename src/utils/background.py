@@ -0,0 +1,90 @@
+import os
+
+try:
+    import diskcache
+    import multiprocess  # noqa: F401  (DiskcacheManager runs every job in a multiprocess.Process)
+    import psutil  # noqa: F401  (... and kills it through psutil on cancel)
+    from dash import DiskcacheManager
+except ImportError:     # optional: without them the heavy callbacks run in the request thread
+    diskcache = None
+
+from src.common.read_configs_in import apply_settings
+
+# Dash background callbacks for the heavy trade loads (see trade_view), off
+# unless [background] enabled = true.
+# Every job runs in a forked process and reports its progress and result
+# through a diskcache directory the server polls. Cancelling a job (a new
+# TradeId was requested) kills its process: its figure builds stop at once and
+# its queries are aborted by the server (client_connection_check_interval, see
+# db_functions). What a job process holds in memory dies with it: it opens its
+# own database connections instead of reusing the server's pools, and the
+# indicator memo (utils.indicators) it builds is lost, so indicators are
+# computed in full on every load. Jobs share trade data with the server process
+# only through the pickle files of the trade_cache disk tier (data.cache), which
+# src.app turns on for them.
+
+BACKGROUND_SETTINGS = {
+    "enabled": False,
+    "directory": ".callback_cache",
+    "poll_ms": 200,         # how often the browser asks for progress / the result
+    "expire": 600.0,        # seconds unread results are kept
+}
+
+_manager = None
+
+
+def configure_background(**settings) -> None:
+    """Override BACKGROUND_SETTINGS, e.g. from the optional [background] section of database.ini."""
+    global _manager
+    apply_settings(BACKGROUND_SETTINGS, "background", **settings)
+    _manager = None
+
+
+def background_enabled() -> bool:
+    return BACKGROUND_SETTINGS["enabled"] and diskcache is not None
+
+
+def get_background_manager():
+    """The process-wide DiskcacheManager, or None when background callbacks are off."""
+    global _manager
+    if not background_enabled():
+        return None
+    if _manager is None:
+        cache = diskcache.Cache(os.path.join(BACKGROUND_SETTINGS["directory"], "jobs"))
+        _manager = DiskcacheManager(cache, expire=BACKGROUND_SETTINGS["expire"])
+    return _manager
+
+
+def background_callback(progress=None, running=None, cancel=None) -> dict:
+    """
+    Keyword arguments for app.callback running the callback as a background job
+    with progress outputs, running-state outputs and cancel inputs; {} when
+    background callbacks are off. Pair with report_progress.
+    """
+    manager = get_background_manager()
+    if manager is None:
+        return {}
+    kwargs = {"background": True, "manager": manager, "interval": BACKGROUND_SETTINGS["poll_ms"]}
+    if progress:
+        kwargs["progress"] = progress
+    if running:
+        kwargs["running"] = running
+    if cancel:
+        kwargs["cancel"] = cancel
+    return kwargs
+
+
+def report_progress(callback):
+    """
+    Adapt callback(set_progress, *args) to how it is registered: as a background
+    callback with progress outputs Dash passes set_progress first, otherwise
+    progress reports are dropped.
+    """
+    if background_enabled():
+        def run(set_progress, *args):
+            return callback(set_progress, *args)
+    else:
+        def run(*args):
+            return callback(lambda value: None, *args)
+    run.__name__ = callback.__name__
+    return run
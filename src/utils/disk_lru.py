@@ -0,0 +1,60 @@
+import os
+import tempfile
+
+# Size-limited directory of cache files that several worker processes share
+# (utils.figure_cache, data.cache.SharedCacheDirectory). Files are written
+# atomically (temp file + os.replace), so readers never see a partial file.
+# Eviction removes the files with the oldest mtime first; what the mtime stands
+# for (last read, time stored) is up to the subclass.
+
+
+class DiskLRU:
+    """Files ending in suffix in directory, evicted oldest first past max_bytes."""
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+
+    def _scan(self) -> list:
+        try:
+            return [e for e in os.scandir(self.directory) if e.name.endswith(self.suffix)]
+        except OSError:
+            return []
+
+    def _write(self, path: str, write) -> None:
+        """write(file) into a temp file, then move it to path. Errors are raised, without leaving the temp file."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+
+    def _evict(self) -> None:
+        files = []
+        for entry in self._scan():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # removed by another worker
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% so not every write triggers another scan
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes * 0.9:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from src.common.read_configs_in import apply_settings
+
+# Level-of-detail reduction for long bar series before they are sent to the browser.
+# A chart cannot show more points than it has horizontal pixels, so series longer
+# than max_points are reduced: candles by OHLC-preserving aggregation of adjacent
+# bars (never across a day boundary), lines by Largest-Triangle-Three-Buckets,
+# which keeps the visually significant peaks and troughs.
+# Timestamps go out as float64 ms since epoch: plotly date axes accept them, and
+# numeric NumPy arrays serialize as base64 typed arrays instead of ISO strings.
+
+LOD_SETTINGS = {
+    "max_points": 1500,         # ~ plot width in pixels
+    "webgl_threshold": 1000,    # line traces with more points are drawn with WebGL
+    "report": False,            # print figure payload bytes at full resolution vs. LOD
+}
+
+
+def configure_lod(**settings) -> None:
+    """Override LOD_SETTINGS, e.g. from the optional [lod] section of database.ini."""
+    apply_settings(LOD_SETTINGS, "LOD", **settings)
+
+
+def epoch_ms(times) -> np.ndarray:
+    """Timestamps as float64 ms since epoch, NaN for NaT."""
+    values = pd.to_datetime(pd.Series(times), errors="coerce").to_numpy(dtype="datetime64[ms]")
+    ms = values.astype(np.int64).astype(np.float64)
+    ms[np.isnat(values)] = np.nan
+    return ms
+
+
+def ohlc_buckets(df: pd.DataFrame, time_col: str, max_points: int) -> pd.DataFrame:
+    """
+    Merge runs of adjacent bars so about max_points remain: first Open, max High,
+    min Low, last Close, summed Volume, first timestamp. Other numeric columns keep
+    their last value. Buckets do not span days, so the sessions stay separate.
+    """
+    if max_points <= 0 or len(df) <= max_points:
+        return df
+
+    size = int(np.ceil(len(df) / max_points))
+    day = df[time_col].dt.normalize().rename("_day")
+    bucket = (df.groupby(day, sort=False).cumcount() // size).rename("_bucket")
+
+    aggregations = {time_col: "first", "Open": "first", "High": "max", "Low": "min", "Close": "last"}
+    if "Volume" in df.columns:
+        aggregations["Volume"] = "sum"
+    for col in df.select_dtypes("number").columns:
+        aggregations.setdefault(col, "last")
+
+    return df.groupby([day, bucket], sort=False).agg(aggregations).reset_index(drop=True)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the n_out points Largest-Triangle-Three-Buckets keeps (x ascending, no NaN)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        # Average of the next bucket is the third corner of the triangle
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        xs, ys = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x) * (ys - y[a]) - (x[a] - xs) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def lttb(x: np.ndarray, y, max_points: int) -> tuple:
+    """(x, y) reduced to max_points with LTTB; NaN values (indicator warm-up) are dropped."""
+    y = np.asarray(pd.to_numeric(pd.Series(y), errors="coerce"), dtype=np.float64)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[valid], y[valid]
+    if max_points <= 0 or len(x) <= max_points:
+        return x, y
+    keep = lttb_indices(x, y, max_points)
+    return x[keep], y[keep]
+
+
+def line_trace_type(n_points: int) -> str:
+    """Trace type for a line of n_points: WebGL above the threshold."""
+    return "scattergl" if n_points > LOD_SETTINGS["webgl_threshold"] else "scatter"
+
+
+def payload_bytes(fig) -> int:
+    """Size of the figure JSON Dash sends to the browser."""
+    return len(pio.to_json(fig, validate=False))
+
+
+def report_payload(chart: str, full_fig, lod_fig) -> None:
+    full, lod = payload_bytes(full_fig), payload_bytes(lod_fig)
+    print(f"{chart} figure payload: {full / 1024:.0f} KiB full resolution -> {lod / 1024:.0f} KiB with LOD "
+          f"({lod / full:.0%})")
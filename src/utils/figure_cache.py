@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+import plotly.io as pio
+
+from src.common.read_configs_in import apply_settings
+from src.utils import metrics
+from src.utils.disk_lru import DiskLRU
+
+# On-disk cache of serialized figure JSON, keyed by (TradeId, chart type, data checksum).
+# Entries are whatever the build function returns: a go.Figure or the per-trade
+# figure update of a chart skeleton (see figure_templates).
+# Several worker processes can share one directory (see utils.disk_lru). The file
+# mtime doubles as the LRU clock: reads touch it, eviction removes the oldest files first.
+
+FIGURE_CACHE_SETTINGS = {
+    "enabled": True,
+    "directory": ".figure_cache",
+    "max_mb": 512.0,
+}
+
+# Bump when a chart's figure / figure update changes its output, so old files stop matching
+FIGURE_VERSION = 4
+
+
+def data_checksum(*frames) -> str:
+    """Checksum of the DataFrames a figure is built from (values and column names)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(FIGURE_VERSION).encode())
+    for df in frames:
+        if df is None or df.empty:
+            digest.update(b"<empty>")
+            continue
+        digest.update(",".join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class FigureCache(DiskLRU):
+    """Size-limited LRU directory of figure JSON files."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        super().__init__(directory, max_bytes, ".json")
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, trade_id, chart: str, checksum: str) -> str:
+        return os.path.join(self.directory, f"{trade_id}_{chart}_{checksum}.json")
+
+    def get(self, trade_id, chart: str, checksum: str):
+        """Cached figure JSON bytes, or None."""
+        path = self._path(trade_id, chart, checksum)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, trade_id, chart: str, checksum: str, data: bytes) -> None:
+        try:
+            self._write(self._path(trade_id, chart, checksum), lambda f: f.write(data))
+        except OSError as e:
+            print(f"Error writing figure cache: {e}")
+            return
+
+        # Older data versions of the same figure are dead weight
+        prefix = f"{trade_id}_{chart}_"
+        for entry in self._scan():
+            if entry.name.startswith(prefix) and not entry.name.endswith(f"{checksum}.json"):
+                self._remove(entry.path)
+
+        self._evict()
+
+
+_figure_cache = None
+
+
+def configure_figure_cache(**settings) -> None:
+    """Override FIGURE_CACHE_SETTINGS, e.g. from the optional [figure_cache] section of database.ini."""
+    global _figure_cache
+    apply_settings(FIGURE_CACHE_SETTINGS, "figure cache", **settings)
+    _figure_cache = None
+
+
+def get_figure_cache():
+    """The process-wide FigureCache, or None when disabled."""
+    global _figure_cache
+    if not FIGURE_CACHE_SETTINGS["enabled"]:
+        return None
+    if _figure_cache is None:
+        _figure_cache = FigureCache(
+            FIGURE_CACHE_SETTINGS["directory"],
+            int(FIGURE_CACHE_SETTINGS["max_mb"] * 1024 * 1024),
+        )
+    return _figure_cache
+
+
+def cached_figure(trade_id, chart: str, frames, build):
+    """
+    Return the figure (or figure update) for (trade_id, chart) from the disk cache
+    when the data checksum of frames matches, otherwise build() it and store its JSON.
+    """
+    cache = get_figure_cache()
+    if cache is None or all(df is None or df.empty for df in frames):
+        return _timed_build(chart, build)
+
+    checksum = data_checksum(*frames)
+    data = cache.get(trade_id, chart, checksum)
+    if data is not None:
+        return json.loads(data)
+
+    fig = _timed_build(chart, build)
+    data = pio.to_json(fig, validate=False).encode()
+    metrics.observe("tradeviewer_figure_bytes", len(data), chart=chart)
+    cache.put(trade_id, chart, checksum, data)
+    return fig
+
+
+def _timed_build(chart: str, build):
+    if not metrics.enabled():
+        return build()
+    start = time.perf_counter()
+    fig = build()
+    metrics.observe("tradeviewer_figure_seconds", time.perf_counter() - start, chart=chart)
+    return fig
+
+
+def get_figure_cache_stats() -> dict:
+    """Hit / miss counters of this process's figure cache."""
+    if _figure_cache is None:
+        return {}
+    return {"hits": _figure_cache.hits, "misses": _figure_cache.misses}
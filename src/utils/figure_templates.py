@@ -0,0 +1,102 @@
+import base64
+
+import numpy as np
+import plotly.graph_objects as go
+from dash import Patch
+
+# Chart skeletons and per-trade figure updates.
+# Every chart module builds its figure in two parts: a skeleton with the subplot
+# structure, styling, reference shapes and one empty trace per series in a fixed
+# order, and an update {"data": [props per trace], "layout": {...}} holding the
+# arrays of one trade. The skeletons go into the layout once at startup; a trade
+# switch sends only the update, as a dash.Patch, so the browser keeps its traces
+# and just swaps their data.
+# Plotly only encodes NumPy arrays as base64 typed arrays when it serializes a
+# whole figure; update values are plain JSON, so numeric arrays are wrapped with
+# typed_array() explicitly.
+
+# Trace type -> data properties an empty update clears
+ARRAY_PROPS = {"candlestick": ("x", "open", "high", "low", "close")}
+
+EXECUTION_COLORS = {'BUYTOOPEN': 'blue', 'BUYTOCLOSE': 'blue', 'SELLTOCLOSE': 'red', 'SELLTOOPEN': 'red'}
+EXECUTION_SYMBOLS = {'BUYTOOPEN': 'triangle-up', 'BUYTOCLOSE': 'triangle-up',
+                     'SELLTOCLOSE': 'triangle-down', 'SELLTOOPEN': 'triangle-down'}
+
+
+def typed_array(values, dtype: str = "f8") -> dict:
+    """
+    Numeric values as a plotly typed array spec (base64, more compact and faster to
+    parse than JSON numbers). "f4" halves the size again and is plenty for prices
+    and volumes on screen; epoch-ms timestamps need "f8".
+    """
+    data = np.ascontiguousarray(values, dtype=f"<{dtype}")
+    return {"dtype": dtype, "bdata": base64.b64encode(data.tobytes()).decode("ascii")}
+
+
+def trace_indices(traces: dict) -> dict:
+    """{trace name: index} of a chart's TRACES."""
+    return {name: i for i, name in enumerate(traces)}
+
+
+def execution_props(df_executions, x) -> dict:
+    """Data of the execution marker trace: x positions, fill prices, colour / symbol per side."""
+    price_col = 'AvgPrice' if 'AvgPrice' in df_executions.columns else 'Price'
+    return {
+        'x': x,
+        'y': df_executions[price_col].astype(float).tolist(),
+        'marker': {
+            'color': df_executions['Side'].map(EXECUTION_COLORS).fillna('black').tolist(),
+            'symbol': df_executions['Side'].map(EXECUTION_SYMBOLS).fillna('circle').tolist(),
+        },
+    }
+
+
+def layout_update(axes, title: str = "") -> dict:
+    """Title and a fresh autorange of every axis: zoom / pan of the previous trade does not carry over."""
+    update = {"title": {"text": title}}
+    for axis in axes:
+        update[axis] = {"autorange": True}
+    return update
+
+
+def empty_update(traces: dict, axes, title: str) -> dict:
+    """Update that clears every trace of a chart with TRACES and shows title instead."""
+    return {
+        "data": [{prop: [] for prop in ARRAY_PROPS.get(kind, ("x", "y"))} for kind in traces.values()],
+        "layout": layout_update(axes, title),
+    }
+
+
+def _merge(target: dict, values: dict) -> None:
+    for key, value in values.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = value
+
+
+def apply_update(skeleton: go.Figure, update: dict) -> go.Figure:
+    """Full figure of skeleton with update merged in (what the browser ends up showing)."""
+    fig = skeleton.to_dict()
+    for trace, props in zip(fig["data"], update["data"]):
+        _merge(trace, props)
+    _merge(fig["layout"], update.get("layout", {}))
+    return go.Figure(fig)
+
+
+def _assign(node, values: dict) -> None:
+    for key, value in values.items():
+        # Typed arrays from the figure cache ({"dtype", "bdata"}) are values, not nested props
+        if isinstance(value, dict) and "bdata" not in value:
+            _assign(node[key], value)
+        else:
+            node[key] = value
+
+
+def update_patch(update: dict) -> Patch:
+    """dash.Patch applying update to the figure the browser already holds."""
+    patch = Patch()
+    for i, props in enumerate(update["data"]):
+        _assign(patch["data"][i], props)
+    _assign(patch["layout"], update.get("layout", {}))
+    return patch
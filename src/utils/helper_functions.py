@@ -1,3 +1,5 @@
+import datetime
+
 import pandas as pd
 import numpy as np
 
@@ -5,43 +7,146 @@ import numpy as np
 
 # ---------- Helper functions ----------
 
-def align_execution_times_to_intraday(df_executions, df_intraday):
-    if df_executions.empty or df_intraday.empty:
-        return df_executions.copy()
+SNAP_MODES = ("nearest", "previous", "next")
+
+
+def time_of_day(times: pd.Series) -> pd.Series:
+    """Time-of-day column (datetime.time objects or "HH:MM:SS" strings) as timedeltas."""
+    if times.dtype == object and isinstance(times.dropna().iloc[0] if times.notna().any() else None, datetime.time):
+        # One attribute pass is much cheaper than formatting and re-parsing strings
+        micros = np.fromiter(
+            ((t.hour * 3600 + t.minute * 60 + t.second) * 1_000_000 + t.microsecond
+             if isinstance(t, datetime.time) else -1 for t in times),
+            dtype=np.int64, count=len(times),
+        )
+        deltas = pd.to_timedelta(micros, unit="us")
+        return pd.Series(deltas.where(micros >= 0), index=times.index)
+    return pd.to_timedelta(times.astype(str), errors="coerce")
+
+
+def execution_timestamps(df_executions: pd.DataFrame) -> pd.Series:
+    """
+    Full timestamps of the executions. Time is either already a timestamp
+    or a time of day that gets combined with the execution's Date.
+    """
+    times = df_executions["Time"]
+    if pd.api.types.is_datetime64_any_dtype(times):
+        return times
+    dates = pd.to_datetime(df_executions["Date"], errors="coerce").dt.normalize()
+    return dates + time_of_day(times)
+
+
+def bar_timestamps(df_bars: pd.DataFrame, time_col: str) -> pd.Series:
+    """Full timestamps of the bars, time-of-day columns are combined with Date."""
+    times = df_bars[time_col]
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        if time_col != "Date" and "Date" in df_bars.columns:
+            dates = pd.to_datetime(df_bars["Date"], errors="coerce").dt.normalize()
+            times = dates + time_of_day(times)
+        else:
+            times = pd.to_datetime(times, errors="coerce")
+    if getattr(times.dt, "tz", None) is not None:
+        # Executions carry exchange wall-clock time, compare on the same basis
+        times = times.dt.tz_localize(None)
+    return times
+
+
+def align_executions_to_bars(df_executions: pd.DataFrame, df_bars: pd.DataFrame,
+                             time_col: str, how: str = "nearest") -> np.ndarray:
+    """
+    Index (into df_bars) of the bar every execution snaps to, -1 where the
+    execution has no timestamp. Date and time of day are both respected.
+
+    how="nearest"  closest bar in time
+    how="previous" last bar starting at or before the execution
+    how="next"     first bar starting at or after the execution
+    Executions outside the bar range snap to the first / last bar.
+    """
+    if how not in SNAP_MODES:
+        raise ValueError(f"how must be one of {SNAP_MODES}, got '{how}'.")
+
+    bars = bar_timestamps(df_bars, time_col).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    execs = execution_timestamps(df_executions).to_numpy(dtype="datetime64[ns]")
+    valid = ~np.isnat(execs)
+    execs = execs.astype(np.int64)
+
+    order = np.argsort(bars, kind="stable")
+    sorted_bars = bars[order]
+    last = len(sorted_bars) - 1
 
-    def to_seconds(t):
-        if pd.isnull(t): return np.nan
-        if isinstance(t, pd.Timestamp): t = t.time()
-        return t.hour * 3600 + t.minute * 60 + t.second
+    prev_pos = np.clip(np.searchsorted(sorted_bars, execs, side="right") - 1, 0, last)
+    next_pos = np.clip(np.searchsorted(sorted_bars, execs, side="left"), 0, last)
 
-    intraday_secs = np.array([to_seconds(t) for t in df_intraday["Time"]])
-    exec_secs = np.array([to_seconds(t) for t in df_executions["Time"]])
+    if how == "previous":
+        pos = prev_pos
+    elif how == "next":
+        pos = next_pos
+    else:
+        closer_next = np.abs(sorted_bars[next_pos] - execs) < np.abs(execs - sorted_bars[prev_pos])
+        pos = np.where(closer_next, next_pos, prev_pos)
 
-    def find_nearest(exec_sec):
-        idx = np.abs(intraday_secs - exec_sec).argmin()
-        return df_intraday["Time"].iloc[idx]
+    return np.where(valid, order[pos], -1)
 
+
+def _snap_to_bars(df_executions, df_bars, time_col, how):
+    idx = align_executions_to_bars(df_executions, df_bars, time_col, how)
     df = df_executions.copy()
-    df["Time"] = [find_nearest(t) for t in exec_secs]
+    df = df[idx >= 0]
+    return df, df_bars[time_col].iloc[idx[idx >= 0]].to_numpy()
+
+
+def align_execution_times_to_intraday(df_executions, df_intraday, how="nearest"):
+    """Replace each execution's Time with the Time of its intraday bar."""
+    if df_executions.empty or df_intraday.empty:
+        return df_executions.copy()
+
+    df, bar_times = _snap_to_bars(df_executions, df_intraday, "Time", how)
+    df["Time"] = bar_times
     return df
 
 
-def align_execution_times_to_30mins(df_executions, df_30min):
+def align_execution_times_to_30mins(df_executions, df_30min, how="nearest"):
+    """Replace each execution's Date / Time with the date and time of day of its 30-min bar."""
     if df_executions.empty or df_30min.empty:
         return df_executions.copy()
 
-    def to_seconds(t):
-        if pd.isnull(t): return np.nan
-        if isinstance(t, pd.Timestamp): t = t.time()
-        return t.hour * 3600 + t.minute * 60 + t.second
+    df, bar_times = _snap_to_bars(df_executions, df_30min, "Date", how)
+    bar_times = pd.DatetimeIndex(bar_times)
+    df["Date"] = bar_times.date
+    df["Time"] = bar_times.time
+    return df
 
-    intraday_secs = np.array([to_seconds(t) for t in df_30min["Date"]])
-    exec_secs = np.array([to_seconds(t) for t in df_executions["Time"]])
 
-    def find_nearest(exec_sec):
-        idx = np.abs(intraday_secs - exec_sec).argmin()
-        return df_30min["Date"].iloc[idx].time()
+def normalize_to_entry(df_bars, df_executions, time_col="Time"):
+    """
+    Bars re-based to the trade entry (first execution): adds MinutesFromEntry and
+    PctFromEntry (Close relative to the entry price). Without executions the first
+    bar's open is used as the entry. Returns (bars, executions) with both columns.
+    """
+    if df_bars.empty:
+        return df_bars.copy(), df_executions.copy()
 
-    df = df_executions.copy()
-    df["Time"] = [find_nearest(t) for t in exec_secs]
-    return df
+    bars = df_bars.copy()
+    bar_ts = bar_timestamps(bars, time_col)
+    executions = df_executions.copy()
+
+    if not executions.empty:
+        exec_ts = execution_timestamps(executions)
+        price_col = "AvgPrice" if "AvgPrice" in executions.columns else "Price"
+        prices = pd.to_numeric(executions[price_col], errors="coerce")
+        first = int(exec_ts.argmin(skipna=True)) if exec_ts.notna().any() else 0
+        entry_ts, entry_price = exec_ts.iloc[first], prices.iloc[first]
+    else:
+        entry_ts, entry_price = bar_ts.iloc[0], pd.to_numeric(bars["Open"]).iloc[0]
+
+    if pd.isna(entry_ts) or pd.isna(entry_price) or entry_price == 0:
+        entry_ts, entry_price = bar_ts.iloc[0], pd.to_numeric(bars["Open"]).iloc[0]
+
+    minute = pd.Timedelta(minutes=1)
+    bars["MinutesFromEntry"] = (bar_ts - entry_ts) / minute
+    bars["PctFromEntry"] = (pd.to_numeric(bars["Close"]) / entry_price - 1.0) * 100.0
+
+    if not executions.empty:
+        executions["MinutesFromEntry"] = (exec_ts - entry_ts) / minute
+        executions["PctFromEntry"] = (prices / entry_price - 1.0) * 100.0
+    return bars, executions
@@ -0,0 +1,276 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.common.read_configs_in import apply_settings
+
+# Indicators computed from the raw OHLCV bars instead of read from stored columns.
+# Every indicator is a function (bars, state, **params) -> (values, state): bars
+# holds NumPy arrays of the bars to compute, state what the previous bars left
+# behind (last EMA value, running VWAP sums ...), None for a fresh start. With
+# the state of the bars before them, appended bars are computed on their own
+# and give the same values as a run over the whole series.
+# indicator_cache memoizes the values per (TradeId, timeframe, indicator, params)
+# and extends them when the same trade comes back with more bars. The memo lives
+# in the memory of one process: it is not shared between gunicorn workers, and
+# background callback jobs (utils.background) lose theirs when they exit.
+
+INDICATOR_SETTINGS = {
+    "enabled": True,        # False = use the stored VWAP / EMA9 / Relatr / EMA65 columns
+    "max_entries": 1024,    # memoized (trade, timeframe, indicator, params) series
+}
+
+# timeframe -> time column and {column: (indicator, params)} the charts show
+TIMEFRAMES = {
+    "daily": ("Date", {}),
+    "min30": ("Date", {"EMA65": ("ema", {"length": 65})}),
+    "intraday": ("Time", {
+        "VWAP": ("vwap", {}),
+        "EMA9": ("ema", {"length": 9}),
+        "Relatr": ("relatr", {"length": 14}),
+    }),
+}
+
+
+def configure_indicators(**settings) -> None:
+    """Override INDICATOR_SETTINGS, e.g. from the optional [indicators] section of database.ini."""
+    apply_settings(INDICATOR_SETTINGS, "indicator", **settings)
+    indicator_cache.max_entries = INDICATOR_SETTINGS["max_entries"]
+
+
+# --- Indicator functions ---
+
+def _smooth(values: np.ndarray, alpha: float, last) -> np.ndarray:
+    """
+    values[t] = alpha * x[t] + (1 - alpha) * values[t-1], seeded with last (or the
+    first value). pandas' ewm runs the recursion in compiled code; the previous
+    value is prepended so the first new bar continues from it.
+    """
+    if last is None:
+        return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    seeded = np.concatenate(([last], values))
+    return pd.Series(seeded).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def ema(bars: dict, state, length: int) -> tuple:
+    """Exponential moving average of Close, seeded with the first close (pandas adjust=False)."""
+    values = _smooth(bars["Close"], 2.0 / (length + 1), state)
+    return values, values[-1]
+
+
+def vwap(bars: dict, state) -> tuple:
+    """Volume weighted average of the typical price (H+L+C)/3, restarting every session."""
+    session = bars["session"]
+    pv = (bars["High"] + bars["Low"] + bars["Close"]) / 3.0 * bars["Volume"]
+    volume = bars["Volume"].astype(float)
+
+    starts = np.empty(len(session), dtype=bool)
+    starts[0] = True
+    starts[1:] = session[1:] != session[:-1]
+    if state is not None and state["session"] == session[0]:
+        # Same session as the last bar before: continue its running sums
+        starts[0] = False
+        pv = pv.copy()
+        volume = volume.copy()
+        pv[0] += state["pv"]
+        volume[0] += state["volume"]
+
+    cum_pv, cum_volume = np.cumsum(pv), np.cumsum(volume)
+    # Running sums up to the bar before each session start, spread over the session
+    start_index = np.maximum.accumulate(np.where(starts, np.arange(len(session)), 0))
+    before = start_index - 1
+    base_pv = np.where(before >= 0, cum_pv[np.maximum(before, 0)], 0.0)
+    base_volume = np.where(before >= 0, cum_volume[np.maximum(before, 0)], 0.0)
+    session_pv, session_volume = cum_pv - base_pv, cum_volume - base_volume
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = np.where(session_volume > 0, session_pv / session_volume, np.nan)
+    return values, {"session": session[-1], "pv": session_pv[-1], "volume": session_volume[-1]}
+
+
+def atr(bars: dict, state, length: int) -> tuple:
+    """Average true range, Wilder's smoothing (alpha 1/length) seeded with the first true range."""
+    high, low, close = bars["High"], bars["Low"], bars["Close"]
+    prev_close = np.empty(len(close))
+    prev_close[1:] = close[:-1]
+    prev_close[0] = state["close"] if state is not None else np.nan
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    values = _smooth(true_range, 1.0 / length, state["atr"] if state is not None else None)
+    return values, {"close": close[-1], "atr": values[-1]}
+
+
+def relatr(bars: dict, state, length: int) -> tuple:
+    """Distance of Close from VWAP in ATRs: (Close - VWAP) / ATR(length)."""
+    state = state or {}
+    vwap_values, vwap_state = vwap(bars, state.get("vwap"))
+    atr_values, atr_state = atr(bars, state.get("atr"), length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = np.where(atr_values > 0, (bars["Close"] - vwap_values) / atr_values, np.nan)
+    return values, {"vwap": vwap_state, "atr": atr_state}
+
+
+INDICATORS = {"ema": ema, "vwap": vwap, "atr": atr, "relatr": relatr}
+
+
+# --- Memoized, incrementally extended series ---
+
+NS_PER_DAY = 86_400_000_000_000
+
+
+def _bars(df: pd.DataFrame, time_col: str) -> dict:
+    bars = {col: df[col].to_numpy(dtype=float, na_value=np.nan)
+            for col in ("Open", "High", "Low", "Close", "Volume")}
+    times = df[time_col]
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        times = pd.to_datetime(times)
+    bars["time"] = times.to_numpy(dtype="datetime64[ns]").view("int64")
+    bars["session"] = bars["time"] // NS_PER_DAY     # calendar day of naive timestamps
+    # One row of raw bytes per bar, what the cache checksums (see IndicatorCache)
+    bars["rows"] = np.column_stack([bars[col] for col in ("Open", "High", "Low", "Close", "Volume")]
+                                   + [bars["time"].view(np.float64)])
+    return bars
+
+
+def _checksum(rows: np.ndarray, hasher=None):
+    """hasher (a new one by default) fed with rows; feeding bars in pieces gives the same digest."""
+    hasher = hasher or hashlib.blake2b(digest_size=16)
+    hasher.update(np.ascontiguousarray(rows))
+    return hasher
+
+
+def _tail(bars: dict, start: int) -> dict:
+    return {key: values[start:] for key, values in bars.items()}
+
+
+class IndicatorCache:
+    """
+    LRU of indicator series. An entry remembers the bars it covers (first and last
+    timestamp, a checksum of their OHLCV and times) and the state after its last
+    bar. A frame that starts with exactly those bars only computes the bars after
+    them, and a frame of bars right after the last one is computed as their
+    continuation. A corrected bar anywhere in the covered range changes the
+    checksum, and the series is computed again.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> dict(first, last, checksum, values, state)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "extensions": 0, "continuations": 0, "misses": 0}
+
+    def series(self, key: tuple, bars: dict) -> np.ndarray:
+        """Values of indicator key[2] with params key[3] for bars."""
+        name, params = key[2], dict(key[3])
+        func = INDICATORS[name]
+        times = bars["time"]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        n = len(entry["values"]) if entry else 0
+        checksum = None
+        if entry and len(times) >= n and times[0] == entry["first"] and times[n - 1] == entry["last"]:
+            checksum = _checksum(bars["rows"][:n])
+            if checksum.digest() != entry["checksum"].digest():
+                checksum = None     # a covered bar was corrected
+
+        if checksum is not None:
+            if len(times) == n:
+                self._count("hits")
+                return entry["values"]
+            # The cached bars plus newer ones: compute just the new bars
+            tail, state = func(_tail(bars, n), entry["state"], **params)
+            values = np.concatenate((entry["values"], tail))
+            _checksum(bars["rows"][n:], checksum)
+            self._count("extensions")
+        elif entry and times[0] > entry["last"]:
+            # Bars right after the cached ones (chart panned to newer bars): continue the series
+            values, state = func(bars, entry["state"], **params)
+            self._store(key, {
+                **entry, "values": np.concatenate((entry["values"], values)),
+                "last": times[-1], "checksum": _checksum(bars["rows"], entry["checksum"].copy()),
+                "state": state,
+            })
+            self._count("continuations")
+            return values
+        else:
+            values, state = func(bars, None, **params)
+            self._count("misses")
+            if entry and times[-1] < entry["first"]:
+                # Older bars on their own (chart panned back): keep the series they precede
+                return values
+            checksum = _checksum(bars["rows"])
+
+        self._store(key, {"first": times[0], "last": times[-1], "checksum": checksum,
+                          "values": values, "state": state})
+        return values
+
+    def _store(self, key: tuple, entry: dict) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def invalidate(self, trade_id: int) -> None:
+        """Drop every series of trade_id (its bars were rewritten)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == trade_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
+
+
+indicator_cache = IndicatorCache(INDICATOR_SETTINGS["max_entries"])
+os.register_at_fork(after_in_child=lambda: setattr(indicator_cache, "_lock", threading.Lock()))
+
+
+# --- Public API ---
+
+def indicator(trade_id: int, timeframe: str, name: str, df: pd.DataFrame, **params) -> np.ndarray:
+    """Values of indicator name (see INDICATORS) over the bars of df, memoized per trade and timeframe."""
+    time_col = TIMEFRAMES[timeframe][0]
+    key = (trade_id, timeframe, name, tuple(sorted(params.items())))
+    return indicator_cache.series(key, _bars(df, time_col))
+
+
+def add_indicators(df: pd.DataFrame, trade_id: int, timeframe: str, bar_size: str = None,
+                   force: bool = False) -> pd.DataFrame:
+    """
+    df with the indicator columns of timeframe (TIMEFRAMES) computed from its
+    OHLCV bars, replacing stored columns of the same name. df itself is left
+    unchanged (frames from trade_cache are shared). bar_size tells apart bars
+    resampled from the timeframe's own (see utils.resample), each has its own series.
+    force computes them even with INDICATOR_SETTINGS["enabled"] off, for bars
+    without stored columns to fall back on (resampled bars).
+    """
+    time_col, columns = TIMEFRAMES[timeframe]
+    if not (INDICATOR_SETTINGS["enabled"] or force) or not columns or df is None or df.empty:
+        return df
+    series = f"{timeframe}:{bar_size}" if bar_size else timeframe
+    try:
+        bars = _bars(df, time_col)
+        key = lambda name, params: (trade_id, series, name, tuple(sorted(params.items())))
+        return df.assign(**{
+            column: indicator_cache.series(key(name, params), bars)
+            for column, (name, params) in columns.items()
+        })
+    except Exception as e:
+        print(f"Error computing {timeframe} indicators for TradeId {trade_id}: {e}")
+        return df
@@ -0,0 +1,252 @@
+import functools
+import math
+import numbers
+import os
+import threading
+import time
+from collections import deque
+
+from src.common.read_configs_in import apply_settings
+
+# Process-wide performance metrics, exported in Prometheus text format on /metrics.
+#
+# Durations and sizes are kept as summaries: count, sum and p50 / p95 / p99 over
+# the last WINDOW observations of every series. Instrumentation is installed only
+# when METRICS_SETTINGS["enabled"] is set at startup; code paths that call
+# observe() directly pay a single flag check when it is not.
+
+METRICS_SETTINGS = {
+    "enabled": False,
+    "debug_panel": False,     # in-app table of the summaries (needs enabled)
+}
+
+WINDOW = 2048
+QUANTILES = (0.5, 0.95, 0.99)
+
+METRIC_HELP = {
+    "tradeviewer_callback_seconds": "Wall time of a Dash callback, serialization included.",
+    "tradeviewer_callback_response_bytes": "Size of the JSON response of a Dash callback.",
+    "tradeviewer_serialize_seconds": "Time spent serializing callback responses to JSON.",
+    "tradeviewer_db_connect_seconds": "Time to borrow a pooled connection (wait, health check, connect).",
+    "tradeviewer_db_query_seconds": "Time to execute a statement.",
+    "tradeviewer_db_fetch_seconds": "Time to fetch the rows of a statement.",
+    "tradeviewer_db_rows": "Rows fetched per statement.",
+    "tradeviewer_db_copy_bytes": "Bytes streamed by a COPY statement.",
+    "tradeviewer_dataframe_seconds": "Time to turn fetched rows / COPY output into a DataFrame.",
+    "tradeviewer_dataframe_bytes": "Memory size of the resulting DataFrame.",
+    "tradeviewer_figure_seconds": "Time to build a Plotly figure.",
+    "tradeviewer_figure_bytes": "Serialized size of a figure.",
+}
+
+
+class Summary:
+    """Count, sum and a sliding window of the latest observations."""
+
+    __slots__ = ("count", "total", "window")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.window = deque(maxlen=WINDOW)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.window.append(value)
+
+    def quantiles(self) -> dict:
+        values = sorted(self.window)
+        if not values:
+            return {q: float("nan") for q in QUANTILES}
+        return {q: values[min(len(values) - 1, int(q * len(values)))] for q in QUANTILES}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._summaries = {}        # (name, sorted label items) -> Summary
+        self._collectors = []       # callables returning [(name, labels, value)] gauges
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = Summary()
+            summary.observe(value)
+
+    def add_collector(self, collect) -> None:
+        """Register a callable returning [(name, labels dict, value)] read at scrape time."""
+        self._collectors.append(collect)
+
+    def add_stats(self, prefix: str, get_stats) -> None:
+        """
+        Export a get_stats() dict (or list of dicts) as gauges: numeric values
+        become prefix_<key>, string values become labels.
+        """
+        def collect():
+            stats = get_stats()
+            gauges = []
+            for row in stats if isinstance(stats, list) else [stats]:
+                labels = {k: v for k, v in row.items() if isinstance(v, str)}
+                for key, value in row.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        gauges.append((f"{prefix}_{key}", labels, value))
+            return gauges
+        self.add_collector(collect)
+
+    def snapshot(self) -> list:
+        """[(name, labels dict, count, sum, {quantile: value})], sorted by name."""
+        with self._lock:
+            items = [(name, dict(labels), s.count, s.total, s.quantiles()) for (name, labels), s in self._summaries.items()]
+        return sorted(items, key=lambda item: (item[0], sorted(item[1].items())))
+
+    def render_prometheus(self) -> str:
+        lines = []
+        seen = set()
+        for name, labels, count, total, quantiles in self.snapshot():
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} summary")
+            for q, value in quantiles.items():
+                lines.append(f"{name}{_labels(labels, quantile=q)} {_sample(value)}")
+            lines.append(f"{name}_sum{_labels(labels)} {_sample(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        gauges = []
+        for collect in self._collectors:
+            try:
+                gauges.extend(collect())
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+        # Samples of one metric must be adjacent
+        for name, labels, value in sorted(gauges, key=lambda gauge: gauge[0]):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{_labels(labels)} {_sample(value)}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._summaries.clear()
+
+
+def _sample(value) -> str:
+    """Exact sample value: integers as they are, floats round-trip (repr)."""
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _labels(labels: dict, **extra) -> str:
+    items = {**labels, **extra}
+    if not items:
+        return ""
+    pairs = (
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in items.items()
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+registry = MetricsRegistry()
+os.register_at_fork(after_in_child=lambda: setattr(registry, "_lock", threading.Lock()))
+
+
+def enabled() -> bool:
+    return METRICS_SETTINGS["enabled"]
+
+
+def observe(name: str, value: float, **labels) -> None:
+    if METRICS_SETTINGS["enabled"]:
+        registry.observe(name, value, **labels)
+
+
+def configure_metrics(**settings) -> None:
+    """Override METRICS_SETTINGS, e.g. from the optional [metrics] section of database.ini."""
+    apply_settings(METRICS_SETTINGS, "metrics", **settings)
+
+
+# --- Dash integration ---
+
+_current_callback = threading.local()
+
+
+def instrument_callbacks(app) -> int:
+    """
+    Wrap every server-side callback in app.callback_map (call after all callbacks
+    are registered). Returns the number of wrapped callbacks.
+    """
+    wrapped = 0
+    for callback_id, spec in app.callback_map.items():
+        func = spec.get("callback")
+        if func is None or getattr(func, "_metrics_wrapped", False):
+            continue
+        spec["callback"] = _wrap_callback(func, getattr(func, "__name__", callback_id))
+        wrapped += 1
+    _instrument_serialization()
+    return wrapped
+
+
+def _wrap_callback(func, name: str):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        _current_callback.name = name
+        start = time.perf_counter()
+        try:
+            response = func(*args, **kwargs)
+        finally:
+            registry.observe("tradeviewer_callback_seconds", time.perf_counter() - start, callback=name)
+            _current_callback.name = None
+        if isinstance(response, (str, bytes)):
+            registry.observe("tradeviewer_callback_response_bytes", len(response), callback=name)
+        return response
+
+    wrapper._metrics_wrapped = True
+    return wrapper
+
+
+def _instrument_serialization() -> None:
+    """Time plotly's JSON encoder, which Dash looks up on every response."""
+    import plotly.io.json as plotly_json
+
+    to_json_plotly = plotly_json.to_json_plotly
+    if getattr(to_json_plotly, "_metrics_wrapped", False):
+        return
+
+    @functools.wraps(to_json_plotly)
+    def timed_to_json(*args, **kwargs):
+        name = getattr(_current_callback, "name", None)
+        if name is None:
+            return to_json_plotly(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return to_json_plotly(*args, **kwargs)
+        finally:
+            registry.observe("tradeviewer_serialize_seconds", time.perf_counter() - start, callback=name)
+
+    timed_to_json._metrics_wrapped = True
+    plotly_json.to_json_plotly = timed_to_json
+
+
+def instrument_app(app) -> None:
+    """Time all registered callbacks and serve /metrics. Call after every callback is registered."""
+    instrument_callbacks(app)
+    register_metrics_endpoint(app)
+
+
+def register_metrics_endpoint(app, path: str = "/metrics") -> None:
+    """Serve registry.render_prometheus() from the app's Flask server."""
+    from flask import Response
+
+    def metrics_view():
+        return Response(registry.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+    app.server.add_url_rule(path, "metrics", metrics_view)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from src.common.read_configs_in import apply_settings
+
+# Coarser bars built from finer ones. Buckets are anchored at the session open
+# and never span two calendar days, so a 1h bar starts at 09:30, 10:30 ... and
+# the last bar of a session is cut at the close instead of running into the next
+# morning. Bars before the open (pre-market) fall into buckets aligned the same way.
+# The aggregation is one pass of NumPy reduceat over the sorted bars; missing
+# highs / lows are skipped like pandas' max / min do.
+
+RESAMPLE_SETTINGS = {
+    "session_open": "09:30",    # bucket anchor, time of day of the first regular bar
+}
+
+# bar size -> minutes per bar, None = one bar per session
+BAR_SIZES = {
+    "1m": 1,
+    "5m": 5,
+    "15m": 15,
+    "30m": 30,
+    "1h": 60,
+    "daily": None,
+}
+
+NS_PER_DAY = 86_400_000_000_000
+NS_PER_MINUTE = 60_000_000_000
+
+
+def configure_resample(**settings) -> None:
+    """Override RESAMPLE_SETTINGS, e.g. from the optional [resample] section of database.ini."""
+    apply_settings(RESAMPLE_SETTINGS, "resample", **settings)
+
+
+def bucket_starts(times: np.ndarray, minutes) -> np.ndarray:
+    """Start (int64 ns) of the bucket of every timestamp (int64 ns, naive)."""
+    day_start = times // NS_PER_DAY * NS_PER_DAY
+    if minutes is None:
+        return day_start
+    anchor = day_start + pd.Timedelta(RESAMPLE_SETTINGS["session_open"] + ":00").value
+    size = minutes * NS_PER_MINUTE
+    # The first bucket of a day starts at midnight at the earliest
+    return np.maximum(anchor + (times - anchor) // size * size, day_start)
+
+
+def resample_bars(df: pd.DataFrame, bar_size: str, time_col: str = "Time") -> pd.DataFrame:
+    """
+    OHLCV bars of bar_size (see BAR_SIZES) from the finer bars of df, sorted by
+    time_col. Open / Close are the first / last of a bucket, High / Low its
+    extremes, Volume the sum; time_col is the bucket start. Other columns keep
+    the value of the bucket's first bar; stored indicator columns are dropped,
+    they do not aggregate (see utils.indicators).
+    """
+    if df is None or df.empty:
+        return df
+
+    times = df[time_col]
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        times = pd.to_datetime(times)
+    times = times.to_numpy(dtype="datetime64[ns]").view("int64")
+
+    buckets = bucket_starts(times, BAR_SIZES[bar_size])
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(buckets)])) - 1
+
+    carried = [c for c in ("TradeId", "Symbol", "Date") if c in df.columns and c != time_col]
+    columns = {c: df[c].to_numpy()[starts] for c in carried}
+    columns.update({
+        time_col: buckets[starts].view("datetime64[ns]"),
+        "Open": df["Open"].to_numpy(dtype=float)[starts],
+        "High": np.fmax.reduceat(df["High"].to_numpy(dtype=float), starts),
+        "Low": np.fmin.reduceat(df["Low"].to_numpy(dtype=float), starts),
+        "Close": df["Close"].to_numpy(dtype=float)[ends],
+        "Volume": np.add.reduceat(df["Volume"].to_numpy(), starts),
+    })
+    return pd.DataFrame(columns)
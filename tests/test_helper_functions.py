@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.helper_functions import align_executions_to_bars, normalize_to_entry
+
+
+def reference_alignment(exec_times, bar_times, how):
+    """Bar index per execution by brute force; ties of "nearest" go to the earlier bar."""
+    result = []
+    for t in exec_times:
+        if pd.isna(t):
+            result.append(-1)
+            continue
+        candidates = list(enumerate(bar_times))
+        if how == "previous":
+            before = [(b, i) for i, b in candidates if b <= t]
+            result.append(max(before)[1] if before else min((b, i) for i, b in candidates)[1])
+        elif how == "next":
+            after = [(b, i) for i, b in candidates if b >= t]
+            result.append(min(after)[1] if after else max((b, i) for i, b in candidates)[1])
+        else:
+            result.append(min(candidates, key=lambda c: (abs(c[1] - t), c[1]))[0])
+    return result
+
+
+@pytest.fixture
+def bars():
+    times = pd.date_range("2025-03-10 09:30", periods=30, freq="min")
+    times = times.append(pd.date_range("2025-03-11 09:30", periods=30, freq="min"))
+    rng = np.random.default_rng(0)
+    # Unsorted on purpose: the alignment must not rely on the bar order
+    return pd.DataFrame({"Time": times[rng.permutation(len(times))]})
+
+
+@pytest.mark.parametrize("how", ["nearest", "previous", "next"])
+def test_matches_reference(bars, how):
+    rng = np.random.default_rng(1)
+    start = pd.Timestamp("2025-03-10 09:00").value
+    end = pd.Timestamp("2025-03-11 10:30").value
+    exec_times = pd.to_datetime(rng.integers(start, end, 200))
+    executions = pd.DataFrame({"Time": exec_times})
+
+    idx = align_executions_to_bars(executions, bars, "Time", how)
+    assert idx.tolist() == reference_alignment(exec_times, list(bars["Time"]), how)
+
+
+def test_time_of_day_is_combined_with_date(bars):
+    # Same time of day on both sessions must snap to the bar of its own date
+    executions = pd.DataFrame({
+        "Date": ["2025-03-10", "2025-03-11"],
+        "Time": ["09:45:20", "09:45:20"],
+    })
+    idx = align_executions_to_bars(executions, bars, "Time", "previous")
+    snapped = bars["Time"].iloc[idx].tolist()
+    assert snapped == [pd.Timestamp("2025-03-10 09:45"), pd.Timestamp("2025-03-11 09:45")]
+
+
+def test_nat_executions_get_minus_one(bars):
+    executions = pd.DataFrame({"Time": pd.to_datetime(["2025-03-10 09:40", None, "2025-03-11 09:31"])})
+    idx = align_executions_to_bars(executions, bars, "Time", "nearest")
+    assert idx[1] == -1
+    assert bars["Time"].iloc[idx[0]] == pd.Timestamp("2025-03-10 09:40")
+    assert bars["Time"].iloc[idx[2]] == pd.Timestamp("2025-03-11 09:31")
+
+
+def test_unknown_mode_is_rejected(bars):
+    with pytest.raises(ValueError):
+        align_executions_to_bars(pd.DataFrame({"Time": bars["Time"]}), bars, "Time", "backward")
+
+
+def session_bars():
+    times = pd.date_range("2025-03-10 09:30", periods=30, freq="min")
+    return pd.DataFrame({"Time": times, "Open": 10.0, "Close": np.linspace(10.0, 11.0, 30)})
+
+
+def test_entry_skips_missing_execution_times():
+    executions = pd.DataFrame({
+        "Time": pd.to_datetime([None, "2025-03-10 09:35", "2025-03-10 09:40"]),
+        "Price": [9.0, 10.0, 12.0],
+    })
+    bars, executions = normalize_to_entry(session_bars(), executions)
+    assert executions["MinutesFromEntry"].tolist()[1:] == [0.0, 5.0]
+    assert executions["PctFromEntry"].iloc[1] == 0.0
+    assert bars["MinutesFromEntry"].iloc[0] == -5.0
+
+
+@pytest.mark.parametrize("price", [np.nan, 0.0])
+def test_entry_without_price_falls_back_to_first_bar(price):
+    executions = pd.DataFrame({"Time": pd.to_datetime(["2025-03-10 09:35"]), "Price": [price]})
+    bars, _ = normalize_to_entry(session_bars(), executions)
+    assert bars["MinutesFromEntry"].iloc[0] == 0.0
+    assert bars["PctFromEntry"].iloc[0] == 0.0
+    assert bars["PctFromEntry"].notna().all()
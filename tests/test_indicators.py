@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.indicators import IndicatorCache, INDICATORS, _bars
+
+
+def make_bars(sessions=2, per_session=390, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    times = pd.DatetimeIndex([])
+    for day in range(sessions):
+        start = pd.Timestamp("2025-03-10 09:30") + pd.Timedelta(days=day)
+        times = times.append(pd.date_range(start, periods=per_session, freq="min"))
+    close = 100 + np.cumsum(rng.normal(0, 0.2, len(times)))
+    open_ = close + rng.normal(0, 0.1, len(times))
+    return pd.DataFrame({
+        "Time": times,
+        "Open": open_,
+        "High": np.maximum(open_, close) + rng.uniform(0, 0.3, len(times)),
+        "Low": np.minimum(open_, close) - rng.uniform(0, 0.3, len(times)),
+        "Close": close,
+        "Volume": rng.integers(0, 5000, len(times)),
+    })
+
+
+# --- Reference loops ---
+
+def reference_ema(close, length):
+    alpha, values = 2.0 / (length + 1), []
+    for x in close:
+        values.append(x if not values else alpha * x + (1 - alpha) * values[-1])
+    return np.array(values)
+
+
+def reference_vwap(df):
+    values, session, pv, volume = [], None, 0.0, 0.0
+    for row in df.itertuples():
+        if row.Time.date() != session:
+            session, pv, volume = row.Time.date(), 0.0, 0.0
+        pv += (row.High + row.Low + row.Close) / 3.0 * row.Volume
+        volume += row.Volume
+        values.append(pv / volume if volume > 0 else np.nan)
+    return np.array(values)
+
+
+def reference_atr(df, length):
+    values, prev_close = [], None
+    for row in df.itertuples():
+        true_range = row.High - row.Low
+        if prev_close is not None:
+            true_range = max(true_range, abs(row.High - prev_close), abs(row.Low - prev_close))
+        values.append(true_range if not values else values[-1] + (true_range - values[-1]) / length)
+        prev_close = row.Close
+    return np.array(values)
+
+
+def compute(cache, df, name, key=(1, "intraday"), **params):
+    full_key = key + (name, tuple(sorted(params.items())))
+    return cache.series(full_key, _bars(df, "Time"))
+
+
+def fresh(df, name, **params):
+    return INDICATORS[name](_bars(df, "Time"), None, **params)[0]
+
+
+@pytest.fixture
+def df():
+    return make_bars()
+
+
+def test_ema_matches_reference(df):
+    np.testing.assert_allclose(fresh(df, "ema", length=9), reference_ema(df["Close"], 9))
+
+
+def test_vwap_matches_reference(df):
+    # A session opening without volume has no VWAP until the first traded bar
+    df.loc[390, "Volume"] = 0
+    np.testing.assert_allclose(fresh(df, "vwap"), reference_vwap(df))
+
+
+def test_relatr_matches_reference(df):
+    expected = (df["Close"] - reference_vwap(df)) / reference_atr(df, 14)
+    np.testing.assert_allclose(fresh(df, "relatr", length=14), expected)
+
+
+@pytest.mark.parametrize("name, params", [("ema", {"length": 9}), ("vwap", {}), ("relatr", {"length": 14})])
+def test_extension_matches_full_recompute(df, name, params):
+    cache = IndicatorCache(16)
+    compute(cache, df.iloc[:200], name, **params)
+    values = compute(cache, df, name, **params)
+    assert cache.get_stats()["extensions"] == 1
+    np.testing.assert_allclose(values, fresh(df, name, **params))
+
+
+@pytest.mark.parametrize("name, params", [("ema", {"length": 9}), ("vwap", {}), ("relatr", {"length": 14})])
+def test_continuation_matches_full_recompute(df, name, params):
+    cache = IndicatorCache(16)
+    compute(cache, df.iloc[:500], name, **params)
+    values = compute(cache, df.iloc[500:], name, **params)
+    assert cache.get_stats()["continuations"] == 1
+    np.testing.assert_allclose(values, fresh(df, name, **params)[500:])
+
+    # The continued entry still serves the whole series
+    np.testing.assert_allclose(compute(cache, df, name, **params), fresh(df, name, **params))
+    assert cache.get_stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("extra", [0, 50])
+def test_corrected_bar_is_recomputed(df, extra):
+    cache = IndicatorCache(16)
+    compute(cache, df.iloc[:300], "ema", length=9)
+
+    corrected = df.iloc[:300 + extra].copy()
+    corrected.loc[150, "Close"] += 5.0
+    values = compute(cache, corrected, "ema", length=9)
+    assert cache.get_stats()["misses"] == 2
+    np.testing.assert_allclose(values, reference_ema(corrected["Close"], 9))
+
+
+def test_corrected_volume_is_recomputed(df):
+    cache = IndicatorCache(16)
+    compute(cache, df, "vwap")
+    corrected = df.copy()
+    corrected.loc[100, "Volume"] += 1000
+    np.testing.assert_allclose(compute(cache, corrected, "vwap"), reference_vwap(corrected))
+    assert cache.get_stats()["hits"] == 0
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.pnl import PNL_COLUMNS, compute_pnl
+
+
+def make_executions(trades=60, seed=0) -> pd.DataFrame:
+    """Random fills per trade: scale-ins, partial exits, reversals, zero quantities and missing times."""
+    rng = np.random.default_rng(seed)
+    rows, exec_id = [], 0
+    for trade_id in range(1, trades + 1):
+        start = pd.Timestamp("2025-03-10 09:30") + pd.Timedelta(days=trade_id)
+        times = start + pd.to_timedelta(np.sort(rng.integers(0, 390, rng.integers(1, 12))), unit="min")
+        for time in times:
+            exec_id += 1
+            rows.append({
+                "TradeId": trade_id,
+                "ExecId": exec_id,
+                "Time": pd.NaT if rng.random() < 0.05 else time,
+                "Side": rng.choice(["BUY", "SELL", "Buy", "SHORT"]),
+                "Quantity": int(rng.choice([0, 50, 100, 100, 200, 300])),
+                "Price": round(float(100 + rng.normal(0, 2)), 2),
+            })
+    return pd.DataFrame(rows)
+
+
+def reference_pnl(executions: pd.DataFrame) -> pd.DataFrame:
+    """compute_pnl one fill at a time: average cost, closing part of a reversal first."""
+    rows = []
+    for trade_id, fills in executions.groupby("TradeId", sort=False):
+        position, cost, realized = 0, 0.0, 0.0
+        entry_value = entry_shares = exit_value = exit_shares = 0.0
+        max_position, count = 0, 0
+        for fill in fills.itertuples():
+            qty = fill.Quantity if str(fill.Side).upper().startswith("BUY") else -fill.Quantity
+            if qty == 0:
+                continue
+            count += 1
+            if position != 0 and np.sign(qty) != np.sign(position):
+                closing = min(abs(qty), abs(position))
+                average = cost / abs(position)
+                realized += (fill.Price - average) * closing * np.sign(position)
+                exit_value += fill.Price * closing
+                exit_shares += closing
+                cost -= average * closing
+                position += int(np.sign(qty)) * closing
+                qty -= int(np.sign(qty)) * closing
+                max_position = max(max_position, abs(position))
+            if qty != 0:
+                cost += fill.Price * abs(qty)
+                entry_value += fill.Price * abs(qty)
+                entry_shares += abs(qty)
+                position += qty
+                max_position = max(max_position, abs(position))
+
+        times = fills["Time"].dropna()
+        filled = count > 0
+        rows.append({
+            "TradeId": trade_id,
+            "RealizedPnL": round(realized, 2) if filled else np.nan,
+            "AvgEntry": entry_value / entry_shares if entry_shares else np.nan,
+            "AvgExit": exit_value / exit_shares if exit_shares else np.nan,
+            "MaxPosition": max_position if filled else np.nan,
+            "OpenPosition": position if filled else np.nan,
+            "Fills": count if filled else np.nan,
+            "FirstFill": times[fills["Quantity"] != 0].min() if filled else pd.NaT,
+            "LastFill": times[fills["Quantity"] != 0].max() if filled else pd.NaT,
+            "Executions": len(fills),
+            "LastExecId": fills["ExecId"].max(),
+        })
+    expected = pd.DataFrame(rows)
+    expected["HoldingMinutes"] = (expected["LastFill"] - expected["FirstFill"]).dt.total_seconds() / 60
+    return expected
+
+
+def assert_matches_reference(executions):
+    result = compute_pnl(executions)
+    expected = reference_pnl(executions)
+
+    assert list(result.columns) == PNL_COLUMNS
+    assert result["TradeId"].tolist() == expected["TradeId"].tolist()
+    for column in ["RealizedPnL", "AvgEntry", "AvgExit", "HoldingMinutes"]:
+        np.testing.assert_allclose(result[column].astype(float), expected[column], atol=0.01, err_msg=column)
+    for column in ["MaxPosition", "OpenPosition", "Fills", "Executions", "LastExecId"]:
+        np.testing.assert_array_equal(result[column].astype(float), expected[column].astype(float), err_msg=column)
+    for column in ["FirstFill", "LastFill"]:
+        pd.testing.assert_series_equal(result[column], expected[column], check_names=False, check_dtype=False)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_reference(seed):
+    assert_matches_reference(make_executions(seed=seed))
+
+
+def test_reversal_is_split():
+    # Long 100 @ 10, sell 300 @ 12: +200 realized, short 200 opened at 12, covered at 11
+    executions = pd.DataFrame({
+        "TradeId": [1, 1, 1],
+        "ExecId": [1, 2, 3],
+        "Time": pd.to_datetime(["2025-03-10 09:31", "2025-03-10 09:40", "2025-03-10 10:01"]),
+        "Side": ["BUY", "SELL", "BUY"],
+        "Quantity": [100, 300, 200],
+        "Price": [10.0, 12.0, 11.0],
+    })
+    row = compute_pnl(executions).iloc[0]
+    assert row["RealizedPnL"] == 400.0
+    assert row["AvgEntry"] == pytest.approx((100 * 10 + 200 * 12) / 300, abs=1e-4)
+    assert row["AvgExit"] == pytest.approx((100 * 12 + 200 * 11) / 300, abs=1e-4)
+    assert (row["MaxPosition"], row["OpenPosition"], row["Fills"]) == (200, 0, 3)
+    assert row["HoldingMinutes"] == 30.0
+    assert_matches_reference(executions)
+
+
+def test_missing_times_and_zero_fills():
+    executions = pd.DataFrame({
+        "TradeId": [1, 1, 2, 2],
+        "ExecId": [1, 2, 3, 4],
+        "Time": pd.to_datetime([None, "2025-03-10 09:45", "2025-03-11 09:31", None]),
+        "Side": ["BUY", "SELL", "BUY", "SELL"],
+        "Quantity": [100, 100, 0, 0],
+        "Price": [10.0, 10.5, 20.0, 20.0],
+    })
+    result = compute_pnl(executions).set_index("TradeId")
+    assert result.loc[1, "RealizedPnL"] == 50.0
+    assert result.loc[1, "FirstFill"] == result.loc[1, "LastFill"] == pd.Timestamp("2025-03-10 09:45")
+    # Only zero quantities: a row that records the executions, without P&L
+    assert (result.loc[2, "Executions"], result.loc[2, "LastExecId"]) == (2, 4)
+    assert pd.isna(result.loc[2, "RealizedPnL"]) and pd.isna(result.loc[2, "Fills"])
+    assert_matches_reference(executions)
@@ -0,0 +1,28 @@
+import pytest
+
+from src.common.read_configs_in import apply_settings, read_optional_config
+
+
+def test_values_take_the_type_of_their_default():
+    settings = {"enabled": False, "max_size": 8, "ttl": 900.0, "mode": "columnar"}
+    apply_settings(settings, "test", enabled="On", max_size="4", ttl="60", mode="rows")
+    assert settings == {"enabled": True, "max_size": 4, "ttl": 60.0, "mode": "rows"}
+
+    apply_settings(settings, "test", enabled="false")
+    assert settings["enabled"] is False
+
+
+def test_unknown_key_raises():
+    settings = {"enabled": False}
+    with pytest.raises(Exception, match="Unknown test setting 'enable'"):
+        apply_settings(settings, "test", enable="true")
+    assert settings == {"enabled": False}
+
+
+def test_optional_section_with_inline_comments(tmp_path):
+    ini = tmp_path / "database.ini"
+    ini.write_text("[metrics]\nenabled = true  # export /metrics\ndebug_panel = no\n")
+    settings = {"enabled": False, "debug_panel": True}
+    apply_settings(settings, "metrics", **read_optional_config(filename=str(ini), section="metrics"))
+    assert settings == {"enabled": True, "debug_panel": False}
+    assert read_optional_config(filename=str(ini), section="pool") == {}
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.resample import BAR_SIZES, resample_bars
+
+
+def make_bars(seed=0) -> pd.DataFrame:
+    """1-minute bars of two sessions with pre-market, after-hours and a gap, plus a night bar."""
+    rng = np.random.default_rng(seed)
+    times = pd.DatetimeIndex([])
+    for day in ("2025-03-10", "2025-03-11"):
+        times = times.append(pd.date_range(f"{day} 08:00", f"{day} 17:59", freq="min"))
+    times = times[(times.minute % 7 != 3) | (times.hour != 11)]       # missing bars
+    times = times.append(pd.DatetimeIndex(["2025-03-11 00:10", "2025-03-11 23:50"])).sort_values()
+
+    close = 100 + np.cumsum(rng.normal(0, 0.2, len(times)))
+    high = close + rng.uniform(0, 0.3, len(times))
+    low = close - rng.uniform(0, 0.3, len(times))
+    # Bars with a missing high / low must not wipe out their bucket's extreme
+    high[rng.choice(len(times), 20, replace=False)] = np.nan
+    low[rng.choice(len(times), 20, replace=False)] = np.nan
+    return pd.DataFrame({
+        "TradeId": 7,
+        "Symbol": "ABC",
+        "Date": times.date,
+        "Time": times,
+        "Open": close + rng.normal(0, 0.1, len(times)),
+        "High": high,
+        "Low": low,
+        "Close": close,
+        "Volume": rng.integers(0, 5000, len(times)),
+    })
+
+
+def reference(df: pd.DataFrame, bar_size: str) -> pd.DataFrame:
+    """DataFrame.resample per calendar day, buckets anchored at 09:30 and starting at midnight the earliest."""
+    minutes = BAR_SIZES[bar_size]
+    frames = []
+    for day, session in df.set_index("Time").groupby(df["Time"].dt.normalize().to_numpy()):
+        if minutes is None:
+            resampler = dict(rule="D")
+        else:
+            resampler = dict(rule=f"{minutes}min", origin=day + pd.Timedelta("09:30:00"))
+        agg = session.resample(**resampler).agg({
+            "Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum",
+        })
+        counts = session["Close"].resample(**resampler).count()
+        agg = agg[counts > 0]
+        agg.index = agg.index.where(agg.index >= day, day)
+        frames.append(agg)
+    return pd.concat(frames).rename_axis("Time").reset_index()
+
+
+@pytest.mark.parametrize("bar_size", [size for size in BAR_SIZES if size != "1m"])
+def test_matches_pandas_resample(bar_size):
+    df = make_bars()
+    result = resample_bars(df, bar_size)
+    expected = reference(df, bar_size)
+
+    pd.testing.assert_frame_equal(
+        result[["Time", "Open", "High", "Low", "Close", "Volume"]].reset_index(drop=True),
+        expected, check_dtype=False, check_index_type=False,
+    )
+
+
+def test_buckets_do_not_cross_sessions():
+    df = make_bars()
+    result = resample_bars(df, "1h")
+    times = pd.Series(result["Time"])
+
+    # The last hour of a session is cut at midnight, the next day starts its own buckets
+    assert pd.Timestamp("2025-03-10 17:30") in set(times)
+    assert pd.Timestamp("2025-03-11 00:00") in set(times)
+    assert (times.dt.date == pd.Series(result["Date"])).all()
+    # Regular session buckets are anchored at the open, pre-market ones aligned the same way
+    day = times[times.dt.date == pd.Timestamp("2025-03-10").date()]
+    assert list(day.dt.strftime("%H:%M")[:3]) == ["07:30", "08:30", "09:30"]
+
+
+def test_carried_columns():
+    df = make_bars()
+    result = resample_bars(df, "5m")
+    assert set(result.columns) == {"TradeId", "Symbol", "Date", "Time", "Open", "High", "Low", "Close", "Volume"}
+    assert (result["TradeId"] == 7).all()
+    assert result["Volume"].sum() == df["Volume"].sum()
+
+
+def test_resampled_bars_get_indicators_when_disabled(monkeypatch):
+    from src.data.loader import intraday_bars
+    from src.utils.indicators import INDICATOR_SETTINGS
+
+    monkeypatch.setitem(INDICATOR_SETTINGS, "enabled", False)
+    bundle = {"trade_id": -1, "intraday": make_bars()}
+    bars = intraday_bars(bundle, "5m")
+    for column in ("VWAP", "EMA9", "Relatr"):
+        assert bars[column].notna().any()
@@ -0,0 +1,21 @@
+from src.data.table_query import build_where
+
+COLUMNS = ["Symbol", "Rating"]
+
+
+def test_case_insensitive_comparison():
+    where, params = build_where("{Symbol} ieq aapl && {Symbol} ine 'tsla'", COLUMNS)
+    assert where == 'WHERE lower(CAST("Symbol" AS text)) = lower(%s) AND lower(CAST("Symbol" AS text)) <> lower(%s)'
+    assert params == ["aapl", "tsla"]
+
+
+def test_case_sensitive_and_plain_comparison():
+    where, params = build_where("{Symbol} seq AAPL && {Rating} >= 3", COLUMNS)
+    assert where == 'WHERE "Symbol" = %s AND "Rating" >= %s'
+    assert params == ["AAPL", "3"]
+
+
+def test_contains_and_unknown_columns():
+    where, params = build_where("{Symbol} icontains aa && {Setup} eq x && {Symbol} scontains A", COLUMNS)
+    assert where == 'WHERE CAST("Symbol" AS text) ILIKE %s AND CAST("Symbol" AS text) LIKE %s'
+    assert params == ["%aa%", "%A%"]
@@ -0,0 +1,6 @@
+# Production entry point: gunicorn -c gunicorn.conf.py wsgi:server
+# Every worker process imports this module and builds its own app (see src/app.py).
+from src.app import create_app
+
+app = create_app(filename="database.ini")
+server = app.server